@@ -0,0 +1,198 @@
+import math
+
+import numpy as np
+from django.db import transaction
+
+from analytics.models import EnergyExpenditureEstimate
+from intake.models import DailyIntakeSummary
+from measurements.models import WeightEntry
+
+# The energy stored in a kilogram of body weight.
+CALORIES_PER_KG = 7700
+
+# Observations lose half of their weight in the estimate every `HALF_LIFE_DAYS`, so it follows changes in maintenance.
+HALF_LIFE_DAYS = 28
+DECAY_RATE = math.log(2) / HALF_LIFE_DAYS
+
+# Between two weigh-ins, at least this share of the days must have food entries, as days without them are not
+# necessarily days without food.
+MIN_LOGGED_SHARE = 0.7
+
+# The z-score of the 95% confidence bounds.
+CONFIDENCE_Z = 1.96
+
+# Suggested calories differ from maintenance by at most this much, however close the goal date is.
+MAX_DAILY_ADJUSTMENT = 1000
+PROTEIN_PER_KG = 1.8
+FAT_SHARE_OF_CALORIES = 0.25
+CALORIES_PER_GRAM = {"protein": 4, "fats": 9, "carbs": 4}
+
+
+def _day_numbers(dates):
+    return np.array(dates, dtype="datetime64[D]").astype(np.int64)
+
+
+def observations(weigh_in_days, trends, intake_days, calories):
+    """
+    One maintenance observation per pair of consecutive weigh-ins with enough logged days between them. The weigh-in
+    on the morning of a day comes before its food, so the weigh-ins on days `a` and `b` enclose the intake of days `a`
+    to `b - 1`, and maintenance is the average intake of those days less the energy the change of the trend stored.
+
+    Returns the day, the maintenance and the number of days of each observation.
+    """
+    weigh_in_days = np.asarray(weigh_in_days, dtype=np.int64)
+    intake_days = np.asarray(intake_days, dtype=np.int64)
+    empty = np.zeros(0, dtype=np.int64), np.zeros(0), np.zeros(0)
+    if len(weigh_in_days) < 2:
+        return empty
+
+    # The pair of the intake of each day, or -1 before the first weigh-in. Days on or after the last are dropped.
+    pairs = np.searchsorted(weigh_in_days, intake_days, side="right") - 1
+    inside = (pairs >= 0) & (intake_days < weigh_in_days[-1])
+    pair_count = len(weigh_in_days) - 1
+    logged_days = np.bincount(pairs[inside], minlength=pair_count)
+    intake = np.bincount(pairs[inside], weights=np.asarray(calories, dtype=float)[inside], minlength=pair_count)
+
+    gaps = np.diff(weigh_in_days)
+    complete = logged_days >= MIN_LOGGED_SHARE * gaps
+    if not complete.any():
+        return empty
+
+    stored = CALORIES_PER_KG * np.diff(np.asarray(trends, dtype=float))
+    maintenance = intake[complete] / logged_days[complete] - stored[complete] / gaps[complete]
+    return weigh_in_days[1:][complete], maintenance, gaps[complete].astype(float)
+
+
+def add_observations(estimate, days, values, weights, until):
+    """
+    Adds observations to the running statistics of `estimate`, weighting each by its number of days decayed by its
+    age on the day `until`. The statistics of the new observations are computed at once and combined with the previous
+    ones, decayed from `estimate.through_date` to `until`, with the parallel variance formula, so the result does not
+    depend on how the observations were split between updates.
+    """
+    decay = math.exp(-DECAY_RATE * (until - _day_numbers([estimate.through_date])[0]))
+    previous_total = estimate.weight_total * decay
+    estimate.weight_total = previous_total
+    estimate.weight_squares_total *= decay**2
+    estimate.squared_deviations *= decay
+    if not len(days):
+        return
+
+    decayed = weights * np.exp(-DECAY_RATE * (until - days))
+    batch_total = float(decayed.sum())
+    batch_mean = float(np.dot(decayed, values) / batch_total)
+    batch_deviations = float(np.dot(decayed, (values - batch_mean) ** 2))
+
+    total = previous_total + batch_total
+    delta = batch_mean - estimate.mean_calories
+    estimate.mean_calories += delta * batch_total / total
+    estimate.squared_deviations += batch_deviations + delta**2 * previous_total * batch_total / total
+    estimate.weight_total = total
+    estimate.weight_squares_total += float(np.dot(decayed, decayed))
+    estimate.observation_count += len(days)
+
+
+def update_estimate(user):
+    """
+    Adds the observations of the weigh-ins after the one the estimate of the user was last updated with, creating it
+    from the whole history when there is none. Returns the estimate, or None before the first weigh-in.
+    """
+    with transaction.atomic():
+        estimate = EnergyExpenditureEstimate.objects.select_for_update().filter(user=user).first()
+        weigh_ins = WeightEntry.objects.filter(user=user, trend_kg__isnull=False)
+        if estimate is not None:
+            weigh_ins = weigh_ins.filter(date__gt=estimate.through_date)
+        rows = list(weigh_ins.order_by("date").values_list("date", "trend_kg"))
+        if not rows:
+            return estimate
+
+        if estimate is None:
+            estimate = EnergyExpenditureEstimate(user=user, through_date=rows[0][0], through_trend_kg=rows[0][1])
+        else:
+            rows.insert(0, (estimate.through_date, estimate.through_trend_kg))
+
+        intake = list(
+            DailyIntakeSummary.objects.filter(user=user, date__gte=rows[0][0], date__lt=rows[-1][0]).values_list(
+                "date", "total_calories"
+            )
+        )
+        dates, trends = zip(*rows)
+        intake_dates, calories = zip(*intake) if intake else ((), ())
+
+        days = _day_numbers(dates)
+        add_observations(estimate, *observations(days, trends, _day_numbers(intake_dates), calories), until=days[-1])
+        estimate.through_date, estimate.through_trend_kg = rows[-1]
+        estimate.save()
+        return estimate
+
+
+def confidence_bounds(estimate):
+    """
+    The 95% confidence bounds of the maintenance, from the weighted variance of the observations and their effective
+    number, or None without at least two observations.
+    """
+    if estimate.observation_count < 2 or not estimate.weight_total:
+        return None
+    variance = estimate.squared_deviations / estimate.weight_total
+    standard_error = math.sqrt(variance * estimate.weight_squares_total) / estimate.weight_total
+    return (
+        estimate.mean_calories - CONFIDENCE_Z * standard_error,
+        estimate.mean_calories + CONFIDENCE_Z * standard_error,
+    )
+
+
+def suggest_goal(maintenance, trend_kg, weight_goal, today):
+    """
+    Daily macronutrient goals reaching the weight goal of the user by its date at the estimated maintenance, or
+    keeping the current weight without one. Protein is set by body weight and fats by their share of calories, and
+    carbs make up the rest.
+    """
+    calories = maintenance
+    if weight_goal is not None and weight_goal.goal_date > today:
+        change_per_day = (float(weight_goal.goal_weight_kg) - trend_kg) / (weight_goal.goal_date - today).days
+        adjustment = change_per_day * CALORIES_PER_KG
+        calories += max(-MAX_DAILY_ADJUSTMENT, min(MAX_DAILY_ADJUSTMENT, adjustment))
+
+    protein = PROTEIN_PER_KG * trend_kg
+    fats = FAT_SHARE_OF_CALORIES * calories / CALORIES_PER_GRAM["fats"]
+    remaining = calories - protein * CALORIES_PER_GRAM["protein"] - fats * CALORIES_PER_GRAM["fats"]
+    return {
+        "calories": calories,
+        "protein": protein,
+        "fats": fats,
+        "carbs": max(remaining, 0) / CALORIES_PER_GRAM["carbs"],
+    }
+
+
+def estimate_energy_expenditure(user, weight_goal, today):
+    """
+    The estimated maintenance calories of the user, with their confidence bounds and suggested daily goals, after
+    adding the weigh-ins since the last estimate.
+    """
+    estimate = update_estimate(user)
+    if estimate is None or estimate.observation_count == 0:
+        return {
+            "maintenanceCalories": None,
+            "lowerBound": None,
+            "upperBound": None,
+            "observationCount": 0,
+            "throughDate": estimate.through_date if estimate else None,
+            "suggestedGoal": None,
+        }
+
+    bounds = confidence_bounds(estimate)
+    return {
+        "maintenanceCalories": estimate.mean_calories,
+        "lowerBound": bounds[0] if bounds else None,
+        "upperBound": bounds[1] if bounds else None,
+        "observationCount": estimate.observation_count,
+        "throughDate": estimate.through_date,
+        "suggestedGoal": suggest_goal(estimate.mean_calories, estimate.through_trend_kg, weight_goal, today),
+    }
+
+
+def reset_estimate(user_id, since):
+    """
+    Deletes the estimate of the user when it was updated with a weigh-in on or after `since`.
+    """
+    EnergyExpenditureEstimate.objects.filter(user_id=user_id, through_date__gte=since).delete()
@@ -0,0 +1,17 @@
+from rest_framework import serializers
+
+
+class SuggestedGoalSerializer(serializers.Serializer):
+    calories = serializers.FloatField()
+    protein = serializers.FloatField()
+    fats = serializers.FloatField()
+    carbs = serializers.FloatField()
+
+
+class EnergyExpenditureResponseSerializer(serializers.Serializer):
+    maintenanceCalories = serializers.FloatField(allow_null=True)
+    lowerBound = serializers.FloatField(allow_null=True)
+    upperBound = serializers.FloatField(allow_null=True)
+    observationCount = serializers.IntegerField()
+    throughDate = serializers.DateField(allow_null=True)
+    suggestedGoal = SuggestedGoalSerializer(allow_null=True)
@@ -0,0 +1,32 @@
+from datetime import timedelta
+
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from intake.models import FoodEntry
+from measurements.models import WeightEntry
+
+from .estimator import reset_estimate
+
+
+@receiver(post_save, sender=FoodEntry)
+@receiver(post_delete, sender=FoodEntry)
+def reset_estimate_after_food_entry(sender, instance, raw=False, **kwargs):
+    # The intake of a day is included once the weigh-in of the next day is.
+    if raw:
+        return
+    date = FoodEntry._meta.get_field("date").to_python(instance.date)
+    previous = getattr(instance, "_previous_entry", None)
+    if previous is not None:
+        date = min(date, previous["date"])
+    reset_estimate(instance.user_id, date + timedelta(days=1))
+
+
+@receiver(post_save, sender=WeightEntry)
+@receiver(post_delete, sender=WeightEntry)
+def reset_estimate_after_weigh_in(sender, instance, raw=False, **kwargs):
+    if raw:
+        return
+    date = WeightEntry._meta.get_field("date").to_python(instance.date)
+    previous_date = getattr(instance, "_previous_date", None)
+    reset_estimate(instance.user_id, min(date, previous_date) if previous_date is not None else date)
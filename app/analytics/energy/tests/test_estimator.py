@@ -0,0 +1,188 @@
+from datetime import date, timedelta
+
+import numpy as np
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.test import SimpleTestCase, TestCase
+from django.urls import reverse
+from rest_framework.test import APIClient
+
+from analytics.energy.estimator import (
+    CALORIES_PER_KG,
+    MAX_DAILY_ADJUSTMENT,
+    add_observations,
+    confidence_bounds,
+    observations,
+    suggest_goal,
+    update_estimate,
+)
+from analytics.energy.urls import ENERGY_EXPENDITURE_NAME
+from analytics.macronutrients.tests.test_view import _create_food
+from analytics.models import EnergyExpenditureEstimate
+from goals.models import WeightGoal
+from measurements.models import WeightEntry
+
+START = date(2025, 1, 1)
+MAINTENANCE = 2500
+INTAKE = 2000
+
+
+class ObservationsTests(SimpleTestCase):
+
+    def test_maintenance_between_weigh_ins(self):
+        days, values, weights = observations([0, 7, 14], [80, 79.9, 79.9], np.arange(14), np.full(14, 2000.0))
+
+        np.testing.assert_array_equal(days, [7, 14])
+        np.testing.assert_allclose(values, [2000 + CALORIES_PER_KG * 0.1 / 7, 2000])
+        np.testing.assert_array_equal(weights, [7, 7])
+
+    def test_pairs_with_too_few_logged_days_are_skipped(self):
+        intake_days = np.array([0, 1, 2, 7, 8, 9, 10, 11, 12])
+
+        days, _, _ = observations([0, 7, 14], [80, 80, 80], intake_days, np.full(len(intake_days), 2000.0))
+
+        np.testing.assert_array_equal(days, [14])
+
+    def test_single_weigh_in(self):
+        self.assertEqual(len(observations([0], [80], [0], [2000])[0]), 0)
+
+
+class AddObservationsTests(SimpleTestCase):
+
+    def _estimate(self):
+        return EnergyExpenditureEstimate(through_date=START, through_trend_kg=80)
+
+    def test_updates_match_a_single_batch(self):
+        generator = np.random.default_rng(0)
+        days = np.cumsum(generator.integers(1, 5, size=40))
+        values = generator.normal(MAINTENANCE, 150, size=40)
+        weights = generator.integers(1, 5, size=40).astype(float)
+        start = np.datetime64(START, "D").astype(np.int64)
+
+        batch = self._estimate()
+        add_observations(batch, start + days, values, weights, until=start + days[-1])
+
+        incremental = self._estimate()
+        for split in np.array_split(np.arange(40), 7):
+            add_observations(
+                incremental, start + days[split], values[split], weights[split], until=start + days[split[-1]]
+            )
+            incremental.through_date = START + timedelta(days=int(days[split[-1]]))
+
+        for field in ("mean_calories", "weight_total", "weight_squares_total", "squared_deviations"):
+            self.assertAlmostEqual(getattr(incremental, field), getattr(batch, field), places=6)
+        self.assertEqual(incremental.observation_count, 40)
+
+        lower, upper = confidence_bounds(batch)
+        self.assertLess(lower, batch.mean_calories)
+        self.assertGreater(upper, batch.mean_calories)
+
+
+class SuggestGoalTests(SimpleTestCase):
+
+    def test_maintenance_without_a_weight_goal(self):
+        goal = suggest_goal(2500, 80, None, START)
+
+        self.assertEqual(goal["calories"], 2500)
+        self.assertAlmostEqual(goal["protein"], 144)
+        self.assertAlmostEqual(goal["fats"], 2500 * 0.25 / 9)
+        self.assertAlmostEqual(goal["carbs"], (2500 - 144 * 4 - 2500 * 0.25) / 4)
+
+    def test_deficit_to_reach_the_goal_is_limited(self):
+        weight_goal = WeightGoal(goal_date=START + timedelta(days=77), goal_weight_kg=79)
+        self.assertAlmostEqual(suggest_goal(2500, 80, weight_goal, START)["calories"], 2400)
+
+        weight_goal.goal_date = START + timedelta(days=7)
+        self.assertEqual(suggest_goal(2500, 80, weight_goal, START)["calories"], 2500 - MAX_DAILY_ADJUSTMENT)
+
+
+class EnergyExpenditureEstimateTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(username="testuser")
+
+    def _log_days(self, first, last):
+        # A steady deficit of 500 kcal a day, weighed in every morning.
+        for day in range(first, last):
+            WeightEntry.objects.create(
+                user=self.user,
+                date=START + timedelta(days=day),
+                weight_kg=90 - day * (MAINTENANCE - INTAKE) / CALORIES_PER_KG,
+            )
+            _create_food(self.user, START + timedelta(days=day), INTAKE, 100, 200, 70)
+
+    def _rebuilt(self):
+        EnergyExpenditureEstimate.objects.filter(user=self.user).delete()
+        return update_estimate(self.user)
+
+    def test_estimates_the_maintenance(self):
+        self._log_days(0, 150)
+
+        estimate = update_estimate(self.user)
+
+        self.assertAlmostEqual(estimate.mean_calories, MAINTENANCE, delta=10)
+        self.assertEqual(estimate.through_date, START + timedelta(days=149))
+
+    def test_new_days_are_added_to_the_estimate(self):
+        self._log_days(0, 60)
+        update_estimate(self.user)
+        self._log_days(60, 90)
+
+        # Reading the estimate, the new weigh-ins and their intake, and saving the estimate.
+        with self.assertNumQueries(6):
+            estimate = update_estimate(self.user)
+
+        rebuilt = self._rebuilt()
+        self.assertAlmostEqual(estimate.mean_calories, rebuilt.mean_calories, places=6)
+        self.assertEqual(estimate.observation_count, rebuilt.observation_count)
+
+    def test_changing_an_included_day_resets_the_estimate(self):
+        self._log_days(0, 30)
+        update_estimate(self.user)
+
+        _create_food(self.user, START + timedelta(days=40), 500, 10, 10, 10)
+        self.assertTrue(EnergyExpenditureEstimate.objects.filter(user=self.user).exists())
+
+        _create_food(self.user, START + timedelta(days=10), 500, 10, 10, 10)
+        self.assertFalse(EnergyExpenditureEstimate.objects.filter(user=self.user).exists())
+
+
+class EnergyExpenditureViewTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(username="testuser")
+
+    def setUp(self):
+        self.client = APIClient()
+        self.client.force_authenticate(user=self.user)
+        self.url = reverse(ENERGY_EXPENDITURE_NAME)
+        cache.clear()
+
+    def test_no_estimate_without_weigh_ins(self):
+        resp = self.client.get(self.url)
+
+        self.assertEqual(resp.status_code, 200)
+        self.assertIsNone(resp.data["maintenanceCalories"])
+        self.assertIsNone(resp.data["suggestedGoal"])
+
+    def test_estimate_is_cached_until_a_weigh_in(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            for day in range(30):
+                WeightEntry.objects.create(user=self.user, date=START + timedelta(days=day), weight_kg=80)
+                _create_food(self.user, START + timedelta(days=day), INTAKE, 100, 200, 70)
+
+        resp = self.client.get(self.url)
+
+        self.assertEqual(resp["X-Cache"], "MISS")
+        self.assertAlmostEqual(resp.data["maintenanceCalories"], INTAKE)
+        self.assertEqual(resp.data["observationCount"], 29)
+        self.assertEqual(resp.data["lowerBound"], resp.data["upperBound"])
+        self.assertAlmostEqual(resp.data["suggestedGoal"]["calories"], INTAKE)
+        self.assertEqual(self.client.get(self.url)["X-Cache"], "HIT")
+
+        with self.captureOnCommitCallbacks(execute=True):
+            WeightEntry.objects.create(user=self.user, date=START + timedelta(days=30), weight_kg=80)
+
+        resp = self.client.get(self.url)
+        self.assertEqual(resp["X-Cache"], "MISS")
+        self.assertEqual(resp.data["observationCount"], 30)
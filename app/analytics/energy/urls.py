@@ -0,0 +1,9 @@
+from django.urls import path
+
+from .views import EnergyExpenditureView
+
+ENERGY_EXPENDITURE_NAME = "energy-expenditure-analytics"
+
+urlpatterns = [
+    path("energy/expenditure", EnergyExpenditureView.as_view(), name=ENERGY_EXPENDITURE_NAME),
+]
@@ -0,0 +1,33 @@
+from datetime import date
+
+from drf_yasg import openapi
+from drf_yasg.utils import swagger_auto_schema
+from rest_framework.views import APIView
+
+from analytics.macronutrients.cache import analytics_cache, analytics_response
+from goals.models import WeightGoal
+
+from .estimator import HALF_LIFE_DAYS, estimate_energy_expenditure
+from .serializers import EnergyExpenditureResponseSerializer
+
+
+def _energy_expenditure_data(user, today):
+    weight_goal = WeightGoal.objects.filter(user=user).first()
+    return EnergyExpenditureResponseSerializer(estimate_energy_expenditure(user, weight_goal, today)).data
+
+
+class EnergyExpenditureView(APIView):
+    @swagger_auto_schema(
+        operation_description="The estimated maintenance calories of the user, from the calories logged between "
+        "consecutive weigh-ins and the change of the weight trend over them, with 95% confidence bounds. Recent "
+        f"observations count more, halving in weight every {HALF_LIFE_DAYS} days. The suggested goal reaches the "
+        "weight goal by its date, or keeps the current weight without one. Estimates are null until there are two "
+        "weigh-ins with food logged on most days between them.",
+        responses={200: openapi.Response("Energy expenditure", EnergyExpenditureResponseSerializer)},
+    )
+    def get(self, request):
+        today = date.today()
+        data, hit = analytics_cache.get_or_compute(
+            request.user.id, "energy", {"today": today}, lambda: _energy_expenditure_data(request.user, today)
+        )
+        return analytics_response(data, hit)
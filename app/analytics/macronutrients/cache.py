@@ -0,0 +1,115 @@
+import hashlib
+import json
+import threading
+import uuid
+
+from configurations.django_config_parser import django_configs
+from django.core.cache import cache
+from rest_framework import status
+from rest_framework.response import Response
+
+from analytics.transactions import on_commit_batch
+
+ANALYTICS_CACHE_ENABLED = django_configs.get("Analytics", "ANALYTICS_CACHE_ENABLED") == "True"
+ANALYTICS_CACHE_TTL = int(django_configs.get("Analytics", "ANALYTICS_CACHE_TTL"))
+
+
+class AnalyticsCache:
+    """
+    Caches analytics responses per user in the Django cache framework, shared by every gunicorn worker. A user's
+    analytics only change when they log food or change a goal, so each user has a data version which every write
+    replaces, see `bump_version`. A response is stored alongside the version it was computed from, and is only served
+    while that version is still current, so a response computed before a write is never served after it.
+
+    The version and the response are read with a single `get_many`, so a hit costs one round trip to the cache. Each
+    version is a random token rather than a counter, so a version evicted from the cache can never be reused by
+    responses computed from older data.
+
+    Hits and misses are counted per process, see `stats`.
+    """
+
+    def __init__(self, key_prefix, ttl, enabled=True):
+        self._key_prefix = key_prefix
+        self._ttl = ttl
+        self.enabled = enabled
+        self._lock = threading.Lock()
+        self._hits = 0
+        self._misses = 0
+
+    def _version_key(self, user_id):
+        return f"{self._key_prefix}:version:{user_id}"
+
+    def _key(self, user_id, name, params):
+        params_hash = hashlib.sha256(json.dumps(params, sort_keys=True, default=str).encode()).hexdigest()
+        return f"{self._key_prefix}:{name}:{user_id}:{params_hash}"
+
+    def _count(self, hit):
+        with self._lock:
+            if hit:
+                self._hits += 1
+            else:
+                self._misses += 1
+
+    def get_or_compute(self, user_id, name, params, compute):
+        """
+        Returns the cached response of analytics `name` for the user and `params`, or computes and caches it with
+        `compute()`. Returns `(response, hit)`.
+        """
+        if not self.enabled:
+            return compute(), False
+
+        version_key, key = self._version_key(user_id), self._key(user_id, name, params)
+        # The version is read before computing, so a write made while computing makes the stored response stale.
+        cached = cache.get_many([version_key, key])
+        version = cached.get(version_key)
+
+        entry = cached.get(key)
+        if version is not None and entry is not None and entry[0] == version:
+            self._count(hit=True)
+            return entry[1], True
+
+        self._count(hit=False)
+        if version is None:
+            cache.add(version_key, uuid.uuid4().hex, timeout=None)
+            version = cache.get(version_key)
+
+        response = compute()
+        cache.set(key, (version, response), timeout=self._ttl)
+        return response, False
+
+    def bump_version(self, user_id):
+        """
+        Makes every cached response of the user stale. The version is replaced once the current transaction commits,
+        so a response computed from the data before the write can not be stored under the new version. The versions
+        of every user written by the transaction are replaced together by a single `set_many`.
+        """
+        on_commit_batch(self._replace_versions, user_id)
+
+    def _replace_versions(self, user_ids):
+        cache.set_many({self._version_key(user_id): uuid.uuid4().hex for user_id in user_ids}, timeout=None)
+
+    def stats(self):
+        with self._lock:
+            requests = self._hits + self._misses
+            return {
+                "hits": self._hits,
+                "misses": self._misses,
+                "hitRatio": self._hits / requests if requests else 0.0,
+            }
+
+    def reset_stats(self):
+        with self._lock:
+            self._hits = self._misses = 0
+
+
+def analytics_response(data, hit):
+    """
+    The response of an analytics view returned by `AnalyticsCache.get_or_compute`, with an `X-Cache` header of HIT or
+    MISS.
+    """
+    response = Response(data, status=status.HTTP_200_OK)
+    response["X-Cache"] = "HIT" if hit else "MISS"
+    return response
+
+
+analytics_cache = AnalyticsCache(key_prefix="analytics", ttl=ANALYTICS_CACHE_TTL, enabled=ANALYTICS_CACHE_ENABLED)
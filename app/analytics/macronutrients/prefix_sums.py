@@ -0,0 +1,258 @@
+import calendar
+from datetime import date, timedelta
+
+import numpy as np
+from django.contrib.auth.models import User
+from django.db import IntegrityError, connection, transaction
+from django.db.models import Count, Max, Min, Sum
+
+from analytics.models import MacronutrientPrefixSums
+from goals.models import DailyMacronutrientGoal
+from intake.models import DailyIntakeSummary, FoodEntry
+
+from .queries import CONSUMED_FIELDS, GOAL_FIELDS, MACRONUTRIENTS
+from .trends import load_daily_series
+
+# The running total of each column is stored. A day counts once when it has any food entries, and its goals only count
+# then, like the summary. Totals are stored as integers in millionths, so subtracting two running totals gives exactly
+# the total of the days between them rather than picking up the rounding of float sums.
+COLUMNS = ("daysWithLogs", *(f"consumed_{n}" for n in MACRONUTRIENTS), *(f"goal_{n}" for n in MACRONUTRIENTS))
+LOGGED = 0
+CONSUMED = slice(1, 1 + len(MACRONUTRIENTS))
+GOALS = slice(1 + len(MACRONUTRIENTS), len(COLUMNS))
+SCALE = 10**6
+# A transaction changing more days of a user than this, such as deleting the user or many entries, rebuilds the user's
+# running totals with one cumulative sum, rather than rewriting the later years once per day.
+MAX_REFRESHED_DAYS = 7
+ROW_BYTES = len(COLUMNS) * np.dtype(np.int64).itemsize
+
+# The running totals of a day are a single row of the running totals of its year, or the last row of the latest year
+# before it with logged days, sliced out by the database so only the row is read.
+_RUNNING_TOTALS_SQL = f"""
+    SELECT SUBSTR(sums, CASE WHEN year = %s THEN %s ELSE LENGTH(sums) - {ROW_BYTES - 1} END, {ROW_BYTES}) AS totals
+    FROM {MacronutrientPrefixSums._meta.db_table}
+    WHERE user_id = %s AND year <= %s
+    ORDER BY year DESC
+    LIMIT 1
+"""
+
+
+def _running_totals_sql(days):
+    """
+    A single query of the running totals of each of `days`, returning the index of the day and its row.
+    """
+    return "\nUNION ALL\n".join(
+        f"SELECT {index}, totals FROM ({_RUNNING_TOTALS_SQL}) AS day_{index}" for index in range(days)
+    )
+
+
+def _days_in_year(year):
+    return 366 if calendar.isleap(year) else 365
+
+
+def _day_of_year(day):
+    return day.timetuple().tm_yday - 1
+
+
+def scale(values):
+    """
+    The totals of days as integers in millionths.
+    """
+    return np.rint(np.asarray(values, dtype=np.float64) * SCALE).astype(np.int64)
+
+
+def decode(prefix_sums):
+    return np.frombuffer(prefix_sums.sums, dtype=np.int64).reshape(_days_in_year(prefix_sums.year), len(COLUMNS))
+
+
+def encode(sums):
+    return np.ascontiguousarray(sums, dtype=np.int64).tobytes()
+
+
+def running_totals(user_id, day):
+    """
+    The running totals of the user on `day`, from the running totals of its year, or the last ones of the latest year
+    before it with logged days. A single lookup of one row.
+    """
+    prefix_sums = MacronutrientPrefixSums.objects.filter(user_id=user_id, year__lte=day.year).order_by("-year").first()
+    if prefix_sums is None:
+        return np.zeros(len(COLUMNS), dtype=np.int64)
+    sums = decode(prefix_sums)
+    return sums[_day_of_year(day)] if prefix_sums.year == day.year else sums[-1]
+
+
+def get_ranges_totals(user, ranges):
+    """
+    Returns the same `(days_with_logs, consumed, goals)` as `queries.get_macronutrient_totals` for each of the
+    `(start, end)` `ranges`, as the difference of the running totals on `end` and on the day before `start`. The
+    running totals of every distinct day are read by a single query, so the cost is one lookup of a single row per
+    day whatever the length of the ranges, and ranges sharing days, like consecutive weeks, share their lookups.
+    """
+    # Nothing is logged before the first day of the calendar, which has no day before it to read.
+    days_before = [start - timedelta(days=1) if start > date.min else None for start, _ in ranges]
+    days = sorted({*days_before, *(end for _, end in ranges)} - {None})
+    params = [param for day in days for param in (day.year, _day_of_year(day) * ROW_BYTES + 1, user.id, day.year)]
+    with connection.cursor() as cursor:
+        cursor.execute(_running_totals_sql(len(days)), params)
+        rows = dict(cursor.fetchall())
+
+    # Days before the first logged day have no running totals.
+    running = {
+        day: np.frombuffer(bytes(rows[index]), dtype=np.int64) if index in rows else np.zeros(len(COLUMNS), np.int64)
+        for index, day in enumerate(days)
+    }
+    running[None] = np.zeros(len(COLUMNS), dtype=np.int64)
+
+    results = []
+    for (_, end), day_before in zip(ranges, days_before):
+        totals = running[end] - running[day_before]
+        days_with_logs = int(totals[LOGGED]) // SCALE
+        consumed = dict(zip(MACRONUTRIENTS, (totals[CONSUMED] / SCALE).tolist()))
+        goals = dict(zip(MACRONUTRIENTS, (totals[GOALS] / SCALE).tolist()))
+        results.append((days_with_logs, consumed, goals))
+    return results
+
+
+def get_range_totals(user, start, end):
+    """
+    Returns the totals of a single range, see `get_ranges_totals`. The two running totals are read by one query.
+    """
+    return get_ranges_totals(user, [(start, end)])[0]
+
+
+def day_totals(user_id, day):
+    """
+    The totals of a single day of the user, read from the food entries, as they are being changed while the signals
+    updating the daily intake summaries may not have run yet.
+    """
+    totals = np.zeros(len(COLUMNS))
+    consumed = FoodEntry.objects.filter(user_id=user_id, date=day).aggregate(
+        entry_count=Count("id"), **{nutrient: Sum(field) for nutrient, field in CONSUMED_FIELDS.items()}
+    )
+    if not consumed["entry_count"]:
+        return scale(totals)
+
+    totals[LOGGED] = 1
+    totals[CONSUMED] = [consumed[nutrient] for nutrient in MACRONUTRIENTS]
+    goal = DailyMacronutrientGoal.objects.filter(user_id=user_id, date=day).values_list(*GOAL_FIELDS.values()).first()
+    if goal is not None:
+        totals[GOALS] = goal
+    return scale(totals)
+
+
+def _lock_user(user_id):
+    """
+    Updates of a user's running totals are serialized on the user's row, locked before the totals of the day are read
+    so they include every committed change. The lock does not block saving rows referencing the user. Returns whether
+    the user still exists.
+    """
+    return User.objects.select_for_update(no_key=True).filter(pk=user_id).exists()
+
+
+def refresh_days(user_id, days):
+    """
+    Updates the running totals of the user after the totals of `days` changed, one day at a time by `refresh_day`, or
+    by `rebuild_prefix_sums` when more than `MAX_REFRESHED_DAYS` changed. Nothing is done for a deleted user.
+    """
+    if len(days) > MAX_REFRESHED_DAYS:
+        rebuild_prefix_sums(user_id)
+        return
+    for day in sorted(days):
+        refresh_day(user_id, day)
+
+
+def refresh_day(user_id, day):
+    """
+    Updates the running totals of the user after the totals of `day` changed, by adding the change to the running
+    totals of that day and every day after it. When another transaction stores the first running totals of the year
+    first, the update is retried against them.
+    """
+    try:
+        _refresh_day(user_id, day)
+    except IntegrityError:
+        _refresh_day(user_id, day)
+
+
+def _refresh_day(user_id, day):
+    with transaction.atomic():
+        if not _lock_user(user_id):
+            return
+        totals = day_totals(user_id, day)
+        later_years = list(
+            MacronutrientPrefixSums.objects.select_for_update()
+            .filter(user_id=user_id, year__gte=day.year)
+            .order_by("year")
+        )
+        index = _day_of_year(day)
+        previous_totals = (
+            running_totals(user_id, day - timedelta(days=1))
+            if index == 0 or not later_years or later_years[0].year != day.year
+            else None
+        )
+
+        if not later_years or later_years[0].year != day.year:
+            if not totals.any():
+                return
+            # A year's first logged day, every day before it has the running totals of the previous years.
+            prefix_sums = MacronutrientPrefixSums(
+                user_id=user_id, year=day.year, sums=encode(np.tile(previous_totals, (_days_in_year(day.year), 1)))
+            )
+            later_years.insert(0, prefix_sums)
+
+        year_sums = [decode(prefix_sums).copy() for prefix_sums in later_years]
+        stored = year_sums[0][index] - (previous_totals if previous_totals is not None else year_sums[0][index - 1])
+        change = totals - stored
+        if not change.any():
+            return
+
+        year_sums[0][index:] += change
+        for sums in year_sums[1:]:
+            sums += change
+        for prefix_sums, sums in zip(later_years, year_sums):
+            prefix_sums.sums = encode(sums)
+
+        if later_years[0].pk is None:
+            later_years.pop(0).save()
+        MacronutrientPrefixSums.objects.bulk_update(later_years, ["sums"])
+
+
+def build_prefix_sums(user_id):
+    """
+    The running totals of every year of the user with logged days, computed from the daily intake summaries and goals
+    with one cumulative sum over every day, as `{year: sums}`.
+    """
+    logged = DailyIntakeSummary.objects.filter(user_id=user_id).aggregate(first=Min("date"), last=Max("date"))
+    if logged["first"] is None:
+        return {}
+
+    first_year, last_year = logged["first"].year, logged["last"].year
+    start = date(first_year, 1, 1)
+    series = load_daily_series(user_id, start, date(last_year, 12, 31))
+    daily = np.zeros((len(series), len(COLUMNS)))
+    daily[:, LOGGED] = series.logged
+    daily[:, CONSUMED] = np.where(series.logged[:, None], series.consumed, 0.0)
+    daily[:, GOALS] = np.where(series.logged[:, None], np.nan_to_num(series.goals), 0.0)
+    sums = np.cumsum(scale(daily), axis=0)
+
+    by_year = {}
+    for year in range(first_year, last_year + 1):
+        offset = (date(year, 1, 1) - start).days
+        year_sums = sums[offset : offset + _days_in_year(year)]
+        if series.logged[offset : offset + _days_in_year(year)].any():
+            by_year[year] = year_sums
+    return by_year
+
+
+def rebuild_prefix_sums(user_id):
+    """
+    Replaces the running totals of the user by the ones built from the daily intake summaries, see
+    `build_prefix_sums`.
+    """
+    with transaction.atomic():
+        if not _lock_user(user_id):
+            return
+        MacronutrientPrefixSums.objects.filter(user_id=user_id).delete()
+        MacronutrientPrefixSums.objects.bulk_create(
+            MacronutrientPrefixSums(user_id=user_id, year=year, sums=encode(sums))
+            for year, sums in build_prefix_sums(user_id).items()
+        )
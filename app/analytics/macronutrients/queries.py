@@ -0,0 +1,111 @@
+from django.db import connection
+from django.db.models import Count, F, FilteredRelation, Q, Sum, Value
+from django.db.models.functions import Coalesce, TruncDay, TruncMonth, TruncWeek
+
+from goals.models import DailyMacronutrientGoal
+from intake.models import DailyIntakeSummary
+
+MACRONUTRIENTS = ("calories", "protein", "carbs", "fats")
+
+DAY = "day"
+WEEK = "week"
+MONTH = "month"
+# Weeks start on Monday and months on the first, so the first bucket can start before the requested range.
+BUCKETS = {DAY: TruncDay, WEEK: TruncWeek, MONTH: TruncMonth}
+
+CONSUMED_FIELDS = {
+    "calories": "total_calories",
+    "protein": "total_protein",
+    "carbs": "total_carbs",
+    "fats": "total_fats",
+}
+GOAL_FIELDS = {
+    "calories": "goal_calories",
+    "protein": "goal_protein",
+    "carbs": "goal_carbs",
+    "fats": "goal_fats",
+}
+
+# `DailyIntakeSummary` and `DailyMacronutrientGoal` are both unique per user and date, so each day joins at most one
+# goal. Goals of days without any entries are left out, like the averages.
+MACRONUTRIENT_SUMMARY_SQL = f"""
+    SELECT
+        COUNT(*),
+        COALESCE(SUM(daily.total_calories), 0),
+        COALESCE(SUM(daily.total_protein), 0),
+        COALESCE(SUM(daily.total_carbs), 0),
+        COALESCE(SUM(daily.total_fats), 0),
+        COALESCE(SUM(goal.goal_calories), 0),
+        COALESCE(SUM(goal.goal_protein), 0),
+        COALESCE(SUM(goal.goal_carbs), 0),
+        COALESCE(SUM(goal.goal_fats), 0)
+    FROM {DailyIntakeSummary._meta.db_table} AS daily
+    LEFT JOIN {DailyMacronutrientGoal._meta.db_table} AS goal ON goal.user_id = daily.user_id AND goal.date = daily.date
+    WHERE daily.user_id = %s AND daily.date BETWEEN %s AND %s
+"""
+
+
+def get_macronutrient_totals(user, start, end):
+    """
+    Returns the number of days with at least one food entry between `start` and `end`, and the consumed and goal
+    totals of each macronutrient over those days, as `(days_with_logs, consumed, goals)`.
+
+    Everything is computed by a single query of the daily intake summaries, so the summary costs one round trip to the
+    database and reads at most one row per day, however many foods were logged.
+    """
+    with connection.cursor() as cursor:
+        cursor.execute(MACRONUTRIENT_SUMMARY_SQL, [user.id, start, end])
+        row = cursor.fetchone()
+
+    days_with_logs, totals = row[0], [float(total) for total in row[1:]]
+    consumed = dict(zip(MACRONUTRIENTS, totals[: len(MACRONUTRIENTS)]))
+    goals = dict(zip(MACRONUTRIENTS, totals[len(MACRONUTRIENTS) :]))
+    return days_with_logs, consumed, goals
+
+
+def get_macronutrient_series(user, start, end, bucket):
+    """
+    Returns the consumed and goal totals of each macronutrient between `start` and `end`, grouped into `bucket`s of a
+    day, week or month by the database. Only buckets with at least one food entry are returned, as columns of the
+    same length,
+
+        {"dates": [...], "daysWithLogs": [...], "consumed": {"calories": [...], ...}, "goal": {"calories": [...], ...}}
+
+    where `dates` holds the first day of each bucket. Like `get_macronutrient_totals`, goals only count on days with
+    food entries, and everything is computed by a single query of the daily intake summaries left joined to the goal
+    of each day, a plain aggregate grouped by the bucket on every database.
+    """
+    rows = (
+        DailyIntakeSummary.objects.filter(user=user, date__range=(start, end))
+        # The summaries and goals share no relation, so the goal of each day is joined through their user.
+        .annotate(
+            day_goal=FilteredRelation(
+                "user__dailymacronutrientgoal", condition=Q(user__dailymacronutrientgoal__date=F("date"))
+            ),
+            bucket=BUCKETS[bucket]("date"),
+        )
+        .order_by("bucket")
+        .values("bucket")
+        .annotate(
+            days_with_logs=Count("id"),
+            **{f"consumed_{nutrient}": Sum(field) for nutrient, field in CONSUMED_FIELDS.items()},
+            **{
+                f"goal_{nutrient}": Coalesce(Sum(f"day_goal__{field}"), Value(0.0))
+                for nutrient, field in GOAL_FIELDS.items()
+            },
+        )
+    )
+
+    series = {
+        "dates": [],
+        "daysWithLogs": [],
+        "consumed": {nutrient: [] for nutrient in MACRONUTRIENTS},
+        "goal": {nutrient: [] for nutrient in MACRONUTRIENTS},
+    }
+    for row in rows:
+        series["dates"].append(row["bucket"])
+        series["daysWithLogs"].append(row["days_with_logs"])
+        for nutrient in MACRONUTRIENTS:
+            series["consumed"][nutrient].append(row[f"consumed_{nutrient}"])
+            series["goal"][nutrient].append(row[f"goal_{nutrient}"])
+    return series
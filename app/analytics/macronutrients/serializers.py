@@ -1,5 +1,11 @@
 from rest_framework import serializers
 
+from .queries import BUCKETS, DAY
+from .trends import MAX_TREND_DAYS
+
+# The most ranges summarized by a single request.
+MAX_RANGES = 12
+
 
 class AnalyticsQuerySerializer(serializers.Serializer):
     start = serializers.DateField()
@@ -11,6 +17,45 @@ class AnalyticsQuerySerializer(serializers.Serializer):
         return attrs
 
 
+class DateRangeField(serializers.Field):
+    """
+    A range of dates given as its start and end separated by a comma, such as `2025-08-01,2025-08-07`.
+    """
+
+    default_error_messages = {
+        "invalid": "A range must be a start and an end date separated by a comma, such as 2025-08-01,2025-08-07.",
+        "order": "start must be on or before end",
+    }
+
+    def to_internal_value(self, data):
+        parts = data.split(",") if isinstance(data, str) else []
+        if len(parts) != 2:
+            self.fail("invalid")
+        start, end = (serializers.DateField().run_validation(part.strip()) for part in parts)
+        if start > end:
+            self.fail("order")
+        return start, end
+
+    def to_representation(self, value):
+        return f"{value[0].isoformat()},{value[1].isoformat()}"
+
+
+class MultiRangeQuerySerializer(serializers.Serializer):
+    range = serializers.ListField(child=DateRangeField(), min_length=1, max_length=MAX_RANGES)
+
+
+class TrendsQuerySerializer(AnalyticsQuerySerializer):
+    def validate(self, attrs):
+        attrs = super().validate(attrs)
+        if (attrs["end"] - attrs["start"]).days >= MAX_TREND_DAYS:
+            raise serializers.ValidationError(f"The range can be at most {MAX_TREND_DAYS} days")
+        return attrs
+
+
+class TimeSeriesQuerySerializer(AnalyticsQuerySerializer):
+    bucket = serializers.ChoiceField(choices=list(BUCKETS), default=DAY)
+
+
 class SummaryItemSerializer(serializers.Serializer):
     totalConsumed = serializers.FloatField()
     totalGoal = serializers.FloatField()
@@ -30,3 +75,76 @@ class AnalyticsResponseSerializer(serializers.Serializer):
     endDate = serializers.DateField()
     daysWithLogs = serializers.IntegerField()
     summary = SummarySerializer()
+
+
+class MultiRangeResponseSerializer(serializers.Serializer):
+    ranges = AnalyticsResponseSerializer(many=True)
+
+
+class MacronutrientSeriesSerializer(serializers.Serializer):
+    calories = serializers.ListField(child=serializers.FloatField())
+    protein = serializers.ListField(child=serializers.FloatField())
+    carbs = serializers.ListField(child=serializers.FloatField())
+    fats = serializers.ListField(child=serializers.FloatField())
+
+
+class TimeSeriesResponseSerializer(serializers.Serializer):
+    """
+    The series are columnar, the values of the bucket starting on `dates[i]` are at index `i` of every list, which
+    keeps a year of daily buckets small.
+    """
+
+    startDate = serializers.DateField()
+    endDate = serializers.DateField()
+    bucket = serializers.CharField()
+    dates = serializers.ListField(child=serializers.DateField())
+    daysWithLogs = serializers.ListField(child=serializers.IntegerField())
+    consumed = MacronutrientSeriesSerializer()
+    goal = MacronutrientSeriesSerializer()
+
+
+class RollingAverageSerializer(serializers.Serializer):
+    calories = serializers.ListField(child=serializers.FloatField(allow_null=True))
+    protein = serializers.ListField(child=serializers.FloatField(allow_null=True))
+    carbs = serializers.ListField(child=serializers.FloatField(allow_null=True))
+    fats = serializers.ListField(child=serializers.FloatField(allow_null=True))
+
+
+class RollingAveragesSerializer(serializers.Serializer):
+    sevenDay = RollingAverageSerializer()
+    thirtyDay = RollingAverageSerializer()
+
+
+class TrendDaySerializer(serializers.Serializer):
+    date = serializers.DateField()
+    consumed = serializers.FloatField()
+    goal = serializers.FloatField()
+
+
+class NutrientTrendSerializer(serializers.Serializer):
+    adherencePercentage = serializers.FloatField()
+    currentStreak = serializers.IntegerField()
+    longestStreak = serializers.IntegerField()
+    bestDay = TrendDaySerializer(allow_null=True)
+    worstDay = TrendDaySerializer(allow_null=True)
+
+
+class NutrientTrendsSerializer(serializers.Serializer):
+    calories = NutrientTrendSerializer()
+    protein = NutrientTrendSerializer()
+    carbs = NutrientTrendSerializer()
+    fats = NutrientTrendSerializer()
+
+
+class TrendsResponseSerializer(serializers.Serializer):
+    """
+    The rolling averages are columnar like `TimeSeriesResponseSerializer`, with a value for every day in `dates`, or
+    null when none of the days in the window were logged.
+    """
+
+    startDate = serializers.DateField()
+    endDate = serializers.DateField()
+    daysWithLogs = serializers.IntegerField()
+    dates = serializers.ListField(child=serializers.DateField())
+    rollingAverages = RollingAveragesSerializer()
+    nutrients = NutrientTrendsSerializer()
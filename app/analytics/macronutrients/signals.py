@@ -0,0 +1,60 @@
+from collections import defaultdict
+
+from django.db.models.signals import post_delete, post_save, pre_save
+from django.dispatch import receiver
+
+from analytics.transactions import on_commit_batch
+from goals.models import DailyMacronutrientGoal, WeightGoal
+from intake.models import FoodEntry
+from measurements.models import WeightEntry
+
+from .cache import analytics_cache
+from .prefix_sums import refresh_days
+
+
+@receiver(post_save, sender=FoodEntry)
+@receiver(post_delete, sender=FoodEntry)
+@receiver(post_save, sender=DailyMacronutrientGoal)
+@receiver(post_delete, sender=DailyMacronutrientGoal)
+@receiver(post_save, sender=WeightEntry)
+@receiver(post_delete, sender=WeightEntry)
+@receiver(post_save, sender=WeightGoal)
+@receiver(post_delete, sender=WeightGoal)
+def invalidate_analytics(sender, instance, raw=False, **kwargs):
+    if not raw:
+        analytics_cache.bump_version(instance.user_id)
+
+
+@receiver(pre_save, sender=DailyMacronutrientGoal)
+def remember_previous_goal_date(sender, instance, raw=False, **kwargs):
+    instance._previous_date = None
+    if not raw and not instance._state.adding and instance.pk is not None:
+        instance._previous_date = (
+            DailyMacronutrientGoal.objects.filter(pk=instance.pk).values_list("date", flat=True).first()
+        )
+
+
+def _refresh_changed_days(changed_days):
+    days_by_user = defaultdict(set)
+    for user_id, day in changed_days:
+        days_by_user[user_id].add(day)
+    for user_id, days in days_by_user.items():
+        refresh_days(user_id, days)
+
+
+@receiver(post_save, sender=FoodEntry)
+@receiver(post_delete, sender=FoodEntry)
+@receiver(post_save, sender=DailyMacronutrientGoal)
+@receiver(post_delete, sender=DailyMacronutrientGoal)
+def update_prefix_sums(sender, instance, raw=False, **kwargs):
+    if raw:
+        return
+    # The days changed by a transaction are refreshed once it commits, so deleting a user or many entries does not
+    # rewrite the running totals once per entry. An update may move the entry or goal from another day, whose totals
+    # change as well.
+    day = sender._meta.get_field("date").to_python(instance.date)
+    previous = getattr(instance, "_previous_entry", None)
+    previous_day = previous["date"] if previous is not None else getattr(instance, "_previous_date", None)
+    on_commit_batch(_refresh_changed_days, (instance.user_id, day))
+    if previous_day is not None and previous_day != day:
+        on_commit_batch(_refresh_changed_days, (instance.user_id, previous_day))
@@ -0,0 +1,123 @@
+"""
+Benchmark of the macronutrient summary of ranges of a week up to the whole history of a user with years of daily
+food entries, computed by aggregating the daily intake summaries, `queries.get_macronutrient_totals`, and by the
+difference of two running totals, `prefix_sums.get_range_totals`. Runs against a throwaway test database, seeded so
+repeated runs are comparable.
+
+Run from the `app` directory using,
+
+    python -m analytics.macronutrients.tests.benchmark_prefix_sums [years]
+"""
+
+import os
+import sys
+import timeit
+from datetime import date, timedelta
+
+from backend.configurations.setup_python_path import setup_python_path
+
+setup_python_path()
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "backend.settings")
+
+import django  # noqa: E402
+
+django.setup()
+
+import numpy as np  # noqa: E402
+from django.contrib.auth.models import User  # noqa: E402
+from django.db import connection  # noqa: E402
+from django.test.utils import (  # noqa: E402
+    setup_test_environment,
+    teardown_test_environment,
+)
+
+from analytics.macronutrients.prefix_sums import (  # noqa: E402
+    build_prefix_sums,
+    encode,
+    get_range_totals,
+)
+from analytics.macronutrients.queries import get_macronutrient_totals  # noqa: E402
+from analytics.models import MacronutrientPrefixSums  # noqa: E402
+from goals.models import DailyMacronutrientGoal  # noqa: E402
+from intake.models import DailyIntakeSummary, FoodEntry  # noqa: E402
+from intake.summaries import summarize_entries  # noqa: E402
+
+DEFAULT_YEARS = 10
+ENTRIES_PER_DAY = 4
+REPEAT = 50
+START = date(2015, 1, 1)
+
+
+def _seed(years):
+    """
+    Daily food entries and goals, bulk created without signals, then the summaries and running totals built from them.
+    """
+    generator = np.random.default_rng(0)
+    user = User.objects.create(username="benchmark")
+    days = [START + timedelta(days=day) for day in range(years * 365)]
+
+    calories = generator.normal(550, 150, size=(len(days), ENTRIES_PER_DAY))
+    FoodEntry.objects.bulk_create(
+        (
+            FoodEntry(
+                user=user,
+                date=day,
+                food_name="food",
+                total_calories=value,
+                total_protein=value * 0.075,
+                total_carbs=value * 0.11,
+                total_fats=value * 0.03,
+                food_weight=100,
+            )
+            for day, values in zip(days, calories)
+            for value in values
+        ),
+        batch_size=1000,
+    )
+    DailyMacronutrientGoal.objects.bulk_create(
+        (
+            DailyMacronutrientGoal(
+                user=user, date=day, goal_calories=2200, goal_protein=150, goal_carbs=250, goal_fats=70
+            )
+            for day in days
+        ),
+        batch_size=1000,
+    )
+    DailyIntakeSummary.objects.bulk_create(
+        (DailyIntakeSummary(**summary) for summary in summarize_entries(FoodEntry.objects.filter(user=user))),
+        batch_size=1000,
+    )
+    MacronutrientPrefixSums.objects.bulk_create(
+        MacronutrientPrefixSums(user=user, year=year, sums=encode(sums))
+        for year, sums in build_prefix_sums(user.id).items()
+    )
+    return user, days[-1]
+
+
+def main():
+    years = int(sys.argv[1]) if len(sys.argv) > 1 else DEFAULT_YEARS
+
+    setup_test_environment()
+    old_config = connection.creation.create_test_db(verbosity=0)
+    try:
+        user, last_day = _seed(years)
+        print(f"{years} years, {FoodEntry.objects.count()} food entries")
+
+        ranges = {
+            "week": (last_day - timedelta(days=6), last_day),
+            "year": (last_day - timedelta(days=364), last_day),
+            "history": (START, last_day),
+        }
+        print(f"{'range':<8} {'aggregate':>12} {'prefix sums':>12}")
+        for name, (start, end) in ranges.items():
+            assert get_range_totals(user, start, end)[0] == get_macronutrient_totals(user, start, end)[0]
+            aggregate = min(timeit.repeat(lambda: get_macronutrient_totals(user, start, end), number=REPEAT, repeat=3))
+            prefix_sums = min(timeit.repeat(lambda: get_range_totals(user, start, end), number=REPEAT, repeat=3))
+            print(f"{name:<8} {aggregate / REPEAT * 1000:>9.3f} ms {prefix_sums / REPEAT * 1000:>9.3f} ms")
+    finally:
+        connection.creation.destroy_test_db(old_config, verbosity=0)
+        teardown_test_environment()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,95 @@
+"""
+Micro-benchmark of `trends.compute_trends` over 10 years of daily data, compared with the same rolling averages and
+streaks computed by a Python loop over every day. Neither reads the database, so only the compute is measured. The
+data is seeded, so repeated runs are comparable.
+
+Run from the `app` directory using,
+
+    python -m analytics.macronutrients.tests.benchmark_trends [years]
+"""
+
+import os
+import sys
+import timeit
+from datetime import date
+
+from backend.configurations.setup_python_path import setup_python_path
+
+setup_python_path()
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "backend.settings")
+
+import django  # noqa: E402
+
+django.setup()
+
+import numpy as np  # noqa: E402
+
+from analytics.macronutrients.trends import (  # noqa: E402
+    ADHERENCE_TOLERANCE,
+    ROLLING_WINDOWS,
+    DailySeries,
+    compute_trends,
+)
+
+DEFAULT_YEARS = 10
+REPEAT = 20
+START = date(2015, 1, 1)
+GOALS = (2200, 150, 250, 70)
+
+
+def _generate_series(days):
+    generator = np.random.default_rng(0)
+    series = DailySeries.empty(START, days)
+    series.logged[:] = generator.random(days) < 0.85
+    series.consumed[:] = np.array(GOALS) * generator.normal(1.0, 0.12, size=(days, len(GOALS)))
+    series.goals[series.logged] = GOALS
+    return series
+
+
+def _python_loop(series):
+    """
+    The trends computed one day at a time, as they would be without NumPy.
+    """
+    days, columns = len(series), len(GOALS)
+    logged, consumed, goals = series.logged.tolist(), series.consumed.tolist(), series.goals.tolist()
+    averages = {}
+    for name, window in ROLLING_WINDOWS.items():
+        averages[name] = []
+        for day in range(days):
+            window_days = [d for d in range(max(0, day - window + 1), day + 1) if logged[d]]
+            averages[name].append(
+                [
+                    sum(consumed[d][c] for d in window_days) / len(window_days) if window_days else None
+                    for c in range(columns)
+                ]
+            )
+
+    longest, current = [0] * columns, [0] * columns
+    for day in range(days):
+        for column in range(columns):
+            goal = goals[day][column]
+            if logged[day] and goal > 0 and abs(consumed[day][column] - goal) / goal <= ADHERENCE_TOLERANCE:
+                current[column] += 1
+                longest[column] = max(longest[column], current[column])
+            else:
+                current[column] = 0
+    return averages, current, longest
+
+
+def main():
+    years = int(sys.argv[1]) if len(sys.argv) > 1 else DEFAULT_YEARS
+    series = _generate_series(years * 365)
+    print(f"{years} years, {len(series)} days, {int(series.logged.sum())} logged")
+
+    benchmarks = {
+        "NumPy": lambda: compute_trends(series),
+        "Python loop": lambda: _python_loop(series),
+    }
+    for name, benchmark in benchmarks.items():
+        repeat = REPEAT if name == "NumPy" else 1
+        seconds = min(timeit.repeat(benchmark, number=repeat, repeat=3)) / repeat
+        print(f"{name:<12} {seconds * 1000:>9.2f} ms")
+
+
+if __name__ == "__main__":
+    main()
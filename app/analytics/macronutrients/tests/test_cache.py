@@ -0,0 +1,114 @@
+from datetime import date
+
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.test import TestCase
+from django.urls import reverse
+from rest_framework.test import APIClient
+
+from analytics.macronutrients.cache import analytics_cache
+from analytics.macronutrients.urls import (
+    ANALYTICS_CACHE_STATS_NAME,
+    MACRONUTRIENT_SERIES_NAME,
+    MACRONUTRIENT_SUMMARY_NAME,
+)
+from goals.models import DailyMacronutrientGoal
+
+from .test_view import _create_food, _create_goal
+
+DAY = date(2025, 8, 1)
+PARAMS = {"start": "2025-08-01", "end": "2025-08-07"}
+
+
+class AnalyticsCacheTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create(id=1, username="Test User")
+        cls.other_user = User.objects.create(id=2, username="Other User")
+
+    def setUp(self):
+        self.client = APIClient()
+        self.client.force_authenticate(user=self.user)
+        self.url = reverse(MACRONUTRIENT_SUMMARY_NAME)
+
+        cache.clear()
+        analytics_cache.reset_stats()
+
+        with self.captureOnCommitCallbacks(execute=True):
+            _create_food(self.user, DAY, 500, 25, 50, 15)
+
+    def _calories(self, resp):
+        return resp.data["summary"]["calories"]["totalConsumed"]
+
+    def test_repeated_request_is_served_from_cache(self):
+        self.assertEqual(self.client.get(self.url, PARAMS)["X-Cache"], "MISS")
+
+        # A hit is a single read of the cache, the analytics are not recomputed.
+        with self.assertNumQueries(1):
+            resp = self.client.get(self.url, PARAMS)
+
+        self.assertEqual(resp["X-Cache"], "HIT")
+        self.assertAlmostEqual(self._calories(resp), 500)
+        self.assertEqual(analytics_cache.stats(), {"hits": 1, "misses": 1, "hitRatio": 0.5})
+
+    def test_logging_food_invalidates_the_cache(self):
+        self.client.get(self.url, PARAMS)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            _create_food(self.user, DAY, 300, 15, 30, 10)
+        resp = self.client.get(self.url, PARAMS)
+
+        self.assertEqual(resp["X-Cache"], "MISS")
+        self.assertAlmostEqual(self._calories(resp), 800)
+
+    def test_changing_a_goal_invalidates_the_cache(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            goal = _create_goal(self.user, DAY, 2000, 50, 275, 70)
+        self.client.get(self.url, PARAMS)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            DailyMacronutrientGoal.objects.filter(pk=goal.pk).first().delete()
+        resp = self.client.get(self.url, PARAMS)
+
+        self.assertEqual(resp["X-Cache"], "MISS")
+        self.assertAlmostEqual(resp.data["summary"]["calories"]["totalGoal"], 0)
+
+    def test_response_computed_before_a_write_is_not_served(self):
+        # The write commits while the response is being computed, after the version was read.
+        def compute():
+            with self.captureOnCommitCallbacks(execute=True):
+                _create_food(self.user, DAY, 300, 15, 30, 10)
+            return {"stale": True}
+
+        analytics_cache.get_or_compute(self.user.id, "summary", PARAMS, compute)
+        resp = self.client.get(self.url, PARAMS)
+
+        self.assertEqual(resp["X-Cache"], "MISS")
+        self.assertAlmostEqual(self._calories(resp), 800)
+
+    def test_other_users_writes_keep_the_cache(self):
+        self.client.get(self.url, PARAMS)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            _create_food(self.other_user, DAY, 300, 15, 30, 10)
+
+        self.assertEqual(self.client.get(self.url, PARAMS)["X-Cache"], "HIT")
+
+    def test_series_and_summary_are_cached_separately(self):
+        self.client.get(self.url, PARAMS)
+
+        resp = self.client.get(reverse(MACRONUTRIENT_SERIES_NAME), PARAMS)
+
+        self.assertEqual(resp["X-Cache"], "MISS")
+        self.assertEqual(resp.data["dates"], ["2025-08-01"])
+
+    def test_stats_require_staff(self):
+        url = reverse(ANALYTICS_CACHE_STATS_NAME)
+        self.assertEqual(self.client.get(url).status_code, 403)
+
+        self.client.force_authenticate(user=User.objects.create(username="Staff", is_staff=True))
+        self.client.get(self.url, PARAMS)
+        resp = self.client.get(url)
+
+        self.assertEqual(resp.status_code, 200)
+        self.assertEqual(resp.data["misses"], 1)
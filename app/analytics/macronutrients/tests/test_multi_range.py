@@ -0,0 +1,102 @@
+from datetime import date, timedelta
+from unittest.mock import patch
+
+from django.contrib.auth.models import User
+from django.test import TestCase
+from django.urls import reverse
+from rest_framework.test import APIClient
+
+from analytics.macronutrients.cache import analytics_cache
+from analytics.macronutrients.serializers import MAX_RANGES
+from analytics.macronutrients.urls import MACRONUTRIENT_SUMMARY_NAME
+
+from .test_view import _create_food, _create_goal
+
+# This week, last week, this month and last month of Thursday 14 August 2025.
+RANGES = [
+    "2025-08-11,2025-08-17",
+    "2025-08-04,2025-08-10",
+    "2025-08-01,2025-08-31",
+    "2025-07-01,2025-07-31",
+]
+
+
+class MultiRangeSummaryTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create(id=1, username="Test User")
+
+    def setUp(self):
+        self.client = APIClient()
+        self.client.force_authenticate(user=self.user)
+        self.url = reverse(MACRONUTRIENT_SUMMARY_NAME)
+
+        for day in range(45):
+            current = date(2025, 7, 1) + timedelta(days=day)
+            _create_food(self.user, current, 1000 + day, 50, 100, 30)
+            if day % 2:
+                _create_goal(self.user, current, 2000, 80, 200, 60)
+
+    def _get_ranges(self, ranges):
+        return self.client.get(self.url, {"range": ranges})
+
+    def test_summaries_match_single_range_requests(self):
+        resp = self._get_ranges(RANGES)
+
+        self.assertEqual(resp.status_code, 200)
+        self.assertEqual(len(resp.data["ranges"]), len(RANGES))
+        for summary, query in zip(resp.data["ranges"], RANGES):
+            start, end = query.split(",")
+            with self.subTest(range=query):
+                self.assertEqual(summary, self.client.get(self.url, {"start": start, "end": end}).data)
+
+        self.assertEqual(resp.data["ranges"][0]["daysWithLogs"], 4)
+        self.assertEqual(resp.data["ranges"][3]["summary"]["calories"]["totalConsumed"], sum(range(1000, 1031)))
+
+    def test_all_ranges_are_a_single_query(self):
+        with patch.object(analytics_cache, "enabled", False), self.assertNumQueries(1):
+            self._get_ranges(RANGES)
+
+    def test_empty_range(self):
+        resp = self._get_ranges(["2024-01-01,2024-01-31", "2025-07-01,2025-07-01"])
+
+        self.assertEqual(resp.data["ranges"][0]["daysWithLogs"], 0)
+        self.assertEqual(resp.data["ranges"][1]["summary"]["calories"]["totalConsumed"], 1000)
+
+    def test_cached_separately_from_single_ranges(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            _create_food(self.user, date(2025, 8, 14), 500, 10, 10, 10)
+        self.client.get(self.url, {"start": "2025-08-11", "end": "2025-08-17"})
+
+        self.assertEqual(self._get_ranges(RANGES[:1])["X-Cache"], "MISS")
+        self.assertEqual(self._get_ranges(RANGES[:1])["X-Cache"], "HIT")
+
+    def test_ranges_from_the_first_day_of_the_calendar(self):
+        _create_food(self.user, date(2025, 8, 14), 2034.6 - (1000 + 44), 0, 0, 0)
+        resp = self._get_ranges([f"{date.min},{date.max}", f"{date.min},2025-07-01", "2025-08-14,2025-08-14"])
+
+        self.assertEqual(resp.status_code, 200)
+        self.assertEqual([summary["daysWithLogs"] for summary in resp.data["ranges"]], [45, 1, 1])
+        self.assertEqual(resp.data["ranges"][1]["summary"]["calories"]["totalConsumed"], 1000)
+        self.assertEqual(resp.data["ranges"][2]["summary"]["calories"]["totalConsumed"], 2034.6)
+
+    def test_most_ranges_per_request(self):
+        self.assertEqual(self._get_ranges(["2025-08-01,2025-08-02"] * MAX_RANGES).status_code, 200)
+
+        resp = self._get_ranges(["2025-08-01,2025-08-02"] * (MAX_RANGES + 1))
+
+        self.assertEqual(resp.status_code, 400)
+        self.assertIn(str(MAX_RANGES), str(resp.data["range"]))
+
+    def test_invalid_ranges(self):
+        for ranges in (
+            ["2025-08-01"],
+            ["2025-08-10,2025-08-01"],
+            ["2025-08-01,soon"],
+            ["2025-08-01,10000-01-01"],
+            [",2025-08-01"],
+        ):
+            with self.subTest(ranges=ranges):
+                resp = self._get_ranges(ranges)
+                self.assertEqual(resp.status_code, 400)
+                self.assertIn("range", resp.data)
@@ -0,0 +1,191 @@
+from datetime import date, timedelta
+from io import StringIO
+from unittest.mock import patch
+
+import numpy as np
+from django.contrib.auth.models import User
+from django.core.management import CommandError, call_command
+from django.db import IntegrityError
+from django.test import TestCase
+
+from analytics.macronutrients.prefix_sums import (
+    _refresh_day,
+    build_prefix_sums,
+    decode,
+    encode,
+    get_range_totals,
+    refresh_day,
+    running_totals,
+)
+from analytics.macronutrients.queries import get_macronutrient_totals
+from analytics.models import MacronutrientPrefixSums
+from goals.models import DailyMacronutrientGoal
+from intake.models import FoodEntry
+
+from .test_view import _create_food, _create_goal
+
+
+class MacronutrientPrefixSumsTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create(id=1, username="Test User")
+        cls.other_user = User.objects.create(id=2, username="Other User")
+
+    def _assert_matches_the_aggregate(self, start, end):
+        days_with_logs, consumed, goals = get_range_totals(self.user, start, end)
+        expected_days, expected_consumed, expected_goals = get_macronutrient_totals(self.user, start, end)
+
+        self.assertEqual(days_with_logs, expected_days)
+        self.assertEqual(consumed, expected_consumed)
+        self.assertEqual(goals, expected_goals)
+
+    def _assert_matches_a_rebuild(self):
+        stored = {
+            prefix_sums.year: decode(prefix_sums)
+            for prefix_sums in MacronutrientPrefixSums.objects.filter(user=self.user)
+        }
+        for year, expected in build_prefix_sums(self.user.id).items():
+            np.testing.assert_array_equal(stored[year], expected)
+
+    def test_ranges_match_the_aggregate_after_writes(self):
+        generator = np.random.default_rng(0)
+        start = date(2023, 11, 1)
+        entries = []
+        for _ in range(60):
+            day = start + timedelta(days=int(generator.integers(0, 500)))
+            entries.append(_create_food(self.user, day, *generator.integers(1, 1000, size=4).tolist()))
+        for offset in range(0, 500, 3):
+            _create_goal(self.user, start + timedelta(days=offset), 2000, 100, 250, 70)
+        _create_food(self.other_user, date(2024, 6, 1), 9999, 999, 999, 999)
+
+        # Moving an entry into another year, and deleting the last entry of a day.
+        with self.captureOnCommitCallbacks(execute=True):
+            entries[0].date = date(2025, 1, 1)
+            entries[0].save()
+        with self.captureOnCommitCallbacks(execute=True):
+            entries[1].delete()
+            DailyMacronutrientGoal.objects.filter(user=self.user).first().delete()
+
+        self._assert_matches_a_rebuild()
+        for _ in range(50):
+            first, last = sorted(start + timedelta(days=int(day)) for day in generator.integers(-30, 550, size=2))
+            with self.subTest(start=first, end=last):
+                self._assert_matches_the_aggregate(first, last)
+
+    def test_decimal_totals_are_exact(self):
+        _create_food(self.user, date(2024, 3, 1), 1034.6, 50.3, 120.1, 30.7)
+        _create_food(self.user, date(2024, 3, 1), 1000, 40, 100, 20)
+        for day in range(2, 30):
+            _create_food(self.user, date(2024, 3, day), 1234.56, 78.9, 150.35, 40.01)
+        _create_goal(self.user, date(2024, 3, 1), 2100.5, 120.2, 250.3, 70.4)
+
+        self._assert_matches_the_aggregate(date(2024, 3, 1), date(2024, 3, 1))
+        self.assertEqual(get_range_totals(self.user, date(2024, 3, 1), date(2024, 3, 1))[1]["calories"], 2034.6)
+        # Sums of many decimal days are only exact to the rounding of floats, which the running totals leave out.
+        _, consumed, _ = get_range_totals(self.user, date(2024, 3, 2), date(2024, 3, 29))
+        _, expected, _ = get_macronutrient_totals(self.user, date(2024, 3, 2), date(2024, 3, 29))
+        self.assertEqual(consumed, {nutrient: round(total, 6) for nutrient, total in expected.items()})
+
+    def test_first_running_totals_of_a_year_stored_concurrently(self):
+        _create_food(self.user, date(2023, 5, 1), 500, 25, 50, 15)
+
+        totals = running_totals(self.user.id, date(2023, 12, 31))
+        concurrent = MacronutrientPrefixSums(user=self.user, year=2024, sums=encode(np.tile(totals, (366, 1))))
+
+        def refresh_concurrently(user_id, day):
+            # Another transaction storing the first running totals of the year, so saving them again fails.
+            if concurrent.pk is None:
+                concurrent.save()
+                raise IntegrityError("UNIQUE constraint failed")
+            return _refresh_day(user_id, day)
+
+        with patch("analytics.macronutrients.prefix_sums._refresh_day", side_effect=refresh_concurrently):
+            _create_food(self.user, date(2024, 3, 1), 300, 15, 30, 10)
+
+        self._assert_matches_a_rebuild()
+        self.assertEqual(get_range_totals(self.user, date(2023, 1, 1), date(2024, 12, 31))[1]["calories"], 800)
+
+    def test_writes_of_a_transaction_are_applied_once_it_commits(self):
+        with self.captureOnCommitCallbacks() as callbacks:
+            for day in range(1, 4):
+                FoodEntry.objects.create(
+                    user=self.user,
+                    date=date(2024, 3, day),
+                    food_name="food",
+                    total_calories=500,
+                    total_protein=25,
+                    total_carbs=50,
+                    total_fats=15,
+                    food_weight=100,
+                )
+                DailyMacronutrientGoal.objects.create(
+                    user=self.user,
+                    date=date(2024, 3, day),
+                    goal_calories=2000,
+                    goal_protein=100,
+                    goal_carbs=250,
+                    goal_fats=70,
+                )
+            self.assertFalse(MacronutrientPrefixSums.objects.exists())
+
+        # One update of the running totals and one of the cache versions, whatever the number of writes.
+        self.assertEqual(len(callbacks), 2)
+        with patch("analytics.macronutrients.prefix_sums.refresh_day", wraps=refresh_day) as mock_refresh_day:
+            for callback in callbacks:
+                callback()
+        self.assertEqual(mock_refresh_day.call_count, 3)
+        self._assert_matches_a_rebuild()
+
+    def test_many_changed_days_are_rebuilt_at_once(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            for day in range(1, 31):
+                _create_food(self.user, date(2024, 3, day), 500, 25, 50, 15)
+
+        with patch("analytics.macronutrients.prefix_sums.refresh_day") as mock_refresh_day:
+            with self.captureOnCommitCallbacks(execute=True):
+                FoodEntry.objects.filter(user=self.user, date__gte=date(2024, 3, 11)).delete()
+
+        mock_refresh_day.assert_not_called()
+        self._assert_matches_a_rebuild()
+        self.assertEqual(get_range_totals(self.user, date(2024, 1, 1), date(2024, 12, 31))[1]["calories"], 5000)
+
+    def test_deleting_a_user(self):
+        for day in range(1, 31):
+            _create_food(self.user, date(2024, 3, day), 500, 25, 50, 15)
+
+        with patch("analytics.macronutrients.prefix_sums.build_prefix_sums") as mock_build_prefix_sums:
+            with self.captureOnCommitCallbacks(execute=True):
+                self.user.delete()
+
+        mock_build_prefix_sums.assert_not_called()
+        self.assertFalse(MacronutrientPrefixSums.objects.exists())
+
+    def test_years_without_logged_days(self):
+        _create_food(self.user, date(2022, 12, 31), 500, 25, 50, 15)
+        _create_food(self.user, date(2024, 1, 1), 300, 15, 30, 10)
+
+        self.assertEqual(get_range_totals(self.user, date(2023, 1, 1), date(2023, 12, 31))[0], 0)
+        self.assertEqual(get_range_totals(self.user, date(2020, 1, 1), date(2030, 1, 1))[1]["calories"], 800)
+        self.assertEqual(get_range_totals(self.user, date(2022, 12, 31), date(2024, 1, 1))[0], 2)
+        self.assertEqual(sorted(MacronutrientPrefixSums.objects.values_list("year", flat=True)), [2022, 2024])
+
+    def test_goal_only_counts_on_days_with_entries(self):
+        _create_goal(self.user, date(2024, 3, 1), 2000, 100, 250, 70)
+        self.assertFalse(MacronutrientPrefixSums.objects.exists())
+
+        _create_food(self.user, date(2024, 3, 1), 500, 25, 50, 15)
+
+        self.assertEqual(get_range_totals(self.user, date(2024, 3, 1), date(2024, 3, 1))[2]["calories"], 2000)
+
+    def test_rebuild_command(self):
+        _create_food(self.user, date(2024, 3, 1), 500, 25, 50, 15)
+        call_command("rebuild_macronutrient_prefix_sums", "--verify", stdout=StringIO())
+
+        FoodEntry.objects.filter(user=self.user).update(total_calories=100)
+        call_command("rebuild_daily_intake_summaries", stdout=StringIO())
+        with self.assertRaises(CommandError):
+            call_command("rebuild_macronutrient_prefix_sums", "--verify", stdout=StringIO())
+
+        call_command("rebuild_macronutrient_prefix_sums", stdout=StringIO())
+        call_command("rebuild_macronutrient_prefix_sums", "--verify", stdout=StringIO())
+        self.assertEqual(get_range_totals(self.user, date(2024, 1, 1), date(2024, 12, 31))[1]["calories"], 100)
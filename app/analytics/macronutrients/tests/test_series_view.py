@@ -0,0 +1,85 @@
+from datetime import date
+from unittest.mock import patch
+
+from django.contrib.auth.models import User
+from django.test import TestCase
+from django.urls import reverse
+from rest_framework.test import APIClient
+
+from analytics.macronutrients.cache import analytics_cache
+from analytics.macronutrients.urls import MACRONUTRIENT_SERIES_NAME
+
+from .test_view import _create_food, _create_goal
+
+
+class MacronutrientTimeSeriesViewTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        User.objects.create(id=1, username="Test User")
+
+    def setUp(self):
+        self.user = User.objects.get(id=1)
+        self.other_user = User.objects.create_user(username="other_user", password="pass1234")
+        self.client = APIClient()
+        self.client.force_authenticate(user=self.user)
+        self.url = reverse(MACRONUTRIENT_SERIES_NAME)
+
+        # Friday 1 August 2025 to Tuesday 2 September 2025.
+        _create_food(self.user, date(2025, 8, 1), 600, 30, 80, 20)
+        _create_food(self.user, date(2025, 8, 1), 400, 20, 40, 10)
+        _create_food(self.user, date(2025, 8, 5), 1000, 60, 120, 40)
+        _create_food(self.user, date(2025, 8, 6), 1500, 70, 150, 50)
+        _create_food(self.user, date(2025, 9, 2), 2000, 90, 200, 60)
+
+        _create_goal(self.user, date(2025, 8, 1), 2000, 50, 275, 70)
+        _create_goal(self.user, date(2025, 8, 5), 1900, 55, 260, 65)
+        # Goals of days without entries are left out.
+        _create_goal(self.user, date(2025, 8, 7), 2100, 60, 300, 80)
+
+        _create_food(self.other_user, date(2025, 8, 1), 9999, 999, 999, 999)
+
+    def _get(self, **params):
+        return self.client.get(self.url, {"start": "2025-08-01", "end": "2025-09-30", **params})
+
+    def test_daily_series(self):
+        resp = self._get()
+
+        self.assertEqual(resp.status_code, 200)
+        self.assertEqual(resp.data["bucket"], "day")
+        self.assertEqual(resp.data["dates"], ["2025-08-01", "2025-08-05", "2025-08-06", "2025-09-02"])
+        self.assertEqual(resp.data["daysWithLogs"], [1, 1, 1, 1])
+        self.assertEqual(resp.data["consumed"]["calories"], [1000, 1000, 1500, 2000])
+        self.assertEqual(resp.data["goal"]["calories"], [2000, 1900, 0, 0])
+
+    def test_weekly_series_starts_on_monday(self):
+        resp = self._get(bucket="week")
+
+        self.assertEqual(resp.data["dates"], ["2025-07-28", "2025-08-04", "2025-09-01"])
+        self.assertEqual(resp.data["daysWithLogs"], [1, 2, 1])
+        self.assertEqual(resp.data["consumed"]["protein"], [50, 130, 90])
+        self.assertEqual(resp.data["goal"]["protein"], [50, 55, 0])
+
+    def test_monthly_series(self):
+        resp = self._get(bucket="month")
+
+        self.assertEqual(resp.data["dates"], ["2025-08-01", "2025-09-01"])
+        self.assertEqual(resp.data["daysWithLogs"], [3, 1])
+        self.assertEqual(resp.data["consumed"]["fats"], [120, 60])
+        self.assertEqual(resp.data["goal"]["carbs"], [535, 0])
+
+    def test_series_is_a_single_query(self):
+        with patch.object(analytics_cache, "enabled", False), self.assertNumQueries(1):
+            self._get(bucket="week")
+
+    def test_empty_range(self):
+        resp = self.client.get(self.url, {"start": "2024-01-01", "end": "2024-12-31", "bucket": "month"})
+
+        self.assertEqual(resp.status_code, 200)
+        self.assertEqual(resp.data["dates"], [])
+        self.assertEqual(resp.data["consumed"]["calories"], [])
+
+    def test_invalid_bucket(self):
+        resp = self._get(bucket="year")
+
+        self.assertEqual(resp.status_code, 400)
+        self.assertIn("bucket", resp.data)
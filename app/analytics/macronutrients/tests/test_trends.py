@@ -0,0 +1,185 @@
+from datetime import date, timedelta
+
+import numpy as np
+from django.contrib.auth.models import User
+from django.test import SimpleTestCase, TestCase
+from django.urls import reverse
+from rest_framework.test import APIClient
+
+from analytics.macronutrients.trends import (
+    MAX_TREND_DAYS,
+    DailySeries,
+    compute_trends,
+    rolling_averages,
+    streaks,
+)
+from analytics.macronutrients.urls import MACRONUTRIENT_TRENDS_NAME
+
+from .test_view import _create_food, _create_goal
+
+START = date(2025, 8, 1)
+
+
+def _series(calories, goal=2000):
+    """
+    A series of calories only, where None is a day without entries.
+    """
+    series = DailySeries.empty(START, len(calories))
+    for day, value in enumerate(calories):
+        if value is not None:
+            series.logged[day] = True
+            series.consumed[day] = value
+            series.goals[day] = goal
+    return series
+
+
+class RollingAveragesTests(SimpleTestCase):
+
+    def test_average_of_logged_days_in_window(self):
+        series = _series([1000, 2000, None, 3000, 4000])
+
+        averages = rolling_averages(series, 3)[:, 0]
+
+        np.testing.assert_allclose(averages, [1000, 1500, 1500, 2500, 3500])
+
+    def test_window_without_logged_days_is_nan(self):
+        series = _series([1000, None, None, 2000])
+
+        averages = rolling_averages(series, 2)[:, 0]
+
+        np.testing.assert_allclose(averages, [1000, 1000, np.nan, 2000])
+
+
+class StreaksTests(SimpleTestCase):
+
+    def test_current_and_longest_streaks(self):
+        adherent = np.array([[1, 0], [1, 0], [0, 1], [1, 0], [1, 1], [1, 1]], dtype=bool)
+
+        self.assertEqual(streaks(adherent), ([3, 2], [3, 2]))
+
+    def test_streak_broken_on_the_last_day(self):
+        adherent = np.array([[1], [1], [0]], dtype=bool)
+
+        self.assertEqual(streaks(adherent), ([0], [2]))
+
+    def test_no_days(self):
+        self.assertEqual(streaks(np.zeros((0, 4), dtype=bool)), ([0] * 4, [0] * 4))
+
+
+class ComputeTrendsTests(SimpleTestCase):
+
+    def test_adherence_and_best_and_worst_days(self):
+        # Within 10% of the goal of 2000 kcal, 1900 and 2100 adhere while 1500 and 2600 do not.
+        series = _series([1900, 2100, None, 1500, 2000, 2600, 2050])
+
+        calories = compute_trends(series)["nutrients"]["calories"]
+
+        self.assertAlmostEqual(calories["adherencePercentage"], 4 / 6 * 100)
+        self.assertEqual(calories["currentStreak"], 1)
+        self.assertEqual(calories["longestStreak"], 2)
+        self.assertEqual(calories["bestDay"], {"date": date(2025, 8, 5), "consumed": 2000, "goal": 2000})
+        self.assertEqual(calories["worstDay"]["date"], date(2025, 8, 6))
+
+    def test_days_without_goals_are_not_rated(self):
+        series = _series([1900, 2100], goal=np.nan)
+
+        trends = compute_trends(series)
+
+        self.assertEqual(trends["daysWithLogs"], 2)
+        self.assertEqual(trends["nutrients"]["calories"]["adherencePercentage"], 0.0)
+        self.assertIsNone(trends["nutrients"]["calories"]["bestDay"])
+
+    def test_history_only_counts_toward_rolling_averages(self):
+        series = _series([1000, 1000, 2000, None])
+
+        trends = compute_trends(series, history=2)
+
+        self.assertEqual(trends["dates"], [date(2025, 8, 3), date(2025, 8, 4)])
+        self.assertEqual(trends["daysWithLogs"], 1)
+        self.assertEqual(trends["rollingAverages"]["sevenDay"]["calories"], [1333.33, 1333.33])
+        self.assertEqual(trends["nutrients"]["calories"]["longestStreak"], 1)
+        self.assertEqual(trends["nutrients"]["calories"]["bestDay"]["date"], date(2025, 8, 3))
+
+    def test_rolling_averages_are_columnar(self):
+        trends = compute_trends(_series([1000, None, 2000]))
+
+        self.assertEqual(trends["dates"], [date(2025, 8, 1), date(2025, 8, 2), date(2025, 8, 3)])
+        self.assertEqual(trends["rollingAverages"]["sevenDay"]["calories"], [1000, 1000, 1500])
+
+
+class MacronutrientTrendsViewTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        User.objects.create(id=1, username="Test User")
+
+    def setUp(self):
+        self.user = User.objects.get(id=1)
+        self.client = APIClient()
+        self.client.force_authenticate(user=self.user)
+        self.url = reverse(MACRONUTRIENT_TRENDS_NAME)
+
+    def test_trends(self):
+        _create_food(self.user, date(2025, 8, 1), 1000, 40, 100, 30)
+        _create_food(self.user, date(2025, 8, 1), 1000, 40, 100, 30)
+        _create_food(self.user, date(2025, 8, 3), 1500, 60, 150, 50)
+        _create_goal(self.user, date(2025, 8, 1), 2000, 80, 200, 60)
+        _create_goal(self.user, date(2025, 8, 3), 2000, 80, 200, 60)
+
+        resp = self.client.get(self.url, {"start": "2025-08-01", "end": "2025-08-03"})
+
+        self.assertEqual(resp.status_code, 200)
+        self.assertEqual(resp.data["daysWithLogs"], 2)
+        self.assertEqual(resp.data["dates"], ["2025-08-01", "2025-08-02", "2025-08-03"])
+        self.assertEqual(resp.data["rollingAverages"]["sevenDay"]["calories"], [2000, 2000, 1750])
+        self.assertEqual(resp.data["rollingAverages"]["thirtyDay"]["protein"], [80, 80, 70])
+
+        calories = resp.data["nutrients"]["calories"]
+        self.assertAlmostEqual(calories["adherencePercentage"], 50)
+        self.assertEqual(calories["longestStreak"], 1)
+        self.assertEqual(calories["currentStreak"], 0)
+        self.assertEqual(calories["bestDay"]["date"], "2025-08-01")
+        self.assertEqual(calories["worstDay"]["date"], "2025-08-03")
+
+    def test_rolling_averages_include_days_before_the_range(self):
+        _create_food(self.user, date(2025, 7, 3), 3000, 40, 100, 30)
+        _create_food(self.user, date(2025, 7, 31), 1000, 40, 100, 30)
+        _create_food(self.user, date(2025, 8, 1), 2000, 40, 100, 30)
+
+        resp = self.client.get(self.url, {"start": "2025-08-01", "end": "2025-08-02"})
+
+        self.assertEqual(resp.data["daysWithLogs"], 1)
+        self.assertEqual(resp.data["rollingAverages"]["sevenDay"]["calories"], [1500, 1500])
+        self.assertEqual(resp.data["rollingAverages"]["thirtyDay"]["calories"], [2000, 1500])
+
+    def test_range_from_the_first_day_of_the_calendar(self):
+        resp = self.client.get(self.url, {"start": "0001-01-01", "end": "0001-01-02"})
+
+        self.assertEqual(resp.status_code, 200)
+        self.assertEqual(len(resp.data["dates"]), 2)
+
+    def test_multi_year_range(self):
+        _create_food(self.user, date(2016, 1, 1), 1000, 40, 100, 30)
+        _create_food(self.user, date(2025, 12, 31), 2000, 40, 100, 30)
+
+        resp = self.client.get(self.url, {"start": "2016-01-01", "end": "2025-12-31"})
+
+        self.assertEqual(resp.status_code, 200)
+        self.assertEqual(len(resp.data["dates"]), 3653)
+        self.assertEqual(resp.data["daysWithLogs"], 2)
+        self.assertEqual(resp.data["rollingAverages"]["sevenDay"]["calories"][-1], 2000)
+
+    def test_longest_range(self):
+        start = date(2000, 1, 1)
+        longest = {"start": str(start), "end": str(start + timedelta(days=MAX_TREND_DAYS - 1))}
+        self.assertEqual(self.client.get(self.url, longest).status_code, 200)
+
+        too_long = {"start": str(start), "end": str(start + timedelta(days=MAX_TREND_DAYS))}
+        self.assertEqual(self.client.get(self.url, too_long).status_code, 400)
+
+    def test_empty_range(self):
+        resp = self.client.get(self.url, {"start": "2025-08-01", "end": "2025-08-02"})
+
+        self.assertEqual(resp.status_code, 200)
+        self.assertEqual(resp.data["daysWithLogs"], 0)
+        self.assertEqual(resp.data["rollingAverages"]["sevenDay"]["fats"], [None, None])
+        self.assertIsNone(resp.data["nutrients"]["fats"]["bestDay"])
@@ -1,37 +1,42 @@
 from datetime import date, timedelta
+from unittest.mock import patch
 
 from django.contrib.auth.models import User
 from django.test import TestCase
 from django.urls import reverse
 from rest_framework.test import APIClient
 
+from analytics.macronutrients.cache import analytics_cache
 from analytics.macronutrients.urls import MACRONUTRIENT_SUMMARY_NAME
 from goals.models import DailyMacronutrientGoal
 from intake.models import FoodEntry
 
 
 def _create_food(user, d, cals, protein, carbs, fats, name="food"):
-    return FoodEntry.objects.create(
-        user=user,
-        date=d,
-        food_name=name,
-        total_calories=cals,
-        total_protein=protein,
-        total_carbs=carbs,
-        total_fats=fats,
-        food_weight=100.0,
-    )
+    # The running totals are updated once the transaction commits, which a test case never does.
+    with TestCase.captureOnCommitCallbacks(execute=True):
+        return FoodEntry.objects.create(
+            user=user,
+            date=d,
+            food_name=name,
+            total_calories=cals,
+            total_protein=protein,
+            total_carbs=carbs,
+            total_fats=fats,
+            food_weight=100.0,
+        )
 
 
 def _create_goal(user, d, cals, protein, carbs, fats):
-    return DailyMacronutrientGoal.objects.create(
-        user=user,
-        date=d,
-        goal_calories=cals,
-        goal_protein=protein,
-        goal_carbs=carbs,
-        goal_fats=fats,
-    )
+    with TestCase.captureOnCommitCallbacks(execute=True):
+        return DailyMacronutrientGoal.objects.create(
+            user=user,
+            date=d,
+            goal_calories=cals,
+            goal_protein=protein,
+            goal_carbs=carbs,
+            goal_fats=fats,
+        )
 
 
 class MacronutrientAnalyticsViewTests(TestCase):
@@ -184,3 +189,26 @@ class MacronutrientAnalyticsViewTests(TestCase):
 
         # Average
         self.assertAlmostEqual(s["calories"]["averageConsumed"], food_cals)
+
+    def test_summary_is_a_single_query(self):
+        for days in range(7):
+            _create_food(self.user, self._d(days), 500, 25, 50, 15)
+            _create_food(self.user, self._d(days), 300, 15, 30, 10)
+            _create_goal(self.user, self._d(days), 2000, 50, 275, 70)
+
+        with patch.object(analytics_cache, "enabled", False), self.assertNumQueries(1):
+            resp = self.client.get(self.url, {"start": self.start.isoformat(), "end": self.end.isoformat()})
+
+        self.assertEqual(resp.status_code, 200)
+        self.assertEqual(resp.data["daysWithLogs"], 7)
+        self.assertAlmostEqual(resp.data["summary"]["calories"]["totalConsumed"], 7 * 800.0)
+        self.assertAlmostEqual(resp.data["summary"]["calories"]["totalGoal"], 7 * 2000.0)
+
+    def test_range_from_the_first_day_of_the_calendar(self):
+        _create_food(self.user, self.start, 500, 25, 50, 15)
+
+        resp = self.client.get(self.url, {"start": date.min.isoformat(), "end": date.max.isoformat()})
+
+        self.assertEqual(resp.status_code, 200)
+        self.assertEqual(resp.data["daysWithLogs"], 1)
+        self.assertEqual(resp.data["summary"]["calories"]["totalConsumed"], 500)
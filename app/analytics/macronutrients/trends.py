@@ -0,0 +1,181 @@
+from datetime import timedelta
+
+import numpy as np
+from django.db.models import FloatField, OuterRef, Subquery
+
+from goals.models import DailyMacronutrientGoal
+from intake.models import DailyIntakeSummary
+
+from .queries import CONSUMED_FIELDS, GOAL_FIELDS, MACRONUTRIENTS
+
+ROLLING_WINDOWS = {"sevenDay": 7, "thirtyDay": 30}
+# The days before the range loaded so the rolling averages of its first days cover whole windows.
+HISTORY_DAYS = max(ROLLING_WINDOWS.values()) - 1
+# The most days of trends computed by a single request, 20 years. Even then the arrays are a few hundred KB.
+MAX_TREND_DAYS = 20 * 366
+
+# A day adheres to the goal of a macronutrient when the amount consumed is within 10% of the goal.
+ADHERENCE_TOLERANCE = 0.1
+
+
+class DailySeries:
+    """
+    A user's daily macronutrient totals and goals, one row per calendar day from `start` and one column per
+    `MACRONUTRIENTS`. Days without food entries are not `logged`, and goals missing or not counted are NaN.
+    """
+
+    def __init__(self, start, consumed, goals, logged):
+        self.start = start
+        self.consumed = consumed
+        self.goals = goals
+        self.logged = logged
+
+    def __len__(self):
+        return len(self.logged)
+
+    def skip(self, days):
+        """
+        The series without its first `days` days.
+        """
+        return DailySeries(
+            self.start + timedelta(days=days), self.consumed[days:], self.goals[days:], self.logged[days:]
+        )
+
+    @classmethod
+    def empty(cls, start, days):
+        return cls(
+            start,
+            consumed=np.zeros((days, len(MACRONUTRIENTS))),
+            goals=np.full((days, len(MACRONUTRIENTS)), np.nan),
+            logged=np.zeros(days, dtype=bool),
+        )
+
+
+def load_daily_series(user, start, end):
+    """
+    Loads the daily intake summaries of the user between `start` and `end` and the goals of the same days with a single
+    query. Like the summary, goals only count on days with food entries.
+    """
+    series = DailySeries.empty(start, (end - start).days + 1)
+    goals = DailyMacronutrientGoal.objects.filter(user=user, date=OuterRef("date"))
+    rows = list(
+        DailyIntakeSummary.objects.filter(user=user, date__range=(start, end))
+        .annotate(
+            **{
+                f"goal_{nutrient}": Subquery(goals.values(field)[:1], output_field=FloatField())
+                for nutrient, field in GOAL_FIELDS.items()
+            }
+        )
+        .values_list(
+            "date",
+            *CONSUMED_FIELDS.values(),
+            *(f"goal_{nutrient}" for nutrient in MACRONUTRIENTS),
+        )
+    )
+    if not rows:
+        return series
+
+    days = np.fromiter(((row[0] - start).days for row in rows), dtype=np.intp, count=len(rows))
+    # Missing goals are None, which becomes NaN.
+    values = np.array([row[1:] for row in rows], dtype=float)
+    series.logged[days] = True
+    series.consumed[days] = values[:, : len(MACRONUTRIENTS)]
+    series.goals[days] = values[:, len(MACRONUTRIENTS) :]
+    return series
+
+
+def rolling_averages(series, window):
+    """
+    The average consumed over the logged days of the `window` days ending on each day, or NaN when none of them were
+    logged. Every window is the difference of two prefix sums, so the cost does not depend on the window.
+    """
+    consumed = np.where(series.logged[:, None], series.consumed, 0.0)
+    totals = np.concatenate((np.zeros((1, consumed.shape[1])), np.cumsum(consumed, axis=0)))
+    counts = np.concatenate(([0], np.cumsum(series.logged)))
+
+    ends = np.arange(1, len(series) + 1)
+    starts = np.maximum(ends - window, 0)
+    window_totals = totals[ends] - totals[starts]
+    window_counts = (counts[ends] - counts[starts])[:, None]
+    with np.errstate(invalid="ignore", divide="ignore"):
+        return np.where(window_counts > 0, window_totals / window_counts, np.nan)
+
+
+def streaks(adherent):
+    """
+    Returns the current and the longest run of consecutive adherent days of each column, where the current run is the
+    one ending on the last day.
+    """
+    padded = np.zeros((adherent.shape[0] + 2, adherent.shape[1]), dtype=np.int8)
+    padded[1:-1] = adherent
+    changes = np.diff(padded, axis=0)
+
+    current, longest = [], []
+    for column in range(adherent.shape[1]):
+        run_starts = np.flatnonzero(changes[:, column] == 1)
+        run_ends = np.flatnonzero(changes[:, column] == -1)
+        lengths = run_ends - run_starts
+        longest.append(int(lengths.max()) if len(lengths) else 0)
+        current.append(int(lengths[-1]) if len(lengths) and run_ends[-1] == adherent.shape[0] else 0)
+    return current, longest
+
+
+def _day(series, index, column):
+    return {
+        "date": series.start + timedelta(days=int(index)),
+        "consumed": float(series.consumed[index, column]),
+        "goal": float(series.goals[index, column]),
+    }
+
+
+def _column(values):
+    """
+    Rounds a series for the response, with NaN as None.
+    """
+    rounded = np.round(values, 2).astype(object)
+    rounded[np.isnan(values)] = None
+    return rounded.tolist()
+
+
+def compute_trends(series, history=0):
+    """
+    Computes the trends of a `DailySeries` with array operations over every day at once, leaving out its first
+    `history` days, which only count toward the rolling averages of the days after them,
+
+    - Rolling averages of each `ROLLING_WINDOWS` ending on each day.
+    - The percentage of logged days with a goal that adhered to it, see `ADHERENCE_TOLERANCE`.
+    - The current and longest streak of consecutive adherent days.
+    - The best and worst day, the days closest to and furthest from the goal relative to it.
+    """
+    averages = {name: rolling_averages(series, window)[history:] for name, window in ROLLING_WINDOWS.items()}
+    series = series.skip(history)
+
+    with np.errstate(invalid="ignore", divide="ignore"):
+        eligible = series.logged[:, None] & (series.goals > 0)
+        deviation = np.where(eligible, np.abs(series.consumed - series.goals) / series.goals, np.nan)
+    adherent = eligible & (deviation <= ADHERENCE_TOLERANCE)
+
+    eligible_days = eligible.sum(axis=0)
+    adherent_days = adherent.sum(axis=0)
+    current_streaks, longest_streaks = streaks(adherent)
+
+    nutrients = {}
+    for column, nutrient in enumerate(MACRONUTRIENTS):
+        has_goals = bool(eligible_days[column])
+        nutrients[nutrient] = {
+            "adherencePercentage": float(adherent_days[column] / eligible_days[column] * 100) if has_goals else 0.0,
+            "currentStreak": current_streaks[column],
+            "longestStreak": longest_streaks[column],
+            "bestDay": _day(series, np.nanargmin(deviation[:, column]), column) if has_goals else None,
+            "worstDay": _day(series, np.nanargmax(deviation[:, column]), column) if has_goals else None,
+        }
+
+    return {
+        "daysWithLogs": int(series.logged.sum()),
+        "dates": (np.datetime64(series.start, "D") + np.arange(len(series))).tolist(),
+        "rollingAverages": {
+            name: dict(zip(MACRONUTRIENTS, map(_column, window_averages.T)))
+            for name, window_averages in averages.items()
+        },
+        "nutrients": nutrients,
+    }
@@ -1,9 +1,20 @@
 from django.urls import path
 
-from .views import MacronutrientAnalyticsView
+from .views import (
+    AnalyticsCacheStatsView,
+    MacronutrientAnalyticsView,
+    MacronutrientTimeSeriesView,
+    MacronutrientTrendsView,
+)
 
 MACRONUTRIENT_SUMMARY_NAME = "macronutrient-summary-analytics"
+MACRONUTRIENT_SERIES_NAME = "macronutrient-series-analytics"
+MACRONUTRIENT_TRENDS_NAME = "macronutrient-trends-analytics"
+ANALYTICS_CACHE_STATS_NAME = "analytics-cache-stats"
 
 urlpatterns = [
     path("macronutrients/summary", MacronutrientAnalyticsView.as_view(), name=MACRONUTRIENT_SUMMARY_NAME),
+    path("macronutrients/series", MacronutrientTimeSeriesView.as_view(), name=MACRONUTRIENT_SERIES_NAME),
+    path("macronutrients/trends", MacronutrientTrendsView.as_view(), name=MACRONUTRIENT_TRENDS_NAME),
+    path("cache/stats", AnalyticsCacheStatsView.as_view(), name=ANALYTICS_CACHE_STATS_NAME),
 ]
@@ -1,14 +1,33 @@
-from django.db.models import Sum
+from datetime import date, timedelta
+
 from drf_yasg import openapi
 from drf_yasg.utils import swagger_auto_schema
 from rest_framework import status
+from rest_framework.permissions import IsAdminUser
 from rest_framework.response import Response
 from rest_framework.views import APIView
 
-from goals.models import DailyMacronutrientGoal
-from intake.models import FoodEntry
-
-from .serializers import AnalyticsQuerySerializer, AnalyticsResponseSerializer
+from .cache import analytics_cache, analytics_response
+from .prefix_sums import get_ranges_totals
+from .queries import BUCKETS, MACRONUTRIENTS, get_macronutrient_series
+from .serializers import (
+    MAX_RANGES,
+    AnalyticsQuerySerializer,
+    AnalyticsResponseSerializer,
+    MultiRangeQuerySerializer,
+    MultiRangeResponseSerializer,
+    TimeSeriesQuerySerializer,
+    TimeSeriesResponseSerializer,
+    TrendsQuerySerializer,
+    TrendsResponseSerializer,
+)
+from .trends import (
+    ADHERENCE_TOLERANCE,
+    HISTORY_DAYS,
+    MAX_TREND_DAYS,
+    compute_trends,
+    load_daily_series,
+)
 
 
 def _default_payload(start, end):
@@ -31,65 +50,183 @@ def _default_payload(start, end):
     }
 
 
+def _summary_payload(start, end, totals):
+    days_with_logs, consumed_totals, goal_totals = totals
+
+    if days_with_logs == 0:
+        return _default_payload(start, end)
+
+    summary = {
+        nutrient: {
+            "totalConsumed": consumed_totals[nutrient],
+            "totalGoal": goal_totals[nutrient],
+            "percentageOfGoal": (
+                0 if goal_totals[nutrient] == 0 else (consumed_totals[nutrient] / goal_totals[nutrient]) * 100
+            ),
+            "averageConsumed": consumed_totals[nutrient] / days_with_logs,
+        }
+        for nutrient in MACRONUTRIENTS
+    }
+
+    return {
+        "startDate": start,
+        "endDate": end,
+        "daysWithLogs": days_with_logs,
+        "summary": summary,
+    }
+
+
+def _summary_data(user, start, end):
+    (totals,) = get_ranges_totals(user, [(start, end)])
+    return AnalyticsResponseSerializer(_summary_payload(start, end, totals)).data
+
+
+def _multi_range_summary_data(user, ranges):
+    payloads = [
+        _summary_payload(start, end, totals) for (start, end), totals in zip(ranges, get_ranges_totals(user, ranges))
+    ]
+    return MultiRangeResponseSerializer({"ranges": payloads}).data
+
+
+def _series_data(user, start, end, bucket):
+    payload = {
+        "startDate": start,
+        "endDate": end,
+        "bucket": bucket,
+        **get_macronutrient_series(user, start, end, bucket),
+    }
+    return TimeSeriesResponseSerializer(payload).data
+
+
+def _trends_data(user, start, end):
+    history = min(HISTORY_DAYS, (start - date.min).days)
+    payload = {
+        "startDate": start,
+        "endDate": end,
+        **compute_trends(load_daily_series(user, start - timedelta(days=history), end), history),
+    }
+    return TrendsResponseSerializer(payload).data
+
+
 class MacronutrientAnalyticsView(APIView):
     @swagger_auto_schema(
+        operation_description="The consumed and goal totals of each macronutrient between `start` and `end`. To "
+        "compare periods, such as this and last week, pass one `range` per period instead, which returns "
+        '`{"ranges": [...]}` with a summary per range in the same order, all read by a single query.',
         manual_parameters=[
-            openapi.Parameter("start", openapi.IN_QUERY, type=openapi.TYPE_STRING, format="date", required=True),
-            openapi.Parameter("end", openapi.IN_QUERY, type=openapi.TYPE_STRING, format="date", required=True),
+            openapi.Parameter("start", openapi.IN_QUERY, type=openapi.TYPE_STRING, format="date", required=False),
+            openapi.Parameter("end", openapi.IN_QUERY, type=openapi.TYPE_STRING, format="date", required=False),
+            openapi.Parameter(
+                "range",
+                openapi.IN_QUERY,
+                description=f"Up to {MAX_RANGES} ranges, each a start and an end date separated by a comma, such as "
+                "2025-08-01,2025-08-07.",
+                type=openapi.TYPE_ARRAY,
+                items=openapi.Items(type=openapi.TYPE_STRING),
+                collection_format="multi",
+                required=False,
+            ),
         ],
         responses={200: openapi.Response("Analytics", AnalyticsResponseSerializer)},
     )
     def get(self, request):
+        if "range" in request.query_params:
+            return self._get_ranges(request)
+
         query = AnalyticsQuerySerializer(data=request.query_params)
         query.is_valid(raise_exception=True)
 
         start = query.validated_data["start"]
         end = query.validated_data["end"]
 
-        entries_qs = FoodEntry.objects.filter(user=request.user, date__range=(start, end))
-        entry_dates = entries_qs.values("date").distinct()
-        days_with_logs = entry_dates.count()
+        data, hit = analytics_cache.get_or_compute(
+            request.user.id, "summary", {"start": start, "end": end}, lambda: _summary_data(request.user, start, end)
+        )
+        return analytics_response(data, hit)
 
-        if days_with_logs == 0:
-            payload = _default_payload(start, end)
-            return Response(AnalyticsResponseSerializer(payload).data, status=status.HTTP_200_OK)
+    def _get_ranges(self, request):
+        query = MultiRangeQuerySerializer(data=request.query_params)
+        query.is_valid(raise_exception=True)
 
-        goals_qs = DailyMacronutrientGoal.objects.filter(
-            user=request.user,
-            date__in=entry_dates,
+        ranges = query.validated_data["range"]
+        data, hit = analytics_cache.get_or_compute(
+            request.user.id, "summaries", {"ranges": ranges}, lambda: _multi_range_summary_data(request.user, ranges)
         )
+        return analytics_response(data, hit)
 
-        consumed_totals = entries_qs.aggregate(
-            calories=Sum("total_calories"),
-            protein=Sum("total_protein"),
-            carbs=Sum("total_carbs"),
-            fats=Sum("total_fats"),
+
+class MacronutrientTimeSeriesView(APIView):
+    @swagger_auto_schema(
+        operation_description="Consumed and goal totals of each macronutrient per day, week or month, for charts. "
+        "Only buckets with food entries are returned.",
+        manual_parameters=[
+            openapi.Parameter("start", openapi.IN_QUERY, type=openapi.TYPE_STRING, format="date", required=True),
+            openapi.Parameter("end", openapi.IN_QUERY, type=openapi.TYPE_STRING, format="date", required=True),
+            openapi.Parameter(
+                "bucket",
+                openapi.IN_QUERY,
+                description="The length of each bucket. Weeks start on Monday. Defaults to day.",
+                type=openapi.TYPE_STRING,
+                enum=list(BUCKETS),
+                required=False,
+            ),
+        ],
+        responses={200: openapi.Response("Time series", TimeSeriesResponseSerializer)},
+    )
+    def get(self, request):
+        query = TimeSeriesQuerySerializer(data=request.query_params)
+        query.is_valid(raise_exception=True)
+
+        start = query.validated_data["start"]
+        end = query.validated_data["end"]
+        bucket = query.validated_data["bucket"]
+
+        data, hit = analytics_cache.get_or_compute(
+            request.user.id,
+            "series",
+            {"start": start, "end": end, "bucket": bucket},
+            lambda: _series_data(request.user, start, end, bucket),
         )
+        return analytics_response(data, hit)
+
+
+class MacronutrientTrendsView(APIView):
+    @swagger_auto_schema(
+        operation_description="Rolling 7 and 30 day averages of each macronutrient for every day of the range, and "
+        f"how well each goal was kept to. A day adheres to a goal when it is within {ADHERENCE_TOLERANCE:.0%} of it, "
+        "streaks count consecutive adherent days and the best and worst days are the closest to and furthest from "
+        f"the goal. The range can be at most {MAX_TREND_DAYS} days.",
+        manual_parameters=[
+            openapi.Parameter("start", openapi.IN_QUERY, type=openapi.TYPE_STRING, format="date", required=True),
+            openapi.Parameter("end", openapi.IN_QUERY, type=openapi.TYPE_STRING, format="date", required=True),
+        ],
+        responses={200: openapi.Response("Trends", TrendsResponseSerializer)},
+    )
+    def get(self, request):
+        query = TrendsQuerySerializer(data=request.query_params)
+        query.is_valid(raise_exception=True)
+
+        start = query.validated_data["start"]
+        end = query.validated_data["end"]
 
-        goal_totals = goals_qs.aggregate(
-            calories=Sum("goal_calories", default=0),
-            protein=Sum("goal_protein", default=0),
-            carbs=Sum("goal_carbs", default=0),
-            fats=Sum("goal_fats", default=0),
+        data, hit = analytics_cache.get_or_compute(
+            request.user.id, "trends", {"start": start, "end": end}, lambda: _trends_data(request.user, start, end)
         )
+        return analytics_response(data, hit)
 
-        summary = {
-            nutrient: {
-                "totalConsumed": consumed_totals[nutrient],
-                "totalGoal": goal_totals[nutrient],
-                "percentageOfGoal": (
-                    0 if goal_totals[nutrient] == 0 else (consumed_totals[nutrient] / goal_totals[nutrient]) * 100
-                ),
-                "averageConsumed": consumed_totals[nutrient] / days_with_logs,
-            }
-            for nutrient in ["calories", "protein", "carbs", "fats"]
-        }
 
-        payload = {
-            "startDate": start,
-            "endDate": end,
-            "daysWithLogs": days_with_logs,
-            "summary": summary,
-        }
+class AnalyticsCacheStatsView(APIView):
+    permission_classes = [IsAdminUser]
 
-        return Response(AnalyticsResponseSerializer(payload).data, status=status.HTTP_200_OK)
+    @swagger_auto_schema(
+        operation_description="The hits and misses of the analytics response cache since the serving worker started. "
+        "Only available to staff users.",
+        responses={
+            200: openapi.Response(
+                description="The cache statistics of the serving worker.",
+                examples={"application/json": {"enabled": True, "hits": 90, "misses": 10, "hitRatio": 0.9}},
+            )
+        },
+    )
+    def get(self, request):
+        return Response({"enabled": analytics_cache.enabled, **analytics_cache.stats()}, status=status.HTTP_200_OK)
@@ -0,0 +1,63 @@
+import numpy as np
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand, CommandError
+
+from analytics.macronutrients.prefix_sums import (
+    build_prefix_sums,
+    decode,
+    rebuild_prefix_sums,
+)
+from analytics.models import MacronutrientPrefixSums
+
+
+def _find_differences(user_id):
+    """
+    Compares the stored running totals of the user with the ones built from the daily intake summaries, returning the
+    number of years with logged days missing running totals, and holding the wrong running totals. Years without
+    logged days are left out, as their running totals are the ones of the year before.
+    """
+    stored = {
+        prefix_sums.year: decode(prefix_sums) for prefix_sums in MacronutrientPrefixSums.objects.filter(user_id=user_id)
+    }
+    missing = different = 0
+    for year, expected in build_prefix_sums(user_id).items():
+        sums = stored.pop(year, None)
+        if sums is None:
+            missing += 1
+        elif not np.array_equal(sums, expected):
+            different += 1
+    return missing, different
+
+
+class Command(BaseCommand):
+    help = (
+        "Checks the macronutrient running totals against the daily intake summaries and rebuilds them. Running totals "
+        "are kept up to date as entries and goals are saved, so this is only needed after they were changed without "
+        "signals, such as by `QuerySet.update`."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--verify",
+            action="store_true",
+            help="Only check the running totals, failing when any of them differ from the daily intake summaries.",
+        )
+
+    def handle(self, *args, **options):
+        user_ids = list(User.objects.values_list("id", flat=True))
+        if options["verify"]:
+            missing = different = 0
+            for user_id in user_ids:
+                user_missing, user_different = _find_differences(user_id)
+                missing += user_missing
+                different += user_different
+            if missing or different:
+                raise CommandError(f"{missing} missing and {different} incorrect years of macronutrient running totals")
+            self.stdout.write(
+                self.style.SUCCESS("Every macronutrient running total matches the daily intake summaries")
+            )
+            return
+
+        for user_id in user_ids:
+            rebuild_prefix_sums(user_id)
+        self.stdout.write(self.style.SUCCESS(f"Rebuilt the macronutrient running totals of {len(user_ids)} users"))
@@ -0,0 +1,38 @@
+# Generated by Django 4.2.7 on 2026-10-17 18:01
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+        ("auth", "0012_alter_user_first_name_max_length"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="EnergyExpenditureEstimate",
+            fields=[
+                (
+                    "user",
+                    models.OneToOneField(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        primary_key=True,
+                        serialize=False,
+                        to=settings.AUTH_USER_MODEL,
+                    ),
+                ),
+                ("through_date", models.DateField()),
+                ("through_trend_kg", models.FloatField()),
+                ("observation_count", models.PositiveIntegerField(default=0)),
+                ("weight_total", models.FloatField(default=0)),
+                ("weight_squares_total", models.FloatField(default=0)),
+                ("mean_calories", models.FloatField(default=0)),
+                ("squared_deviations", models.FloatField(default=0)),
+            ],
+        ),
+    ]
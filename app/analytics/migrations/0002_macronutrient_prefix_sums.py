@@ -0,0 +1,73 @@
+# Generated by Django 4.2.7 on 2026-10-17 18:05
+
+import calendar
+from datetime import date
+
+import django.db.models.deletion
+import numpy as np
+from django.conf import settings
+from django.db import migrations, models
+
+CONSUMED_FIELDS = ("total_calories", "total_protein", "total_carbs", "total_fats")
+GOAL_FIELDS = ("goal_calories", "goal_protein", "goal_carbs", "goal_fats")
+# Running totals are stored as integers in millionths.
+SCALE = 10**6
+
+
+def build_existing_prefix_sums(apps, schema_editor):
+    DailyIntakeSummary = apps.get_model("intake", "DailyIntakeSummary")
+    DailyMacronutrientGoal = apps.get_model("goals", "DailyMacronutrientGoal")
+    MacronutrientPrefixSums = apps.get_model("analytics", "MacronutrientPrefixSums")
+
+    goals = {
+        (user_id, day): values
+        for user_id, day, *values in DailyMacronutrientGoal.objects.values_list("user_id", "date", *GOAL_FIELDS)
+    }
+    days_by_user = {}
+    for user_id, day, *consumed in DailyIntakeSummary.objects.order_by("date").values_list(
+        "user_id", "date", *CONSUMED_FIELDS
+    ):
+        days_by_user.setdefault(user_id, []).append((day, [1, *consumed, *goals.get((user_id, day), [0] * 4)]))
+
+    for user_id, days in days_by_user.items():
+        first_year, last_year = days[0][0].year, days[-1][0].year
+        start = date(first_year, 1, 1)
+        daily = np.zeros(((date(last_year, 12, 31) - start).days + 1, 9))
+        for day, values in days:
+            daily[(day - start).days] = values
+        sums = np.cumsum(np.rint(daily * SCALE).astype(np.int64), axis=0)
+        prefix_sums = []
+        for year in sorted({day.year for day, _ in days}):
+            offset = (date(year, 1, 1) - start).days
+            year_sums = sums[offset : offset + (366 if calendar.isleap(year) else 365)]
+            prefix_sums.append(MacronutrientPrefixSums(user_id=user_id, year=year, sums=year_sums.tobytes()))
+        MacronutrientPrefixSums.objects.bulk_create(prefix_sums)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ("analytics", "0001_energy_expenditure_estimate"),
+        ("goals", "0003_alter_dailymacronutrientgoal_goal_calories_and_more"),
+        ("intake", "0004_daily_intake_summary"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="MacronutrientPrefixSums",
+            fields=[
+                ("id", models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name="ID")),
+                ("year", models.PositiveSmallIntegerField()),
+                ("sums", models.BinaryField()),
+                ("user", models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to=settings.AUTH_USER_MODEL)),
+            ],
+        ),
+        migrations.AddConstraint(
+            model_name="macronutrientprefixsums",
+            constraint=models.UniqueConstraint(
+                fields=("user", "year"), name="macronutrient_prefix_sums_user_year_unique"
+            ),
+        ),
+        migrations.RunPython(build_existing_prefix_sums, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,52 @@
+from django.contrib.auth.models import User
+from django.db import models
+
+
+class EnergyExpenditureEstimate(models.Model):
+    """
+    The running statistics of a user's maintenance calorie observations up to the weigh-in on `through_date`, see
+    `analytics.energy.estimator`. Observations after it are added to the statistics as they arrive, without reading
+    the history before it again.
+
+    The row is deleted by `analytics.energy.signals` when a food entry or weigh-in it includes changes, and is rebuilt
+    from the whole history by the next request.
+    """
+
+    user = models.OneToOneField(User, on_delete=models.CASCADE, primary_key=True)
+
+    through_date = models.DateField()
+    through_trend_kg = models.FloatField()
+
+    observation_count = models.PositiveIntegerField(default=0)
+    weight_total = models.FloatField(default=0)
+    weight_squares_total = models.FloatField(default=0)
+    mean_calories = models.FloatField(default=0)
+    squared_deviations = models.FloatField(default=0)
+
+    def __str__(self):
+        return f"Maintenance of {self.mean_calories:.0f} kcal through {self.through_date}"
+
+
+class MacronutrientPrefixSums(models.Model):
+    """
+    The running totals of a user's macronutrient intake from their first logged day to every day of one year, so the
+    totals of any range are the difference of the running totals on its last day and on the day before it. `sums` is
+    an int64 array of millionths, `analytics.macronutrients.prefix_sums.SCALE`, with a row per day of the year and a
+    column per `analytics.macronutrients.prefix_sums.COLUMNS`, read and written by `prefix_sums.decode` and `encode`.
+
+    Years without any logged days have no row, their running totals being the last ones of the year before. Rows are
+    kept up to date by `analytics.macronutrients.signals`, and can be checked or rebuilt from the daily intake summaries
+    with `python manage.py rebuild_macronutrient_prefix_sums`.
+    """
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=["user", "year"], name="macronutrient_prefix_sums_user_year_unique"),
+        ]
+
+    user = models.ForeignKey(User, on_delete=models.CASCADE)
+    year = models.PositiveSmallIntegerField()
+    sums = models.BinaryField()
+
+    def __str__(self):
+        return f"Macronutrient running totals of {self.year}"
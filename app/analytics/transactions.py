@@ -0,0 +1,31 @@
+from django.db import transaction
+
+
+class _Batch:
+    def __init__(self, flush):
+        self.flush = flush
+        self.items = set()
+        self.flushed = False
+
+    def __call__(self):
+        self.flushed = True
+        self.flush(self.items)
+
+
+def on_commit_batch(flush, item, using=None):
+    """
+    Adds `item` to the batch of `flush` in the current transaction, so `flush` is called once with the set of every
+    item added when the transaction commits, rather than once per item. Saving or deleting many rows in a single
+    transaction, such as deleting a user and the rows cascading from it, then costs a single update. Outside a
+    transaction `flush` is called immediately.
+    """
+    connection = transaction.get_connection(using)
+    if connection.in_atomic_block:
+        for _, callback, _ in connection.run_on_commit:
+            if isinstance(callback, _Batch) and callback.flush == flush and not callback.flushed:
+                callback.items.add(item)
+                return
+
+    batch = _Batch(flush)
+    batch.items.add(item)
+    transaction.on_commit(batch, using=using)
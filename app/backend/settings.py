@@ -120,6 +120,15 @@ DATABASES = {
     }
 }
 
+# The database cache is shared between every gunicorn worker and Fly machine without running any extra services.
+# The table is created using `python manage.py createcachetable`.
+CACHES = {
+    "default": {
+        "BACKEND": "django.core.cache.backends.db.DatabaseCache",
+        "LOCATION": "django_cache",
+    }
+}
+
 # Password validation
 # https://docs.djangoproject.com/en/4.2/ref/settings/#auth-password-validators
 
@@ -167,3 +176,6 @@ DEFAULT_AUTO_FIELD = "django.db.models.BigAutoField"
 CORS_ORIGIN_WHITELIST = django_configs.get("Django", "CORS_ORIGIN_WHITELIST").split(",")
 
 CSRF_TRUSTED_ORIGINS = django_configs.get("Django", "CSRF_TRUSTED_ORIGINS").split(",")
+
+# Allows the frontend to read the header marking a food search served from a stale cache entry
+CORS_EXPOSE_HEADERS = ["Warning"]
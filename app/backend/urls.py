@@ -49,6 +49,7 @@ urlpatterns = [
     path("api/v1/goals/", include("goals.urls")),
     path("api/v1/foods/", include("fooddata_central_service.urls")),
     path("api/v1/analytics/", include("analytics.macronutrients.urls")),
+    path("api/v1/analytics/", include("analytics.energy.urls")),
 ]
 
 
@@ -0,0 +1,110 @@
+import bisect
+import re
+import threading
+
+from configurations.django_config_parser import django_configs
+
+from .models import Food
+
+FOOD_AUTOCOMPLETE_MAX_DESCRIPTIONS = int(django_configs.get("FoodData Central", "FOOD_AUTOCOMPLETE_MAX_DESCRIPTIONS"))
+
+WORD_PATTERN = re.compile(r"\w+")
+
+
+def _words(text):
+    return WORD_PATTERN.findall(text.lower())
+
+
+class PrefixIndex:
+    """
+    An in-memory index of food descriptions answering typeahead queries such as "chick bre". Every word of the query
+    must be the prefix of a word in the description, in any order.
+
+    Unique words are kept in a sorted list, so the words starting with a prefix are found with two binary searches.
+    Each word maps to the IDs of the descriptions containing it, and the IDs of every query word are intersected.
+
+    The index is populated lazily from the foods imported by `python manage.py import_sr_legacy` the first time it is
+    used in a gunicorn worker, and grows with the descriptions of searches answered by FoodData Central. It never
+    holds more than `max_descriptions`, so the memory used by each worker stays bounded.
+    """
+
+    def __init__(self, max_descriptions):
+        self._max_descriptions = max_descriptions
+        self._lock = threading.Lock()
+        self._loaded = False
+
+        self._descriptions = []
+        self._description_ids = {}
+        self._words = []
+        self._postings = {}
+
+    def _add(self, description):
+        if description in self._description_ids or len(self._descriptions) >= self._max_descriptions:
+            return
+
+        description_id = len(self._descriptions)
+        self._descriptions.append(description)
+        self._description_ids[description] = description_id
+
+        for word in set(_words(description)):
+            if word not in self._postings:
+                bisect.insort(self._words, word)
+                self._postings[word] = set()
+            self._postings[word].add(description_id)
+
+    def add(self, descriptions):
+        with self._lock:
+            for description in descriptions:
+                self._add(description)
+
+    def _load(self):
+        if self._loaded:
+            return
+        # Only the SR Legacy foods are loaded, as the branded foods would fill the index many times over.
+        descriptions = Food.objects.filter(data_type=Food.SR_LEGACY).values_list("description", flat=True)
+        for description in descriptions.iterator():
+            if len(self._descriptions) >= self._max_descriptions:
+                break
+            self._add(description)
+        self._loaded = True
+
+    def _ids_with_prefix(self, prefix):
+        start = bisect.bisect_left(self._words, prefix)
+        end = bisect.bisect_left(self._words, prefix + "\uffff", lo=start)
+        return set().union(*(self._postings[word] for word in self._words[start:end]))
+
+    def suggest(self, query, limit):
+        """
+        Descriptions starting with the first word of the query are returned first, as "chicken" should suggest
+        "Chicken, ground, raw" before "Soup, chicken noodle". Ties are broken by the shortest description.
+        """
+        terms = _words(query)
+        if not terms:
+            return []
+
+        with self._lock:
+            self._load()
+
+            matches = None
+            for term in sorted(terms, key=len, reverse=True):
+                ids = self._ids_with_prefix(term)
+                matches = ids if matches is None else matches & ids
+                if not matches:
+                    return []
+
+            descriptions = [self._descriptions[description_id] for description_id in matches]
+
+        first_term = terms[0]
+        descriptions.sort(key=lambda description: (not description.lower().startswith(first_term), len(description)))
+        return descriptions[:limit]
+
+    def clear(self):
+        with self._lock:
+            self._loaded = False
+            self._descriptions = []
+            self._description_ids = {}
+            self._words = []
+            self._postings = {}
+
+
+food_autocomplete_index = PrefixIndex(max_descriptions=FOOD_AUTOCOMPLETE_MAX_DESCRIPTIONS)
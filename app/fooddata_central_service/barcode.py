@@ -0,0 +1,74 @@
+import threading
+
+from cachetools import TTLCache
+from configurations.django_config_parser import django_configs
+
+from .local_search import get_local_foods
+from .models import FoodBarcode
+
+FOOD_BARCODE_CACHE_SIZE = int(django_configs.get("FoodData Central", "FOOD_BARCODE_CACHE_SIZE"))
+FOOD_BARCODE_CACHE_TTL = int(django_configs.get("FoodData Central", "FOOD_BARCODE_CACHE_TTL"))
+
+GTIN_LENGTHS = (8, 12, 13, 14)
+
+
+def normalize_gtin(gtin):
+    """
+    GTIN-8, UPC-A (GTIN-12), EAN-13 (GTIN-13) and GTIN-14 barcodes of the same product only differ by leading zeros,
+    so every barcode is padded to 14 digits. Returns None when `gtin` is not a barcode.
+    """
+    gtin = gtin.strip()
+    if not gtin.isdigit() or len(gtin) not in GTIN_LENGTHS:
+        return None
+    return gtin.zfill(14)
+
+
+def is_valid_gtin(gtin):
+    """
+    Validates the check digit of a normalized GTIN, which catches a single mistyped digit.
+    """
+    digits = [int(digit) for digit in gtin]
+    total = sum(digit * (3 if index % 2 == 0 else 1) for index, digit in enumerate(digits[:-1]))
+    return (10 - total % 10) % 10 == digits[-1]
+
+
+class BarcodeLookup:
+    """
+    Resolves a normalized GTIN to an imported branded food, in the same format as `local_search.get_local_foods`.
+
+    The same popular products are scanned over and over, so found foods are kept in a bounded LRU inside each gunicorn
+    worker. Foods expire after `ttl` seconds, as a re-import by `python manage.py import_branded_foods` runs in
+    another process and cannot clear the LRU of every worker. A miss costs a single lookup of the `(gtin_upc, food)`
+    index. When a GTIN has been reused by a reformulated product, the newest food, with the highest fdcId, is
+    returned.
+    """
+
+    def __init__(self, maxsize, ttl):
+        self._foods = TTLCache(maxsize=maxsize, ttl=ttl)
+        self._lock = threading.Lock()
+
+    def get(self, gtin):
+        with self._lock:
+            food = self._foods.get(gtin)
+        if food is not None:
+            return food
+
+        fdc_id = (
+            FoodBarcode.objects.filter(gtin_upc=gtin).order_by("-food_id").values_list("food_id", flat=True).first()
+        )
+        if fdc_id is None:
+            return None
+
+        foods = get_local_foods([fdc_id])
+        if not foods:
+            return None
+        with self._lock:
+            self._foods[gtin] = foods[0]
+        return foods[0]
+
+    def clear(self):
+        with self._lock:
+            self._foods.clear()
+
+
+food_barcode_lookup = BarcodeLookup(maxsize=FOOD_BARCODE_CACHE_SIZE, ttl=FOOD_BARCODE_CACHE_TTL)
@@ -0,0 +1,165 @@
+import hashlib
+import threading
+import time
+
+from cachetools import TTLCache
+from configurations.django_config_parser import django_configs
+from django.core.cache import cache
+
+FOOD_SEARCH_CACHE_SIZE = int(django_configs.get("FoodData Central", "FOOD_SEARCH_CACHE_SIZE"))
+FOOD_SEARCH_CACHE_TTL = int(django_configs.get("FoodData Central", "FOOD_SEARCH_CACHE_TTL"))
+FOOD_SEARCH_SHARED_CACHE_TTL = int(django_configs.get("FoodData Central", "FOOD_SEARCH_SHARED_CACHE_TTL"))
+FOOD_SEARCH_STALE_TTL = int(django_configs.get("FoodData Central", "FOOD_SEARCH_STALE_TTL"))
+FOOD_DETAIL_CACHE_SIZE = int(django_configs.get("FoodData Central", "FOOD_DETAIL_CACHE_SIZE"))
+
+
+def normalize_query(query):
+    """
+    Searches such as "Chicken Breast", "chicken  breast" and " CHICKEN BREAST " all return the same foods from
+    FoodData Central, so they should share a single cache entry.
+    """
+    return " ".join(query.lower().split())
+
+
+def page_cache_key(query, page_number, page_size):
+    """
+    Each page of a search is cached separately, page 2 with 20 foods per page is cached as "chicken breast:2:20".
+    """
+    return f"{normalize_query(query)}:{page_number}:{page_size}"
+
+
+class TwoTierCache:
+    """
+    A two tier cache placed in front of FoodData Central.
+
+    1. Local - A bounded LRU with a TTL living inside the current process. A hit here costs a dictionary lookup.
+    2. Shared - The Django cache framework (`settings.CACHES`), which is readable by every gunicorn worker and Fly
+       machine. A hit here costs a single database query instead of a round trip to api.nal.usda.gov.
+
+    A miss on the local tier that hits the shared tier will populate the local tier, so the next request in the same
+    worker is served from memory.
+
+    The shared tier keeps every value for `stale_ttl` seconds after it stops being fresh. `get` never returns a stale
+    value, but `get_stale` does, so a stale result can still be served while FoodData Central is unavailable.
+    """
+
+    def __init__(self, key_prefix, maxsize, ttl, shared_ttl, stale_ttl):
+        self._key_prefix = key_prefix
+        self._local = TTLCache(maxsize=maxsize, ttl=ttl)
+        self._lock = threading.Lock()
+        self._shared_ttl = shared_ttl
+        self._stale_ttl = stale_ttl
+
+    def _key(self, query):
+        # Database and memcached backends limit the key length, so a hash keeps arbitrary user input safe. Version 2
+        # entries in the shared tier are stored alongside the time they stay fresh until, version 3 foods hold packed
+        # nutrients.
+        return f"{self._key_prefix}:v3:{hashlib.sha256(normalize_query(query).encode()).hexdigest()}"
+
+    def _shared_entry(self, value):
+        return value, time.time() + self._shared_ttl
+
+    def get(self, query):
+        key = self._key(query)
+
+        with self._lock:
+            value = self._local.get(key)
+        if value is not None:
+            return value
+
+        entry = cache.get(key)
+        if entry is None:
+            return None
+
+        value, fresh_until = entry
+        if fresh_until < time.time():
+            return None
+        with self._lock:
+            self._local[key] = value
+        return value
+
+    def get_stale(self, query):
+        """
+        Returns the value for `query` even if it is no longer fresh, or None once it has been evicted entirely.
+        """
+        entry = cache.get(self._key(query))
+        return entry[0] if entry is not None else None
+
+    def set(self, query, value):
+        key = self._key(query)
+
+        with self._lock:
+            self._local[key] = value
+        cache.set(key, self._shared_entry(value), timeout=self._shared_ttl + self._stale_ttl)
+
+    def get_many(self, queries):
+        """
+        Returns a dictionary of every query found in either tier. Queries missing from the local tier are read from
+        the shared tier using a single `cache.get_many`, rather than one database query each.
+        """
+        keys = {query: self._key(query) for query in queries}
+        found, missing = {}, {}
+
+        with self._lock:
+            for query, key in keys.items():
+                if (value := self._local.get(key)) is not None:
+                    found[query] = value
+                else:
+                    missing[key] = query
+
+        if missing:
+            now = time.time()
+            shared = cache.get_many(missing.keys())
+            with self._lock:
+                for key, (value, fresh_until) in shared.items():
+                    if fresh_until >= now:
+                        self._local[key] = value
+                        found[missing[key]] = value
+        return found
+
+    def set_many(self, values):
+        keyed_values = {self._key(query): value for query, value in values.items()}
+
+        with self._lock:
+            self._local.update(keyed_values)
+        cache.set_many(
+            {key: self._shared_entry(value) for key, value in keyed_values.items()},
+            timeout=self._shared_ttl + self._stale_ttl,
+        )
+
+    def acquire_lock(self, query, timeout):
+        """
+        A short-lived lock row in the shared tier, used to coalesce identical searches across gunicorn workers. The
+        lock expires after `timeout` seconds, so a worker that dies while holding it cannot block others for long.
+        """
+        return cache.add(f"{self._key(query)}:lock", True, timeout=timeout)
+
+    def is_locked(self, query):
+        return cache.get(f"{self._key(query)}:lock") is not None
+
+    def release_lock(self, query):
+        cache.delete(f"{self._key(query)}:lock")
+
+    def clear(self):
+        """
+        Only the local tier is cleared, the shared tier is owned by `settings.CACHES` and expires on its own.
+        """
+        with self._lock:
+            self._local.clear()
+
+
+food_search_cache = TwoTierCache(
+    key_prefix="fdc:search:page",
+    maxsize=FOOD_SEARCH_CACHE_SIZE,
+    ttl=FOOD_SEARCH_CACHE_TTL,
+    shared_ttl=FOOD_SEARCH_SHARED_CACHE_TTL,
+    stale_ttl=FOOD_SEARCH_STALE_TTL,
+)
+
+food_detail_cache = TwoTierCache(
+    key_prefix="fdc:food",
+    maxsize=FOOD_DETAIL_CACHE_SIZE,
+    ttl=FOOD_SEARCH_CACHE_TTL,
+    shared_ttl=FOOD_SEARCH_SHARED_CACHE_TTL,
+    stale_ttl=FOOD_SEARCH_STALE_TTL,
+)
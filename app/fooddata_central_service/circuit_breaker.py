@@ -0,0 +1,116 @@
+import threading
+import time
+
+import requests
+from configurations.django_config_parser import django_configs
+
+FOOD_DATA_CENTRAL_FAILURE_THRESHOLD = int(django_configs.get("FoodData Central", "FOOD_DATA_CENTRAL_FAILURE_THRESHOLD"))
+FOOD_DATA_CENTRAL_RECOVERY_TIMEOUT = float(django_configs.get("FoodData Central", "FOOD_DATA_CENTRAL_RECOVERY_TIMEOUT"))
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half-open"
+
+
+class CircuitOpenError(Exception):
+    """
+    Raised instead of making a request while the circuit breaker is open.
+    """
+
+
+def is_upstream_failure(error):
+    """
+    Only failures of FoodData Central itself count towards opening the circuit. A 4xx response, other than 429 for an
+    exhausted API key quota, is caused by the request and says nothing about the health of FoodData Central.
+    """
+    if isinstance(error, requests.HTTPError):
+        return error.response is not None and (error.response.status_code == 429 or error.response.status_code >= 500)
+    return isinstance(error, (requests.ConnectionError, requests.Timeout))
+
+
+class CircuitBreaker:
+    """
+    A per process circuit breaker placed around requests to FoodData Central.
+
+    - Closed - Requests are made as normal. After `failure_threshold` consecutive failures, the circuit opens.
+    - Open - Requests fail immediately with `CircuitOpenError`, so gunicorn workers are not occupied waiting on a
+      FoodData Central that is known to be down. After `recovery_timeout` seconds, the circuit becomes half-open.
+    - Half-open - A single trial request is let through while every other request still fails fast. Success closes
+      the circuit, failure opens it again for another `recovery_timeout`.
+    """
+
+    def __init__(self, failure_threshold, recovery_timeout):
+        self._failure_threshold = failure_threshold
+        self._recovery_timeout = recovery_timeout
+        self._lock = threading.Lock()
+        self.reset()
+
+    @property
+    def state(self):
+        with self._lock:
+            if self._state == OPEN and time.monotonic() >= self._opened_at + self._recovery_timeout:
+                return HALF_OPEN
+            return self._state
+
+    @property
+    def is_open(self):
+        """
+        True while requests fail fast. Once the recovery timeout has passed this is False, as a trial request is allowed.
+        """
+        return self.state == OPEN
+
+    def _before_call(self):
+        with self._lock:
+            if self._state == CLOSED:
+                return
+            if self._state == OPEN and time.monotonic() >= self._opened_at + self._recovery_timeout:
+                self._state = HALF_OPEN
+                return
+            raise CircuitOpenError("FoodData Central is unavailable")
+
+    def _on_success(self):
+        with self._lock:
+            self._state = CLOSED
+            self._failures = 0
+
+    def _on_failure(self):
+        with self._lock:
+            self._failures += 1
+            if self._state == HALF_OPEN or self._failures >= self._failure_threshold:
+                self._state = OPEN
+                self._opened_at = time.monotonic()
+
+    def _on_unknown(self):
+        # Nothing was learnt about FoodData Central, for example the request was never made because the API key quota
+        # was exhausted. A half-open circuit goes back to open, letting the next request be the trial instead.
+        with self._lock:
+            if self._state == HALF_OPEN:
+                self._state = OPEN
+
+    def call(self, fn, *args, **kwargs):
+        self._before_call()
+        try:
+            result = fn(*args, **kwargs)
+        except Exception as error:
+            if is_upstream_failure(error):
+                self._on_failure()
+            elif isinstance(error, requests.HTTPError):
+                # FoodData Central responded, the request itself was rejected
+                self._on_success()
+            else:
+                self._on_unknown()
+            raise
+        self._on_success()
+        return result
+
+    def reset(self):
+        with self._lock:
+            self._state = CLOSED
+            self._failures = 0
+            self._opened_at = 0.0
+
+
+food_data_central_circuit_breaker = CircuitBreaker(
+    failure_threshold=FOOD_DATA_CENTRAL_FAILURE_THRESHOLD,
+    recovery_timeout=FOOD_DATA_CENTRAL_RECOVERY_TIMEOUT,
+)
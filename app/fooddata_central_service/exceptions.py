@@ -0,0 +1,9 @@
+import requests
+
+
+class FoodSearchUnavailable(requests.RequestException):
+    """
+    Base class of the errors raised when foods could not be requested, other than those raised by `requests` itself.
+    It is a subclass of `requests.RequestException`, so every caller handling failed requests, such as the views
+    answering with 503, handles these the same as FoodData Central being unavailable.
+    """
@@ -0,0 +1,160 @@
+import re
+import threading
+
+from configurations.django_config_parser import django_configs
+from django.db import connection
+
+from .local_search import get_local_foods
+from .models import Food
+
+FOOD_SEARCH_FUZZY_THRESHOLD = float(django_configs.get("FoodData Central", "FOOD_SEARCH_FUZZY_THRESHOLD"))
+
+WORD_PATTERN = re.compile(r"\w+")
+
+
+def trigrams(word):
+    """
+    Trigrams are calculated the same way as pg_trgm, the word is padded with two spaces before and one after, so
+    "cat" becomes {"  c", " ca", "cat", "at "}. The padding weights the start of a word more than its end.
+    """
+    padded = f"  {word} "
+    return {padded[i : i + 3] for i in range(len(padded) - 2)}
+
+
+class TrigramIndex:
+    """
+    A pure Python n-gram index over food descriptions, used for typo tolerant search when pg_trgm is unavailable.
+
+    The index is built over the unique words of every description rather than the descriptions themselves. A query
+    word is compared against the vocabulary by counting shared trigrams through the trigram postings, giving the
+    Jaccard similarity used by pg_trgm's `similarity`. Every query word must match a word of a food with a similarity
+    of at least `threshold`, and foods are ranked by the summed similarity of their best matching words.
+
+    The vocabulary of a food catalog grows far slower than the number of foods, so each query only compares against a
+    few thousand words even for several hundred thousand foods. Only the SR Legacy foods are indexed, leaving out the
+    far larger catalog of branded foods.
+    """
+
+    def __init__(self, threshold):
+        self._threshold = threshold
+        self._lock = threading.Lock()
+        self._reset()
+
+    def _reset(self):
+        self._loaded = False
+        self._fdc_ids = []
+        self._description_lengths = []
+        self._word_ids = {}
+        self._word_trigram_counts = []
+        self._word_foods = []
+        self._trigram_words = {}
+
+    def add(self, fdc_id, description):
+        food_id = len(self._fdc_ids)
+        self._fdc_ids.append(fdc_id)
+        self._description_lengths.append(len(description))
+
+        for word in set(WORD_PATTERN.findall(description.lower())):
+            word_id = self._word_ids.get(word)
+            if word_id is None:
+                word_id = self._word_ids[word] = len(self._word_foods)
+                word_trigrams = trigrams(word)
+                self._word_trigram_counts.append(len(word_trigrams))
+                self._word_foods.append([])
+                for trigram in word_trigrams:
+                    self._trigram_words.setdefault(trigram, []).append(word_id)
+            self._word_foods[word_id].append(food_id)
+
+    def _load(self):
+        if self._loaded:
+            return
+        foods = Food.objects.filter(data_type=Food.SR_LEGACY).values_list("fdc_id", "description")
+        for fdc_id, description in foods.iterator():
+            self.add(fdc_id, description)
+        self._loaded = True
+
+    def _similar_words(self, term):
+        term_trigrams = trigrams(term)
+        shared = {}
+        for trigram in term_trigrams:
+            for word_id in self._trigram_words.get(trigram, ()):
+                shared[word_id] = shared.get(word_id, 0) + 1
+
+        similar_words = {}
+        for word_id, count in shared.items():
+            similarity = count / (len(term_trigrams) + self._word_trigram_counts[word_id] - count)
+            if similarity >= self._threshold:
+                similar_words[word_id] = similarity
+        return similar_words
+
+    def _food_scores(self, term):
+        scores = {}
+        for word_id, similarity in self._similar_words(term).items():
+            for food_id in self._word_foods[word_id]:
+                if similarity > scores.get(food_id, 0):
+                    scores[food_id] = similarity
+        return scores
+
+    def search(self, query, limit):
+        terms = WORD_PATTERN.findall(query.lower())
+        if not terms:
+            return []
+
+        with self._lock:
+            self._load()
+
+            scores = None
+            for term in terms:
+                term_scores = self._food_scores(term)
+                if scores is None:
+                    scores = term_scores
+                else:
+                    scores = {
+                        food_id: score + term_scores[food_id]
+                        for food_id, score in scores.items()
+                        if food_id in term_scores
+                    }
+                if not scores:
+                    return []
+
+            ranked = sorted(scores, key=lambda food_id: (-scores[food_id], self._description_lengths[food_id]))
+            return [self._fdc_ids[food_id] for food_id in ranked[:limit]]
+
+    def clear(self):
+        with self._lock:
+            self._reset()
+
+
+food_trigram_index = TrigramIndex(threshold=FOOD_SEARCH_FUZZY_THRESHOLD)
+
+
+def _search_postgresql(query, limit):
+    with connection.cursor() as cursor:
+        # `<%` uses the trigram index, with the threshold taken from `pg_trgm.word_similarity_threshold`.
+        cursor.execute(
+            "SELECT set_config('pg_trgm.word_similarity_threshold', %s, false)", [str(FOOD_SEARCH_FUZZY_THRESHOLD)]
+        )
+        cursor.execute(
+            """
+            SELECT fdc_id
+            FROM fooddata_central_service_food
+            WHERE data_type = %s AND %s <%% description
+            ORDER BY word_similarity(%s, description) DESC, length(description)
+            LIMIT %s
+            """,
+            [Food.SR_LEGACY, query, query, limit],
+        )
+        return [row[0] for row in cursor.fetchall()]
+
+
+def search_similar_local_foods(query, limit):
+    """
+    Typo tolerant search over the foods imported by `python manage.py import_sr_legacy`, so "brocoli" still finds
+    "Broccoli, raw". Postgres uses pg_trgm, every other database uses the in-memory `food_trigram_index`, which is
+    built the first time it is used in each gunicorn worker.
+    """
+    if connection.vendor == "postgresql":
+        fdc_ids = _search_postgresql(query, limit)
+    else:
+        fdc_ids = food_trigram_index.search(query, limit)
+    return get_local_foods(fdc_ids)
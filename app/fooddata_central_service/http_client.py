@@ -0,0 +1,146 @@
+import os
+import random
+import threading
+import time
+
+import requests
+from configurations.django_config_parser import django_configs
+from requests.adapters import HTTPAdapter
+
+from . import stand_in
+from .exceptions import FoodSearchUnavailable
+from .quota import food_data_central_quota
+
+FOOD_DATA_CENTRAL_POOL_SIZE = int(django_configs.get("FoodData Central", "FOOD_DATA_CENTRAL_POOL_SIZE"))
+FOOD_DATA_CENTRAL_CONNECT_TIMEOUT = float(django_configs.get("FoodData Central", "FOOD_DATA_CENTRAL_CONNECT_TIMEOUT"))
+FOOD_DATA_CENTRAL_READ_TIMEOUT = float(django_configs.get("FoodData Central", "FOOD_DATA_CENTRAL_READ_TIMEOUT"))
+FOOD_DATA_CENTRAL_DEADLINE = float(django_configs.get("FoodData Central", "FOOD_DATA_CENTRAL_DEADLINE"))
+FOOD_DATA_CENTRAL_MAX_RETRIES = int(django_configs.get("FoodData Central", "FOOD_DATA_CENTRAL_MAX_RETRIES"))
+FOOD_DATA_CENTRAL_BACKOFF = float(django_configs.get("FoodData Central", "FOOD_DATA_CENTRAL_BACKOFF"))
+
+# 429 is returned by api.data.gov when the API key exceeds its hourly quota, the 5xx codes are transient failures.
+RETRY_STATUS_CODES = frozenset({429, 500, 502, 503, 504})
+
+
+class DeadlineExceeded(FoodSearchUnavailable, requests.Timeout):
+    """
+    Raised when a request, including all of its retries, has not completed within the deadline. It is also a
+    `requests.Timeout`, like the timeout of a single attempt.
+    """
+
+
+class PooledHTTPClient:
+    """
+    A `requests.Session` shared by every request within the current process, so connections to FoodData Central are
+    kept alive and reused instead of performing a new TCP and TLS handshake on every search.
+
+    Every request is bounded by,
+
+    1. A connect and read timeout for each attempt.
+    2. A retry budget, where failed attempts are retried after an exponential backoff with full jitter. Jitter stops
+       every gunicorn worker retrying in lockstep when FoodData Central recovers.
+    3. A deadline for the request as a whole. The timeout and backoff of each attempt is shortened to fit inside what
+       remains, so a gunicorn worker is never occupied for longer than the deadline.
+
+    When a `rate_limiter` is given, a token is acquired from it before every attempt, including retries, as every
+    attempt counts towards the API key quota.
+
+    When an `adapter_factory` is given, it is called with the pool size to create the transport of each session, for
+    example a `stand_in.ReplayAdapter`. Returning None uses a regular `HTTPAdapter`.
+    """
+
+    def __init__(
+        self,
+        pool_size,
+        connect_timeout,
+        read_timeout,
+        deadline,
+        max_retries,
+        backoff,
+        rate_limiter=None,
+        adapter_factory=None,
+    ):
+        self._pool_size = pool_size
+        self._connect_timeout = connect_timeout
+        self._read_timeout = read_timeout
+        self._deadline = deadline
+        self._max_retries = max_retries
+        self._backoff = backoff
+        self._rate_limiter = rate_limiter
+        self._adapter_factory = adapter_factory
+
+        self._lock = threading.Lock()
+        self._session = None
+        self._session_pid = None
+
+    def _create_session(self):
+        session = requests.Session()
+        adapter = self._adapter_factory(self._pool_size) if self._adapter_factory is not None else None
+        if adapter is None:
+            # Retries are performed by `get` so they can respect the deadline, the adapter itself never retries.
+            adapter = HTTPAdapter(pool_connections=1, pool_maxsize=self._pool_size, max_retries=0)
+        session.mount("https://", adapter)
+        session.mount("http://", adapter)
+        return session
+
+    @property
+    def session(self):
+        """
+        The session is created lazily, connections must not be shared between gunicorn workers forked from the same
+        parent process, so a new session is created whenever the process ID changes.
+        """
+        with self._lock:
+            if self._session is None or self._session_pid != os.getpid():
+                self._session = self._create_session()
+                self._session_pid = os.getpid()
+            return self._session
+
+    def _backoff_time(self, attempt):
+        return random.uniform(0, self._backoff * (2**attempt))
+
+    def get(self, url, params=None):
+        deadline = time.monotonic() + self._deadline
+        attempt = 0
+
+        while True:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                raise DeadlineExceeded(f"GET {url} did not complete within {self._deadline} seconds")
+
+            if self._rate_limiter is not None:
+                self._rate_limiter.acquire(deadline)
+                remaining = deadline - time.monotonic()
+
+            timeout = (min(self._connect_timeout, remaining), min(self._read_timeout, remaining))
+            try:
+                response = self.session.get(url, params=params, timeout=timeout)
+                if response.status_code not in RETRY_STATUS_CODES or attempt >= self._max_retries:
+                    return response
+            except (requests.ConnectionError, requests.Timeout):
+                if attempt >= self._max_retries:
+                    raise
+
+            backoff = self._backoff_time(attempt)
+            if time.monotonic() + backoff >= deadline:
+                raise DeadlineExceeded(f"GET {url} did not complete within {self._deadline} seconds")
+            time.sleep(backoff)
+            attempt += 1
+
+    def close(self):
+        with self._lock:
+            if self._session is not None:
+                self._session.close()
+                self._session = None
+
+
+food_data_central_client = PooledHTTPClient(
+    pool_size=FOOD_DATA_CENTRAL_POOL_SIZE,
+    connect_timeout=FOOD_DATA_CENTRAL_CONNECT_TIMEOUT,
+    read_timeout=FOOD_DATA_CENTRAL_READ_TIMEOUT,
+    deadline=FOOD_DATA_CENTRAL_DEADLINE,
+    max_retries=FOOD_DATA_CENTRAL_MAX_RETRIES,
+    backoff=FOOD_DATA_CENTRAL_BACKOFF,
+    # Replayed requests do not count towards the API key quota, the stand-in simulates throttling itself.
+    rate_limiter=None if stand_in.FOOD_DATA_CENTRAL_STAND_IN == stand_in.REPLAY else food_data_central_quota,
+    adapter_factory=stand_in.create_adapter,
+)
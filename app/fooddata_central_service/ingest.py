@@ -0,0 +1,162 @@
+import csv
+import json
+import sys
+import time
+from io import StringIO
+
+from django.db import connection
+
+from .models import Food, FoodBarcode, FoodNutrient
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+READ_SIZE = 1 << 16
+FOOD_FIELDS = ("fdc_id", "description", "data_type")
+FOOD_NUTRIENT_FIELDS = ("food_id", "nutrient_id", "nutrient_name", "unit_name", "value")
+FOOD_BARCODE_FIELDS = ("gtin_upc", "food_id")
+
+
+def iter_json_array(json_file, key):
+    """
+    Yields the items of the array `key` of a top level JSON object one at a time, `{"BrandedFoods": [...]}`, without
+    loading the whole file. Only the current item and a single read buffer are held in memory.
+    """
+    decoder = json.JSONDecoder()
+    buffer, position = "", 0
+
+    def read_more():
+        nonlocal buffer, position
+        data = json_file.read(READ_SIZE)
+        buffer, position = buffer[position:] + data, 0
+        return bool(data)
+
+    while (start := buffer.find(f'"{key}"')) == -1:
+        if not read_more():
+            raise ValueError(f'"{key}" was not found')
+    position = start + len(key) + 2
+
+    while (start := buffer.find("[", position)) == -1:
+        if not read_more():
+            raise ValueError(f'"{key}" is not an array')
+    position = start + 1
+
+    while True:
+        while position < len(buffer) and buffer[position] in " \t\r\n,":
+            position += 1
+        if position == len(buffer):
+            if not read_more():
+                raise ValueError(f'"{key}" is truncated')
+            continue
+        if buffer[position] == "]":
+            return
+
+        try:
+            item, position = decoder.raw_decode(buffer, position)
+        except json.JSONDecodeError:
+            # The item continues past the end of the buffer.
+            if not read_more():
+                raise
+            continue
+        yield item
+
+
+def iter_csv(path):
+    with open(path, newline="", encoding="utf-8") as csv_file:
+        yield from csv.DictReader(csv_file)
+
+
+class FdcIdSet:
+    """
+    A bitmap of `fdcId`s. Branded Foods contains almost 2 million foods, which would take over 100 MB as a `set` of
+    integers but only a few hundred kilobytes as a bitmap.
+    """
+
+    def __init__(self):
+        self._bits = bytearray()
+
+    def add(self, fdc_id):
+        index = fdc_id >> 3
+        if index >= len(self._bits):
+            self._bits.extend(bytes(index + 1 - len(self._bits)))
+        self._bits[index] |= 1 << (fdc_id & 7)
+
+    def __contains__(self, fdc_id):
+        index = fdc_id >> 3
+        return index < len(self._bits) and bool(self._bits[index] & 1 << (fdc_id & 7))
+
+
+def _copy_rows(model, fields, rows):
+    buffer = StringIO()
+    csv.writer(buffer).writerows(rows)
+    buffer.seek(0)
+    with connection.cursor() as cursor:
+        cursor.copy_expert(
+            f"COPY {model._meta.db_table} ({', '.join(fields)}) FROM STDIN WITH (FORMAT csv)",
+            buffer,
+        )
+
+
+def write_rows(model, fields, rows):
+    """
+    Inserts a chunk of rows, given as tuples in the order of `fields`. Postgres uses `COPY`, which is several times
+    faster than multi-row inserts, other databases use `bulk_create`.
+    """
+    if not rows:
+        return
+    if connection.vendor == "postgresql":
+        _copy_rows(model, fields, rows)
+    else:
+        model.objects.bulk_create([model(**dict(zip(fields, row))) for row in rows], batch_size=len(rows))
+
+
+def delete_foods(data_type):
+    """
+    Deletes every imported food of `data_type`, its nutrients and its barcodes. `QuerySet.delete` loads every food
+    into memory to cascade the delete, which is not possible for Branded Foods, so each table is deleted from by a
+    single statement instead.
+    """
+    with connection.cursor() as cursor:
+        for model in (FoodNutrient, FoodBarcode):
+            cursor.execute(
+                f"""
+                DELETE FROM {model._meta.db_table}
+                WHERE food_id IN (SELECT fdc_id FROM {Food._meta.db_table} WHERE data_type = %s)
+                """,
+                [data_type],
+            )
+        cursor.execute(f"DELETE FROM {Food._meta.db_table} WHERE data_type = %s", [data_type])
+
+
+def peak_rss_mb():
+    """
+    The peak resident set size of this process in megabytes, or None where it can not be measured.
+    """
+    if resource is None:
+        return None
+    peak_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports kilobytes, macOS reports bytes.
+    return peak_rss / (1024 * 1024 if sys.platform == "darwin" else 1024)
+
+
+class IngestProgress:
+
+    def __init__(self):
+        self.started_at = time.monotonic()
+        self.foods = 0
+        self.food_nutrients = 0
+
+    @property
+    def rows_per_second(self):
+        elapsed = time.monotonic() - self.started_at
+        return (self.foods + self.food_nutrients) / elapsed if elapsed else 0.0
+
+    def __str__(self):
+        peak_rss = peak_rss_mb()
+        return (
+            f"{self.foods} foods and {self.food_nutrients} nutrients in {time.monotonic() - self.started_at:.1f}s, "
+            f"{self.rows_per_second:.0f} rows/s, peak RSS "
+            + ("unavailable" if peak_rss is None else f"{peak_rss:.0f} MB")
+        )
@@ -0,0 +1,103 @@
+import re
+
+from django.db import connection
+
+from .models import Food
+from .nutrients import pack_nutrients
+
+WORD_PATTERN = re.compile(r"\w+")
+
+
+def rebuild_search_index():
+    """
+    The SQLite FTS5 table uses the Food table as external content and is not kept in sync by triggers, so it must be
+    rebuilt after foods are imported. The Postgres index is a regular GIN index and is always up to date.
+    """
+    if connection.vendor == "sqlite":
+        with connection.cursor() as cursor:
+            cursor.execute(
+                "INSERT INTO fooddata_central_service_food_fts(fooddata_central_service_food_fts) VALUES ('rebuild')"
+            )
+
+
+def _search_postgresql(words, limit, offset, data_type):
+    # Every word must match and may be a prefix, "chick brea" still finds "Chicken, broilers or fryers, breast".
+    ts_query = " & ".join(f"{word}:*" for word in words)
+    with connection.cursor() as cursor:
+        cursor.execute(
+            """
+            SELECT fdc_id
+            FROM fooddata_central_service_food
+            WHERE to_tsvector('english', description) @@ to_tsquery('english', %s)
+              AND (%s IS NULL OR data_type = %s)
+            ORDER BY ts_rank(to_tsvector('english', description), to_tsquery('english', %s)) DESC,
+                     length(description)
+            LIMIT %s OFFSET %s
+            """,
+            [ts_query, data_type, data_type, ts_query, limit, offset],
+        )
+        return [row[0] for row in cursor.fetchall()]
+
+
+def _search_sqlite(words, limit, offset, data_type):
+    fts_query = " ".join(f'"{word}"*' for word in words)
+    with connection.cursor() as cursor:
+        cursor.execute(
+            """
+            SELECT fts.rowid
+            FROM fooddata_central_service_food_fts AS fts
+            JOIN fooddata_central_service_food AS food ON food.fdc_id = fts.rowid
+            WHERE fooddata_central_service_food_fts MATCH %s
+              AND (%s IS NULL OR food.data_type = %s)
+            ORDER BY bm25(fooddata_central_service_food_fts), length(food.description)
+            LIMIT %s OFFSET %s
+            """,
+            [fts_query, data_type, data_type, limit, offset],
+        )
+        return [row[0] for row in cursor.fetchall()]
+
+
+def _search_fallback(words, limit, offset, data_type):
+    foods = Food.objects.all() if data_type is None else Food.objects.filter(data_type=data_type)
+    for word in words:
+        foods = foods.filter(description__icontains=word)
+    return list(foods.order_by("fdc_id").values_list("fdc_id", flat=True)[offset : offset + limit])
+
+
+def get_local_foods(fdc_ids):
+    """
+    Returns the imported foods in the same format as a compacted FoodData Central search result, so
+    `FoodSearchResultSerializer` is unaware of where the foods came from. The order of `fdc_ids` is kept, and IDs
+    that were never imported are skipped.
+    """
+    foods = Food.objects.prefetch_related("nutrients").in_bulk(fdc_ids)
+    return [
+        {
+            "fdcId": food.fdc_id,
+            "description": food.description,
+            "nutrients": pack_nutrients((nutrient.nutrient_id, nutrient.value) for nutrient in food.nutrients.all()),
+        }
+        for food in (foods[fdc_id] for fdc_id in fdc_ids if fdc_id in foods)
+    ]
+
+
+def search_local_foods(query, limit, offset=0, data_type=None):
+    """
+    Searches the foods imported by `python manage.py import_sr_legacy` and `import_branded_foods`, see
+    `get_local_foods` for the format returned. Only foods of `data_type` are searched when it is given.
+
+    Results are ranked by full-text relevance, ties are broken by the shortest description as it is usually the most
+    generic food, for example "Chicken, ground, raw" before "Chicken, ground, crumbles, cooked, pan-browned".
+    """
+    words = WORD_PATTERN.findall(query.lower())
+    if not words:
+        return []
+
+    if connection.vendor == "postgresql":
+        fdc_ids = _search_postgresql(words, limit, offset, data_type)
+    elif connection.vendor == "sqlite":
+        fdc_ids = _search_sqlite(words, limit, offset, data_type)
+    else:
+        fdc_ids = _search_fallback(words, limit, offset, data_type)
+
+    return get_local_foods(fdc_ids)
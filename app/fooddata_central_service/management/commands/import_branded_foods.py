@@ -0,0 +1,174 @@
+from pathlib import Path
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+
+from fooddata_central_service.barcode import food_barcode_lookup, normalize_gtin
+from fooddata_central_service.ingest import (
+    FOOD_BARCODE_FIELDS,
+    FOOD_FIELDS,
+    FOOD_NUTRIENT_FIELDS,
+    FdcIdSet,
+    IngestProgress,
+    delete_foods,
+    iter_csv,
+    iter_json_array,
+    write_rows,
+)
+from fooddata_central_service.local_search import rebuild_search_index
+from fooddata_central_service.models import Food, FoodBarcode, FoodNutrient
+from fooddata_central_service.nutrients import (
+    EXTRACTED_NUTRIENT_IDS,
+    normalize_unit_name,
+)
+
+CHUNK_SIZE = 5000
+
+
+class Command(BaseCommand):
+    help = (
+        "Imports the Branded Foods dataset downloaded from https://fdc.nal.usda.gov/download-datasets.html into the "
+        "local food search index. Accepts either the JSON file or the directory of the extracted CSV download. The "
+        "download is streamed in chunks, so memory use does not grow with the size of the dataset."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "path", type=Path, help="Path to the Branded Foods JSON file or the extracted CSV directory."
+        )
+        parser.add_argument(
+            "--chunk-size", type=int, default=CHUNK_SIZE, help="Number of rows written to the database at a time."
+        )
+
+    def handle(self, *args, **options):
+        path = options["path"]
+        self.chunk_size = options["chunk_size"]
+        self.verbosity = options["verbosity"]
+        self.progress = IngestProgress()
+
+        if path.is_dir():
+            load = self._load_csv
+        elif path.is_file():
+            load = self._load_json
+        else:
+            raise CommandError(f"{path} does not exist")
+
+        # Re-importing replaces the previous Branded Foods import, the imported SR Legacy foods are kept.
+        with transaction.atomic():
+            delete_foods(Food.BRANDED)
+            load(path)
+            rebuild_search_index()
+        # Other processes drop the foods of the previous import once they expire, see `BarcodeLookup`.
+        food_barcode_lookup.clear()
+
+        self.stdout.write(self.style.SUCCESS(f"Imported {self.progress}"))
+
+    def _write(self, model, fields, rows):
+        if not rows:
+            return
+        write_rows(model, fields, rows)
+        if model is Food:
+            self.progress.foods += len(rows)
+        elif model is FoodNutrient:
+            self.progress.food_nutrients += len(rows)
+        if self.verbosity > 1:
+            self.stdout.write(str(self.progress))
+        rows.clear()
+
+    def _load_json(self, path):
+        """
+        The JSON download is a single object, `{"BrandedFoods": [...]}`, where every food contains its nutrients. Foods
+        are parsed one at a time and written together with their nutrients every `chunk_size` foods.
+        """
+        foods, food_nutrients, food_barcodes = [], [], []
+        with open(path, encoding="utf-8") as json_file:
+            for food in iter_json_array(json_file, "BrandedFoods"):
+                foods.append((food["fdcId"], food["description"][:255], Food.BRANDED))
+                if gtin := normalize_gtin(food.get("gtinUpc", "")):
+                    food_barcodes.append((gtin, food["fdcId"]))
+
+                nutrient_ids = set()
+                for food_nutrient in food.get("foodNutrients", []):
+                    nutrient = food_nutrient["nutrient"]
+                    if (
+                        nutrient["id"] in EXTRACTED_NUTRIENT_IDS
+                        and nutrient["id"] not in nutrient_ids
+                        and "amount" in food_nutrient
+                    ):
+                        nutrient_ids.add(nutrient["id"])
+                        food_nutrients.append(
+                            (
+                                food["fdcId"],
+                                nutrient["id"],
+                                nutrient["name"],
+                                normalize_unit_name(nutrient["unitName"]),
+                                food_nutrient["amount"],
+                            )
+                        )
+
+                if len(foods) >= self.chunk_size:
+                    self._write_chunk(foods, food_nutrients, food_barcodes)
+
+        self._write_chunk(foods, food_nutrients, food_barcodes)
+
+    def _write_chunk(self, foods, food_nutrients, food_barcodes):
+        self._write(Food, FOOD_FIELDS, foods)
+        self._write(FoodNutrient, FOOD_NUTRIENT_FIELDS, food_nutrients)
+        self._write(FoodBarcode, FOOD_BARCODE_FIELDS, food_barcodes)
+
+    def _load_csv(self, directory):
+        """
+        The CSV download is a directory of tables, only `food.csv`, `branded_food.csv`, `nutrient.csv` and
+        `food_nutrient.csv` are read. Each table is streamed, only the imported `fdcId`s are remembered to filter
+        `food_nutrient.csv`.
+        """
+        nutrients = {
+            int(nutrient["id"]): nutrient
+            for nutrient in iter_csv(directory / "nutrient.csv")
+            if int(nutrient["id"]) in EXTRACTED_NUTRIENT_IDS
+        }
+
+        fdc_ids = FdcIdSet()
+        foods = []
+        for food in iter_csv(directory / "food.csv"):
+            if food["data_type"] == Food.BRANDED:
+                fdc_ids.add(int(food["fdc_id"]))
+                foods.append((int(food["fdc_id"]), food["description"][:255], Food.BRANDED))
+                if len(foods) >= self.chunk_size:
+                    self._write(Food, FOOD_FIELDS, foods)
+        self._write(Food, FOOD_FIELDS, foods)
+
+        food_barcodes = []
+        for branded_food in iter_csv(directory / "branded_food.csv"):
+            gtin, fdc_id = normalize_gtin(branded_food["gtin_upc"]), int(branded_food["fdc_id"])
+            if gtin and fdc_id in fdc_ids:
+                food_barcodes.append((gtin, fdc_id))
+                if len(food_barcodes) >= self.chunk_size:
+                    self._write(FoodBarcode, FOOD_BARCODE_FIELDS, food_barcodes)
+        self._write(FoodBarcode, FOOD_BARCODE_FIELDS, food_barcodes)
+
+        # A repeated nutrient is skipped as only one is allowed per food. The rows of a food are not always
+        # consecutive, so the foods already holding each nutrient are remembered, as a bitmap per nutrient.
+        food_nutrients = []
+        imported = {nutrient_id: FdcIdSet() for nutrient_id in nutrients}
+        for food_nutrient in iter_csv(directory / "food_nutrient.csv"):
+            fdc_id, nutrient_id = int(food_nutrient["fdc_id"]), int(food_nutrient["nutrient_id"])
+            if nutrient_id not in nutrients or fdc_id not in fdc_ids or not food_nutrient["amount"]:
+                continue
+            if fdc_id in imported[nutrient_id]:
+                continue
+            imported[nutrient_id].add(fdc_id)
+
+            nutrient = nutrients[nutrient_id]
+            food_nutrients.append(
+                (
+                    fdc_id,
+                    nutrient_id,
+                    nutrient["name"],
+                    normalize_unit_name(nutrient["unit_name"]),
+                    float(food_nutrient["amount"]),
+                )
+            )
+            if len(food_nutrients) >= self.chunk_size:
+                self._write(FoodNutrient, FOOD_NUTRIENT_FIELDS, food_nutrients)
+        self._write(FoodNutrient, FOOD_NUTRIENT_FIELDS, food_nutrients)
@@ -0,0 +1,106 @@
+import csv
+import json
+from pathlib import Path
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+
+from fooddata_central_service.ingest import delete_foods
+from fooddata_central_service.local_search import rebuild_search_index
+from fooddata_central_service.models import Food, FoodNutrient
+from fooddata_central_service.nutrients import (
+    EXTRACTED_NUTRIENT_IDS,
+    normalize_unit_name,
+)
+
+BATCH_SIZE = 1000
+
+
+def _read_csv(path):
+    with open(path, newline="", encoding="utf-8") as csv_file:
+        yield from csv.DictReader(csv_file)
+
+
+def _load_json(path):
+    """
+    The JSON download is a single object, `{"SRLegacyFoods": [...]}`, where every food contains its nutrients.
+    """
+    with open(path, encoding="utf-8") as json_file:
+        sr_legacy_foods = json.load(json_file)["SRLegacyFoods"]
+
+    foods, food_nutrients = [], []
+    for food in sr_legacy_foods:
+        foods.append(Food(fdc_id=food["fdcId"], description=food["description"][:255]))
+        for food_nutrient in food.get("foodNutrients", []):
+            nutrient = food_nutrient["nutrient"]
+            if nutrient["id"] in EXTRACTED_NUTRIENT_IDS and "amount" in food_nutrient:
+                food_nutrients.append(
+                    FoodNutrient(
+                        food_id=food["fdcId"],
+                        nutrient_id=nutrient["id"],
+                        nutrient_name=nutrient["name"],
+                        unit_name=normalize_unit_name(nutrient["unitName"]),
+                        value=food_nutrient["amount"],
+                    )
+                )
+    return foods, food_nutrients
+
+
+def _load_csv(directory):
+    """
+    The CSV download is a directory of tables, only `food.csv`, `nutrient.csv` and `food_nutrient.csv` are read.
+    """
+    nutrients = {
+        int(nutrient["id"]): nutrient
+        for nutrient in _read_csv(directory / "nutrient.csv")
+        if int(nutrient["id"]) in EXTRACTED_NUTRIENT_IDS
+    }
+
+    foods = [
+        Food(fdc_id=int(food["fdc_id"]), description=food["description"][:255])
+        for food in _read_csv(directory / "food.csv")
+        if food["data_type"] == Food.SR_LEGACY
+    ]
+    fdc_ids = {food.fdc_id for food in foods}
+
+    food_nutrients = [
+        FoodNutrient(
+            food_id=int(food_nutrient["fdc_id"]),
+            nutrient_id=int(food_nutrient["nutrient_id"]),
+            nutrient_name=nutrients[int(food_nutrient["nutrient_id"])]["name"],
+            unit_name=normalize_unit_name(nutrients[int(food_nutrient["nutrient_id"])]["unit_name"]),
+            value=float(food_nutrient["amount"]),
+        )
+        for food_nutrient in _read_csv(directory / "food_nutrient.csv")
+        if int(food_nutrient["nutrient_id"]) in nutrients and int(food_nutrient["fdc_id"]) in fdc_ids
+    ]
+    return foods, food_nutrients
+
+
+class Command(BaseCommand):
+    help = (
+        "Imports the SR Legacy dataset downloaded from https://fdc.nal.usda.gov/download-datasets.html into the local "
+        "food search index. Accepts either the JSON file or the directory of the extracted CSV download."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("path", type=Path, help="Path to the SR Legacy JSON file or the extracted CSV directory.")
+
+    def handle(self, *args, **options):
+        path = options["path"]
+        if path.is_dir():
+            foods, food_nutrients = _load_csv(path)
+        elif path.is_file():
+            foods, food_nutrients = _load_json(path)
+        else:
+            raise CommandError(f"{path} does not exist")
+
+        # Re-importing replaces the previous import, a newer SR Legacy release may have removed foods. The imported
+        # Branded Foods are kept.
+        with transaction.atomic():
+            delete_foods(Food.SR_LEGACY)
+            Food.objects.bulk_create(foods, batch_size=BATCH_SIZE)
+            FoodNutrient.objects.bulk_create(food_nutrients, batch_size=BATCH_SIZE)
+            rebuild_search_index()
+
+        self.stdout.write(self.style.SUCCESS(f"Imported {len(foods)} foods and {len(food_nutrients)} nutrients"))
@@ -0,0 +1,43 @@
+# Generated by Django 4.2.7 on 2026-10-17 17:21
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = []
+
+    operations = [
+        migrations.CreateModel(
+            name="Food",
+            fields=[
+                ("fdc_id", models.PositiveIntegerField(primary_key=True, serialize=False)),
+                ("description", models.CharField(max_length=255)),
+            ],
+        ),
+        migrations.CreateModel(
+            name="FoodNutrient",
+            fields=[
+                ("id", models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name="ID")),
+                ("nutrient_id", models.PositiveIntegerField()),
+                ("nutrient_name", models.CharField(max_length=255)),
+                ("unit_name", models.CharField(max_length=16)),
+                ("value", models.FloatField()),
+                (
+                    "food",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="nutrients",
+                        to="fooddata_central_service.food",
+                    ),
+                ),
+            ],
+            options={
+                "ordering": ["nutrient_id"],
+                "unique_together": {("food", "nutrient_id")},
+            },
+        ),
+    ]
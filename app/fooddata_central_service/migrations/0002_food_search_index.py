@@ -0,0 +1,39 @@
+from django.db import migrations
+
+
+def create_search_index(apps, schema_editor):
+    """
+    Postgres uses a GIN index over the `tsvector` of the description. SQLite has no `tsvector`, instead an FTS5 table
+    using the Food table as external content is created and populated by `import_sr_legacy`.
+    """
+    vendor = schema_editor.connection.vendor
+    if vendor == "postgresql":
+        schema_editor.execute(
+            "CREATE INDEX fooddata_central_service_food_search_idx ON fooddata_central_service_food "
+            "USING GIN (to_tsvector('english', description))"
+        )
+    elif vendor == "sqlite":
+        schema_editor.execute(
+            "CREATE VIRTUAL TABLE fooddata_central_service_food_fts USING fts5("
+            "description, content='fooddata_central_service_food', content_rowid='fdc_id', "
+            "tokenize='porter unicode61')"
+        )
+
+
+def drop_search_index(apps, schema_editor):
+    vendor = schema_editor.connection.vendor
+    if vendor == "postgresql":
+        schema_editor.execute("DROP INDEX IF EXISTS fooddata_central_service_food_search_idx")
+    elif vendor == "sqlite":
+        schema_editor.execute("DROP TABLE IF EXISTS fooddata_central_service_food_fts")
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("fooddata_central_service", "0001_initial"),
+    ]
+
+    operations = [
+        migrations.RunPython(create_search_index, drop_search_index),
+    ]
@@ -0,0 +1,29 @@
+from django.db import migrations
+
+
+def create_trigram_index(apps, schema_editor):
+    """
+    Only Postgres has pg_trgm, every other database uses the in-memory `fuzzy_search.TrigramIndex`.
+    """
+    if schema_editor.connection.vendor == "postgresql":
+        schema_editor.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+        schema_editor.execute(
+            "CREATE INDEX fooddata_central_service_food_trgm_idx ON fooddata_central_service_food "
+            "USING GIN (description gin_trgm_ops)"
+        )
+
+
+def drop_trigram_index(apps, schema_editor):
+    if schema_editor.connection.vendor == "postgresql":
+        schema_editor.execute("DROP INDEX IF EXISTS fooddata_central_service_food_trgm_idx")
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("fooddata_central_service", "0002_food_search_index"),
+    ]
+
+    operations = [
+        migrations.RunPython(create_trigram_index, drop_trigram_index),
+    ]
@@ -0,0 +1,21 @@
+# Generated by Django 4.2.7 on 2026-10-17 17:34
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("fooddata_central_service", "0003_food_trigram_index"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="ApiQuota",
+            fields=[
+                ("name", models.CharField(max_length=64, primary_key=True, serialize=False)),
+                ("tokens", models.FloatField()),
+                ("updated_at", models.FloatField()),
+            ],
+        ),
+    ]
@@ -0,0 +1,22 @@
+# Generated by Django 4.2.7 on 2026-10-17 18:02
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("fooddata_central_service", "0004_api_quota"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="food",
+            name="data_type",
+            field=models.CharField(
+                choices=[("sr_legacy_food", "SR Legacy"), ("branded_food", "Branded")],
+                default="sr_legacy_food",
+                max_length=32,
+            ),
+        ),
+    ]
@@ -0,0 +1,32 @@
+# Generated by Django 4.2.7 on 2026-10-17 17:40
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("fooddata_central_service", "0005_food_data_type"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="FoodBarcode",
+            fields=[
+                ("id", models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name="ID")),
+                ("gtin_upc", models.CharField(max_length=14)),
+                (
+                    "food",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="barcodes",
+                        to="fooddata_central_service.food",
+                    ),
+                ),
+            ],
+            options={
+                "indexes": [models.Index(fields=["gtin_upc", "-food"], name="food_barcode_gtin_upc_idx")],
+            },
+        ),
+    ]
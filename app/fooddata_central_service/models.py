@@ -0,0 +1,68 @@
+from django.db import models
+
+
+class Food(models.Model):
+    """
+    A food imported from a downloaded FoodData Central dataset. The primary key is the FoodData Central `fdcId`, so
+    imported foods can be referenced by the same identifier as foods returned from the API.
+    """
+
+    SR_LEGACY = "sr_legacy_food"
+    BRANDED = "branded_food"
+    DATA_TYPES = [(SR_LEGACY, "SR Legacy"), (BRANDED, "Branded")]
+
+    fdc_id = models.PositiveIntegerField(primary_key=True)
+    description = models.CharField(max_length=255)
+    data_type = models.CharField(max_length=32, choices=DATA_TYPES, default=SR_LEGACY)
+
+    def __str__(self):
+        return f"{self.fdc_id} - {self.description}"
+
+
+class FoodNutrient(models.Model):
+    """
+    Only the nutrients extracted by `FoodSearchResultSerializer` are imported, see `nutrients.EXTRACTED_NUTRIENT_IDS`.
+    """
+
+    class Meta:
+        unique_together = ("food", "nutrient_id")
+        ordering = ["nutrient_id"]
+
+    food = models.ForeignKey(Food, on_delete=models.CASCADE, related_name="nutrients")
+    nutrient_id = models.PositiveIntegerField()
+    nutrient_name = models.CharField(max_length=255)
+    unit_name = models.CharField(max_length=16)
+    value = models.FloatField()
+
+    def __str__(self):
+        return f"{self.food_id} - {self.nutrient_name}: {self.value} {self.unit_name}"
+
+
+class FoodBarcode(models.Model):
+    """
+    The GTIN/UPC printed on a branded food, normalized to 14 digits by `barcode.normalize_gtin`. A GTIN is reused
+    when a product is reformulated, each version being a separate food, so a GTIN is not unique.
+    """
+
+    class Meta:
+        indexes = [models.Index(fields=["gtin_upc", "-food"], name="food_barcode_gtin_upc_idx")]
+
+    gtin_upc = models.CharField(max_length=14)
+    food = models.ForeignKey(Food, on_delete=models.CASCADE, related_name="barcodes")
+
+    def __str__(self):
+        return f"{self.gtin_upc} - {self.food_id}"
+
+
+class ApiQuota(models.Model):
+    """
+    A token bucket shared by every gunicorn worker and Fly machine, see `quota.TokenBucket`. Times are Unix timestamps
+    so they can be compared between machines.
+    """
+
+    name = models.CharField(max_length=64, primary_key=True)
+    tokens = models.FloatField()
+    updated_at = models.FloatField()
+
+    def __str__(self):
+        return f"{self.name} - {self.tokens:.1f} tokens"
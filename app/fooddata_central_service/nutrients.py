@@ -0,0 +1,104 @@
+"""
+Nutrients extracted from FoodData Central, identified by the numeric `nutrientId` used across every FoodData Central
+dataset and the legacy `nutrientNumber` accepted by the `nutrients` parameter of the API. Nutrients are never matched
+by their English `nutrientName`, which is not stable across datasets.
+
+See https://fdc.nal.usda.gov/portal-data/external/dataDictionary for the full list of nutrients.
+"""
+
+from collections import namedtuple
+
+ENERGY_KCAL_ID = 1008
+ENERGY_KJ_ID = 1062
+PROTEIN_ID = 1003
+TOTAL_FAT_ID = 1004
+CARBOHYDRATE_ID = 1005
+
+ENERGY_KCAL_NUMBER = "208"
+ENERGY_KJ_NUMBER = "268"
+PROTEIN_NUMBER = "203"
+TOTAL_FAT_NUMBER = "204"
+CARBOHYDRATE_NUMBER = "205"
+
+ProfileNutrient = namedtuple("ProfileNutrient", ["field", "nutrient_id", "nutrient_number", "unit"])
+
+# The nutrient profile of a food, in a fixed order. Each nutrient is always reported by FoodData Central in the same
+# unit, so only its value needs to be stored. The first four are the macronutrients returned by every search.
+NUTRIENT_PROFILE = (
+    ProfileNutrient("calories", ENERGY_KCAL_ID, ENERGY_KCAL_NUMBER, "KCAL"),
+    ProfileNutrient("protein", PROTEIN_ID, PROTEIN_NUMBER, "G"),
+    ProfileNutrient("fat", TOTAL_FAT_ID, TOTAL_FAT_NUMBER, "G"),
+    ProfileNutrient("carbs", CARBOHYDRATE_ID, CARBOHYDRATE_NUMBER, "G"),
+    ProfileNutrient("fiber", 1079, "291", "G"),
+    ProfileNutrient("sugars", 2000, "269", "G"),
+    ProfileNutrient("saturated_fat", 1258, "606", "G"),
+    ProfileNutrient("trans_fat", 1257, "605", "G"),
+    ProfileNutrient("cholesterol", 1253, "601", "MG"),
+    ProfileNutrient("sodium", 1093, "307", "MG"),
+    ProfileNutrient("potassium", 1092, "306", "MG"),
+    ProfileNutrient("calcium", 1087, "301", "MG"),
+    ProfileNutrient("iron", 1089, "303", "MG"),
+    ProfileNutrient("magnesium", 1090, "304", "MG"),
+    ProfileNutrient("zinc", 1095, "309", "MG"),
+    ProfileNutrient("vitamin_a", 1106, "320", "UG"),
+    ProfileNutrient("vitamin_c", 1162, "401", "MG"),
+    ProfileNutrient("vitamin_d", 1114, "328", "UG"),
+    ProfileNutrient("vitamin_e", 1109, "323", "MG"),
+    ProfileNutrient("vitamin_k", 1185, "430", "UG"),
+    ProfileNutrient("thiamin", 1165, "404", "MG"),
+    ProfileNutrient("riboflavin", 1166, "405", "MG"),
+    ProfileNutrient("niacin", 1167, "406", "MG"),
+    ProfileNutrient("vitamin_b6", 1175, "415", "MG"),
+    ProfileNutrient("folate", 1177, "417", "UG"),
+    ProfileNutrient("vitamin_b12", 1178, "418", "UG"),
+)
+
+CALORIES_INDEX, PROTEIN_INDEX, FAT_INDEX, CARBS_INDEX = range(4)
+MACRONUTRIENTS = 4
+
+PROFILE_INDEX_BY_NUTRIENT_ID = {nutrient.nutrient_id: index for index, nutrient in enumerate(NUTRIENT_PROFILE)}
+
+# Energy is sometimes only reported in kJ, it is converted to kcal when the profile is packed.
+EXTRACTED_NUTRIENT_IDS = frozenset(PROFILE_INDEX_BY_NUTRIENT_ID) | {ENERGY_KJ_ID}
+EXTRACTED_NUTRIENT_NUMBERS = tuple(nutrient.nutrient_number for nutrient in NUTRIENT_PROFILE) + (ENERGY_KJ_NUMBER,)
+
+KJ_PER_KCAL = 4.18
+
+
+def pack_nutrients(nutrients):
+    """
+    Packs `(nutrientId, value)` pairs into a list holding the value of every nutrient of `NUTRIENT_PROFILE` in the same
+    order, or None when the food does not report it. Pairs are matched in a single pass by integer `nutrientId`, so
+    the 100+ nutrients of an SR Legacy food never need their names compared. When a nutrient appears more than once
+    the first is kept, and kcal is preferred over kJ.
+
+    A packed list is several times smaller than the equivalent list of nutrient dictionaries, which matters for every
+    food held by the caches.
+    """
+    packed = [None] * len(NUTRIENT_PROFILE)
+    energy_kj = None
+    for nutrient_id, value in nutrients:
+        index = PROFILE_INDEX_BY_NUTRIENT_ID.get(nutrient_id)
+        if index is not None:
+            if packed[index] is None:
+                packed[index] = value
+        elif nutrient_id == ENERGY_KJ_ID and energy_kj is None:
+            energy_kj = value
+
+    if packed[CALORIES_INDEX] is None and energy_kj is not None:
+        packed[CALORIES_INDEX] = kj_to_kcal(energy_kj)
+    return packed
+
+
+def kj_to_kcal(value):
+    return round(value / KJ_PER_KCAL, 2)
+
+
+def normalize_unit_name(unit_name):
+    """
+    The downloadable datasets use units such as "g" and "kcal", while the search API returns "G" and "KCAL". Every
+    unit is upper-cased to match the API, except "kJ" which `pack_nutrients` converts to "KCAL".
+    """
+    if unit_name.lower() == "kj":
+        return "kJ"
+    return unit_name.upper()
@@ -0,0 +1,50 @@
+import logging
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from .threads import close_connection_after
+
+logger = logging.getLogger(__name__)
+
+
+class BackgroundPrefetcher:
+    """
+    Runs prefetches on a small pool of background threads, so the response for the current request is never delayed
+    by warming the cache for the next one. A key that is already being prefetched is not submitted again.
+
+    Like `PooledHTTPClient`, the thread pool is created lazily and recreated whenever the process ID changes, as
+    threads do not survive gunicorn forking its workers.
+    """
+
+    def __init__(self, max_workers):
+        self._max_workers = max_workers
+        self._lock = threading.Lock()
+        self._executor = None
+        self._executor_pid = None
+        self._pending = set()
+
+    def _get_executor(self):
+        if self._executor is None or self._executor_pid != os.getpid():
+            self._executor = ThreadPoolExecutor(max_workers=self._max_workers, thread_name_prefix="food-prefetch")
+            self._executor_pid = os.getpid()
+            self._pending = set()
+        return self._executor
+
+    def _run(self, key, fn):
+        try:
+            fn()
+        except Exception:
+            # A failed prefetch only means the next page is fetched when it is requested.
+            logger.warning("Prefetching %s failed", key, exc_info=True)
+        finally:
+            with self._lock:
+                self._pending.discard(key)
+
+    def submit(self, key, fn):
+        with self._lock:
+            executor = self._get_executor()
+            if key in self._pending:
+                return
+            self._pending.add(key)
+        executor.submit(close_connection_after, self._run, key, fn)
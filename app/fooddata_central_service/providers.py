@@ -0,0 +1,324 @@
+import logging
+import math
+import os
+import threading
+import time
+from abc import ABC, abstractmethod
+from concurrent.futures import ThreadPoolExecutor
+from concurrent.futures import TimeoutError as FutureTimeoutError
+
+from configurations.django_config_parser import django_configs
+from django.core.exceptions import ImproperlyConfigured
+
+from intake.models import FoodEntry
+
+from .cache import normalize_query
+from .exceptions import FoodSearchUnavailable
+from .fuzzy_search import search_similar_local_foods
+from .local_search import search_local_foods
+from .models import Food
+from .nutrients import (
+    CARBOHYDRATE_ID,
+    ENERGY_KCAL_ID,
+    PROTEIN_ID,
+    TOTAL_FAT_ID,
+    pack_nutrients,
+)
+from .services import (
+    FOOD_SEARCH_FUZZY_FALLBACK,
+    NUMBER_OF_FOODS_TO_RETURN,
+    FoodDataCentralService,
+)
+from .threads import close_connection_after
+
+logger = logging.getLogger(__name__)
+
+FOOD_SEARCH_PROVIDERS = [
+    name.strip() for name in django_configs.get("FoodData Central", "FOOD_SEARCH_PROVIDERS").split(",") if name.strip()
+]
+FOOD_SEARCH_REMOTE_PROVIDER_DEADLINE = float(
+    django_configs.get("FoodData Central", "FOOD_SEARCH_REMOTE_PROVIDER_DEADLINE")
+)
+FOOD_SEARCH_LOCAL_PROVIDER_DEADLINE = float(
+    django_configs.get("FoodData Central", "FOOD_SEARCH_LOCAL_PROVIDER_DEADLINE")
+)
+FOOD_SEARCH_PROVIDER_WORKERS = int(django_configs.get("FoodData Central", "FOOD_SEARCH_PROVIDER_WORKERS"))
+
+# The largest `pageSize` accepted by the FoodData Central search endpoint.
+FOOD_DATA_CENTRAL_MAX_PAGE_SIZE = 200
+
+# The constant of reciprocal rank fusion, it stops the first few results of a single provider dominating the merge.
+RANK_CONSTANT = 60
+
+
+class ProvidersUnavailable(FoodSearchUnavailable):
+    """
+    Raised when every provider failed or missed its deadline.
+    """
+
+
+class NutritionProvider(ABC):
+    """
+    A source of foods for `ProviderFanOut`. `search` returns the best `page_number * page_size` foods matching the
+    normalized `query`, ranked by relevance, as `{"foods": [...], "has_next": bool}` where `has_next` is whether more
+    foods match. Foods are in the compact format of `local_search.get_local_foods`.
+
+    `deadline` is the number of seconds the provider is waited for, a provider which misses it is left out of the
+    results. `weight` scales the contribution of each result to the merged ranking. `remote` providers call an
+    external API and are run on their own threads, see `ProviderFanOut`.
+    """
+
+    name = None
+    weight = 1.0
+    remote = False
+
+    def __init__(self, deadline):
+        self.deadline = deadline
+
+    @abstractmethod
+    def search(self, query, page_number, page_size, user):
+        pass
+
+
+class FoodDataCentralProvider(NutritionProvider):
+    """
+    Searches the FoodData Central API. The best `page_number * page_size` foods are requested as a single page of
+    that size, split into pages of `FOOD_DATA_CENTRAL_MAX_PAGE_SIZE` only when more are needed, so a later page does
+    not wait for a request of every page before it. The first page is the same request as the first page of
+    `FoodDataCentralService.get_foods_page`, which it shares through the search cache, and the foods of the following
+    page are prefetched before they are needed.
+    """
+
+    name = "fooddata_central"
+    remote = True
+
+    def search(self, query, page_number, page_size, user):
+        limit = page_number * page_size
+        request_size = min(limit, FOOD_DATA_CENTRAL_MAX_PAGE_SIZE)
+        next_size = limit + page_size
+        next_page = (1, next_size) if next_size <= FOOD_DATA_CENTRAL_MAX_PAGE_SIZE else None
+
+        foods, stale = [], False
+        for number in range(1, math.ceil(limit / request_size) + 1):
+            page = FoodDataCentralService.get_remote_foods_page(query, number, request_size, next_page=next_page)
+            foods.extend(page["foods"])
+            stale = stale or page.get("stale", False)
+            if not page["has_next"]:
+                break
+        result = {"foods": foods[:limit], "has_next": page["has_next"] or len(foods) > limit}
+        if stale:
+            result["stale"] = True
+        return result
+
+
+class LocalFoodProvider(NutritionProvider):
+    """
+    Searches the full-text index of the imported foods of a single dataset, see `local_search.search_local_foods`.
+    """
+
+    data_type = None
+
+    def search(self, query, page_number, page_size, user):
+        limit = page_number * page_size
+        # One extra food is searched for to find out whether another page exists.
+        foods = search_local_foods(query, limit + 1, data_type=self.data_type)
+        return {"foods": foods[:limit], "has_next": len(foods) > limit}
+
+
+class SRLegacyProvider(LocalFoodProvider):
+    name = "sr_legacy"
+    data_type = Food.SR_LEGACY
+
+
+class BrandedFoodProvider(LocalFoodProvider):
+    name = "branded"
+    data_type = Food.BRANDED
+    # Branded Foods holds hundreds of thousands of near identical products, without a lower weight they would push
+    # the generic foods off the first page.
+    weight = 0.5
+
+
+class UserFoodProvider(NutritionProvider):
+    """
+    Searches the foods the user has previously logged, see `intake.models.FoodEntry`. Each entry records the totals
+    of the weight eaten, so they are scaled to 100 g like every other provider. The most recently logged entry of each
+    food name is used.
+    """
+
+    name = "user_foods"
+    # A food the user has logged before is the food they are most likely searching for.
+    weight = 2.0
+
+    def search(self, query, page_number, page_size, user):
+        if user is None or not user.is_authenticated:
+            return {"foods": [], "has_next": False}
+
+        entries = FoodEntry.objects.filter(user=user, food_weight__gt=0)
+        for word in query.split():
+            entries = entries.filter(food_name__icontains=word)
+
+        limit = page_number * page_size
+        foods, food_names = [], set()
+        for entry in entries.order_by("-date", "-id").iterator():
+            food_name = normalize_query(entry.food_name)
+            if food_name in food_names:
+                continue
+            if len(foods) == limit:
+                return {"foods": foods, "has_next": True}
+            food_names.add(food_name)
+            foods.append(self._to_food(entry))
+        return {"foods": foods, "has_next": False}
+
+    @staticmethod
+    def _to_food(entry):
+        per_100_g = 100 / entry.food_weight
+        return {
+            "fdcId": None,
+            "description": entry.food_name,
+            "nutrients": pack_nutrients(
+                (nutrient_id, round(value, 2))
+                for nutrient_id, value in [
+                    (ENERGY_KCAL_ID, entry.total_calories * per_100_g),
+                    (PROTEIN_ID, entry.total_protein * per_100_g),
+                    (TOTAL_FAT_ID, entry.total_fats * per_100_g),
+                    (CARBOHYDRATE_ID, entry.total_carbs * per_100_g),
+                ]
+            ),
+        }
+
+
+PROVIDERS = {
+    FoodDataCentralProvider.name: lambda: FoodDataCentralProvider(deadline=FOOD_SEARCH_REMOTE_PROVIDER_DEADLINE),
+    SRLegacyProvider.name: lambda: SRLegacyProvider(deadline=FOOD_SEARCH_LOCAL_PROVIDER_DEADLINE),
+    BrandedFoodProvider.name: lambda: BrandedFoodProvider(deadline=FOOD_SEARCH_LOCAL_PROVIDER_DEADLINE),
+    UserFoodProvider.name: lambda: UserFoodProvider(deadline=FOOD_SEARCH_LOCAL_PROVIDER_DEADLINE),
+}
+
+
+def merge_results(results):
+    """
+    Merges the ranked foods of several providers into a single ranking using reciprocal rank fusion, where a food
+    scores `weight / (RANK_CONSTANT + rank)` for every provider returning it. Foods are the same when they share an
+    `fdcId` or a normalized description, such as an SR Legacy food returned by both FoodData Central and the local
+    index, and the first provider's copy is kept.
+    """
+    merged, scores = [], []
+    by_fdc_id, by_description = {}, {}
+
+    for provider, result in results:
+        for rank, food in enumerate(result["foods"], start=1):
+            description = normalize_query(food["description"])
+            index = by_fdc_id.get(food["fdcId"]) if food["fdcId"] is not None else None
+            if index is None:
+                index = by_description.get(description)
+            if index is None:
+                index = len(merged)
+                merged.append(food)
+                scores.append(0.0)
+
+            scores[index] += provider.weight / (RANK_CONSTANT + rank)
+            if food["fdcId"] is not None:
+                by_fdc_id.setdefault(food["fdcId"], index)
+            by_description.setdefault(description, index)
+
+    # `sorted` is stable, so foods scoring the same keep the order of the providers.
+    return [merged[index] for index in sorted(range(len(merged)), key=lambda index: -scores[index])]
+
+
+class ProviderFanOut:
+    """
+    Searches every provider concurrently, so a search takes as long as the slowest provider rather than the sum of
+    all of them. Each provider is waited for until its own deadline, measured from the start of the search, and
+    providers which fail or miss their deadline are left out of the results.
+
+    A remote provider which missed its deadline keeps its thread until its request times out, which can take far
+    longer than the deadline. Remote and local providers therefore run on separate thread pools of `max_workers`
+    each, so slow requests to an external API never leave the local providers waiting for a thread.
+
+    Like `BackgroundPrefetcher`, the thread pools are created lazily and recreated whenever the process ID changes.
+    """
+
+    def __init__(self, providers, max_workers):
+        self.providers = providers
+        self._max_workers = max_workers
+        self._lock = threading.Lock()
+        self._executors = {}
+        self._executors_pid = None
+
+    def _get_executor(self, remote):
+        with self._lock:
+            if self._executors_pid != os.getpid():
+                self._executors = {}
+                self._executors_pid = os.getpid()
+            if remote not in self._executors:
+                self._executors[remote] = ThreadPoolExecutor(
+                    max_workers=self._max_workers,
+                    thread_name_prefix="food-remote-provider" if remote else "food-local-provider",
+                )
+            return self._executors[remote]
+
+    def search(self, query, page_number, page_size, user=None):
+        """
+        Returns a single page of the merged foods, in the same format as `FoodDataCentralService.get_foods_page`.
+        Raises `ProvidersUnavailable` when no provider returned a result.
+        """
+        started = time.monotonic()
+        futures = [
+            (
+                provider,
+                self._get_executor(provider.remote).submit(
+                    close_connection_after, provider.search, query, page_number, page_size, user
+                ),
+            )
+            for provider in self.providers
+        ]
+
+        results = []
+        for provider, future in futures:
+            try:
+                results.append(
+                    (provider, future.result(timeout=max(0, started + provider.deadline - time.monotonic())))
+                )
+            except FutureTimeoutError:
+                logger.warning("Food provider %s missed its deadline of %s seconds", provider.name, provider.deadline)
+            except Exception:
+                logger.warning("Food provider %s failed", provider.name, exc_info=True)
+
+        if not results:
+            raise ProvidersUnavailable("Every food provider failed or missed its deadline")
+
+        foods = merge_results(results)
+        start = (page_number - 1) * page_size
+        page = {
+            "foods": foods[start : start + page_size],
+            "has_next": len(foods) > start + page_size or any(result["has_next"] for _, result in results),
+        }
+        if any(result.get("stale") for _, result in results):
+            page["stale"] = True
+        return page
+
+
+def _create_providers(names):
+    try:
+        return [PROVIDERS[name]() for name in names]
+    except KeyError as error:
+        raise ImproperlyConfigured(f"Unknown food search provider {error}, expected one of {', '.join(PROVIDERS)}")
+
+
+food_search_fan_out = ProviderFanOut(_create_providers(FOOD_SEARCH_PROVIDERS), max_workers=FOOD_SEARCH_PROVIDER_WORKERS)
+
+
+def search_foods(query, page_number=1, page_size=NUMBER_OF_FOODS_TO_RETURN, user=None):
+    """
+    Searches for foods as `FoodSearchView` does. Without `FOOD_SEARCH_PROVIDERS`, this is
+    `FoodDataCentralService.get_foods_page`. Otherwise every configured provider is searched concurrently and the
+    results are merged, see `ProviderFanOut`, falling back to the typo tolerant search like `get_foods_page`.
+    """
+    if not food_search_fan_out.providers:
+        return FoodDataCentralService.get_foods_page(query, page_number, page_size)
+
+    query = normalize_query(query)
+    page = food_search_fan_out.search(query, page_number, page_size, user)
+    if not page["foods"] and page_number == 1 and FOOD_SEARCH_FUZZY_FALLBACK:
+        return {"foods": search_similar_local_foods(query, page_size), "has_next": False}
+    return page
@@ -0,0 +1,144 @@
+import functools
+import time
+from contextvars import ContextVar
+
+from configurations.django_config_parser import django_configs
+from django.db import transaction
+
+from .exceptions import FoodSearchUnavailable
+from .models import ApiQuota
+
+FOOD_DATA_CENTRAL_REQUESTS_PER_HOUR = int(django_configs.get("FoodData Central", "FOOD_DATA_CENTRAL_REQUESTS_PER_HOUR"))
+FOOD_DATA_CENTRAL_BURST = int(django_configs.get("FoodData Central", "FOOD_DATA_CENTRAL_BURST"))
+FOOD_DATA_CENTRAL_LOW_PRIORITY_RESERVE = float(
+    django_configs.get("FoodData Central", "FOOD_DATA_CENTRAL_LOW_PRIORITY_RESERVE")
+)
+FOOD_DATA_CENTRAL_QUOTA_MAX_WAIT = float(django_configs.get("FoodData Central", "FOOD_DATA_CENTRAL_QUOTA_MAX_WAIT"))
+
+HIGH_PRIORITY = "high"
+LOW_PRIORITY = "low"
+
+request_priority = ContextVar("request_priority", default=HIGH_PRIORITY)
+
+
+def low_priority(fn):
+    """
+    Wraps `fn` so every request to FoodData Central it makes is low priority. Used for work nobody is waiting on, such
+    as prefetching the next page or refreshing a stale result.
+    """
+
+    @functools.wraps(fn)
+    def wrapper(*args, **kwargs):
+        token = request_priority.set(LOW_PRIORITY)
+        try:
+            return fn(*args, **kwargs)
+        finally:
+            request_priority.reset(token)
+
+    return wrapper
+
+
+class QuotaExceeded(FoodSearchUnavailable):
+    """
+    Raised instead of making a request when the API key has no quota left for it.
+    """
+
+
+class TokenBucket:
+    """
+    A token bucket stored in a single `ApiQuota` row, metering requests made using the FoodData Central API key by
+    every gunicorn worker and Fly machine. The bucket holds at most `capacity` tokens and refills at
+    `requests_per_hour`, each request takes one token.
+
+    The row is locked using `select_for_update` while a token is taken, so concurrent processes never both take the
+    last token. The refill is calculated from the time since the row was last updated, nothing runs in the background.
+
+    Requests are either,
+
+    - High priority - A user is waiting on the request. When the bucket is empty the request waits for the next token,
+      for at most `max_wait` seconds.
+    - Low priority - Nobody is waiting on the request. It is shed immediately unless the bucket is more than `reserve`
+      full, leaving the remainder of the quota to users.
+    """
+
+    def __init__(self, name, requests_per_hour, capacity, reserve, max_wait):
+        self._name = name
+        self._rate = requests_per_hour / 3600
+        self._capacity = capacity
+        self._reserve = reserve
+        self._max_wait = max_wait
+
+    def _refilled_tokens(self, bucket, now):
+        return min(self._capacity, bucket.tokens + max(0.0, now - bucket.updated_at) * self._rate)
+
+    def _create_bucket(self, now):
+        """
+        Creates the row of a full bucket and locks it. Several processes can find the row missing at once, so the row
+        is inserted skipping a conflict with the row of another process, and whichever row was stored is locked.
+        """
+        ApiQuota.objects.bulk_create(
+            [ApiQuota(name=self._name, tokens=self._capacity, updated_at=now)], ignore_conflicts=True
+        )
+        return ApiQuota.objects.select_for_update().get(name=self._name)
+
+    def _try_acquire(self, priority):
+        """
+        Returns 0 if a token was taken, otherwise the number of seconds until one is available for `priority`.
+        """
+        minimum_tokens = self._capacity * self._reserve if priority == LOW_PRIORITY else 0
+
+        with transaction.atomic():
+            now = time.time()
+            bucket = ApiQuota.objects.select_for_update().filter(name=self._name).first()
+            if bucket is None:
+                bucket = self._create_bucket(now)
+            tokens = self._refilled_tokens(bucket, now)
+            if tokens - 1 < minimum_tokens:
+                return (minimum_tokens + 1 - tokens) / self._rate
+
+            bucket.tokens = tokens - 1
+            bucket.updated_at = now
+            bucket.save(update_fields=["tokens", "updated_at"])
+            return 0
+
+    def acquire(self, deadline=None):
+        """
+        Takes a token for the priority of the current context, see `low_priority`. Raises `QuotaExceeded` if a low
+        priority request must be shed, or a high priority request would wait past `max_wait` or the `deadline`, a
+        `time.monotonic` timestamp.
+        """
+        priority = request_priority.get()
+        max_wait = self._max_wait if priority == HIGH_PRIORITY else 0
+        wait_until = time.monotonic() + max_wait
+        if deadline is not None:
+            wait_until = min(wait_until, deadline)
+
+        while (wait := self._try_acquire(priority)) > 0:
+            if time.monotonic() + wait > wait_until:
+                raise QuotaExceeded(f"FoodData Central API key quota exhausted for {priority} priority requests")
+            time.sleep(wait)
+
+    def remaining(self):
+        """
+        The number of requests which can currently be made, shared by every process.
+        """
+        bucket = ApiQuota.objects.filter(name=self._name).first()
+        if bucket is None:
+            return self._capacity
+        return self._refilled_tokens(bucket, time.time())
+
+    @property
+    def capacity(self):
+        return self._capacity
+
+    def reset(self):
+        ApiQuota.objects.filter(name=self._name).delete()
+
+
+food_data_central_quota = TokenBucket(
+    name="fooddata-central",
+    requests_per_hour=FOOD_DATA_CENTRAL_REQUESTS_PER_HOUR,
+    capacity=FOOD_DATA_CENTRAL_BURST,
+    reserve=FOOD_DATA_CENTRAL_LOW_PRIORITY_RESERVE,
+    max_wait=FOOD_DATA_CENTRAL_QUOTA_MAX_WAIT,
+)
@@ -1,23 +1,132 @@
+import base64
+import binascii
+import json
+
 from rest_framework import serializers
 
+from .barcode import is_valid_gtin, normalize_gtin
+from .nutrients import (
+    CALORIES_INDEX,
+    CARBS_INDEX,
+    FAT_INDEX,
+    MACRONUTRIENTS,
+    NUTRIENT_PROFILE,
+    PROTEIN_INDEX,
+)
+from .services import MAX_NUMBER_OF_FOODS_TO_RETURN, NUMBER_OF_FOODS_TO_RETURN
+
+MAX_FDC_IDS_PER_LOOKUP = 50
+
+
+def encode_cursor(page_number, page_size):
+    return base64.urlsafe_b64encode(json.dumps({"page": page_number, "page_size": page_size}).encode()).decode()
+
+
+def decode_cursor(cursor):
+    """
+    The cursor is opaque to the client, it is returned as `next_cursor` and sent back unchanged to request the next
+    page. It holds the page size as well, so the pages stay aligned if the client changes `page_size` while scrolling.
+    """
+    try:
+        decoded = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+        page_number, page_size = int(decoded["page"]), int(decoded["page_size"])
+    except (binascii.Error, ValueError, TypeError, KeyError):
+        raise serializers.ValidationError("Invalid cursor")
+
+    if page_number < 1 or not 1 <= page_size <= MAX_NUMBER_OF_FOODS_TO_RETURN:
+        raise serializers.ValidationError("Invalid cursor")
+    return page_number, page_size
+
+
+class FoodSearchQuerySerializer(serializers.Serializer):
+    food = serializers.CharField()
+    page_size = serializers.IntegerField(
+        min_value=1, max_value=MAX_NUMBER_OF_FOODS_TO_RETURN, default=NUMBER_OF_FOODS_TO_RETURN
+    )
+    cursor = serializers.CharField(required=False)
+    detailed = serializers.BooleanField(default=False)
+
+    def validate(self, data):
+        if "cursor" in data:
+            data["page_number"], data["page_size"] = decode_cursor(data.pop("cursor"))
+        else:
+            data["page_number"] = 1
+        return data
+
+
+class FoodDetailsQuerySerializer(serializers.Serializer):
+    fdc_ids = serializers.CharField()
+    detailed = serializers.BooleanField(default=False)
+
+    def validate_fdc_ids(self, fdc_ids):
+        """
+        `fdc_ids` is a comma separated list such as "171474,171077". Duplicates are removed, keeping the order.
+        """
+        try:
+            fdc_ids = list(dict.fromkeys(int(fdc_id) for fdc_id in fdc_ids.split(",")))
+        except ValueError:
+            raise serializers.ValidationError("Must be a comma separated list of fdcIds")
+
+        if any(fdc_id < 1 for fdc_id in fdc_ids):
+            raise serializers.ValidationError("Must be a comma separated list of fdcIds")
+        if len(fdc_ids) > MAX_FDC_IDS_PER_LOOKUP:
+            raise serializers.ValidationError(f"At most {MAX_FDC_IDS_PER_LOOKUP} fdcIds can be requested at once")
+        return fdc_ids
+
+
+class FoodBarcodeQuerySerializer(serializers.Serializer):
+    gtin = serializers.CharField()
+    detailed = serializers.BooleanField(default=False)
+
+    def validate_gtin(self, gtin):
+        """
+        Accepts the 8, 12, 13 or 14 digit barcode as scanned, returning it normalized to 14 digits.
+        """
+        normalized_gtin = normalize_gtin(gtin)
+        if normalized_gtin is None:
+            raise serializers.ValidationError("Must be an 8, 12, 13 or 14 digit GTIN/UPC")
+        if not is_valid_gtin(normalized_gtin):
+            raise serializers.ValidationError("Invalid check digit")
+        return normalized_gtin
+
 
 class FoodSearchResultSerializer(serializers.Serializer):
-    description = serializers.SerializerMethodField()
-    calories = serializers.SerializerMethodField()
-    protein = serializers.SerializerMethodField()
-    fat = serializers.SerializerMethodField()
-    carbs = serializers.SerializerMethodField()
-
-    def get_nutrient_info(self, food_nutrients, nutrient_name):
-        for nutrient in food_nutrients:
-            if nutrient["nutrientName"] == nutrient_name:
-                return {"value": nutrient["value"], "unit": nutrient["unitName"]}
+    """
+    Foods hold the values of `nutrients.NUTRIENT_PROFILE` as a fixed order list, see `nutrients.pack_nutrients`, so
+    every field is a single list index. The fields below are declared for documentation only.
+
+    With `{"detailed": True}` as the serializer context, the rest of the nutrient profile is returned as `nutrients`,
+    such as fiber, sugars, sodium and vitamins.
+    """
+
+    description = serializers.CharField(read_only=True)
+    calories = serializers.DictField(read_only=True)
+    protein = serializers.DictField(read_only=True)
+    fat = serializers.DictField(read_only=True)
+    carbs = serializers.DictField(read_only=True)
+
+    def to_representation(self, food):
+        nutrients = food["nutrients"]
+        representation = {
+            "description": food["description"],
+            "calories": self.get_calories(nutrients),
+            "protein": self.get_protein(nutrients),
+            "fat": self.get_fat(nutrients),
+            "carbs": self.get_carbs(nutrients),
+        }
+        if self.context.get("detailed"):
+            representation["nutrients"] = {
+                NUTRIENT_PROFILE[index].field: self.get_nutrient_info(nutrients, index)
+                for index in range(MACRONUTRIENTS, len(NUTRIENT_PROFILE))
+            }
+        return representation
+
+    def get_nutrient_info(self, nutrients, index):
+        if (value := nutrients[index]) is not None:
+            return {"value": value, "unit": NUTRIENT_PROFILE[index].unit}
         return None
 
-    def get_description(self, food):
-        return food["description"]
-
-    def get_calories(self, food):
+    def get_calories(self, nutrients):
         """
         The FoodData Central API returns multiple variations of Energy,
 
@@ -26,22 +135,15 @@ class FoodSearchResultSerializer(serializers.Serializer):
         - Energy - with unit_name = "KCAL"
         - Energy - with unit_name = "kJ"
 
-        However, the SR Legacy food only returns "Energy". However, the unit_name
-        needs to be inspected to determine if the unit is "KCAL" or "kJ".
+        However, the SR Legacy food only returns "Energy", either in "KCAL" or "kJ". An energy only reported in "kJ"
+        is converted to "KCAL" by `pack_nutrients`, so calories are always in "KCAL".
         """
+        return self.get_nutrient_info(nutrients, CALORIES_INDEX)
 
-        def _kj_to_kcal(info):
-            if info["unit"] == "kJ":
-                info["unit"] = "KCAL"
-                info["value"] = round(info["value"] / 4.18, 2)
-            return info
-
-        return _kj_to_kcal(self.get_nutrient_info(food["foodNutrients"], "Energy"))
+    def get_protein(self, nutrients):
+        return self.get_nutrient_info(nutrients, PROTEIN_INDEX)
 
-    def get_protein(self, food):
-        return self.get_nutrient_info(food["foodNutrients"], "Protein")
-
-    def get_fat(self, food):
+    def get_fat(self, nutrients):
         """
         The FoodData Central API returns multiple variations of fats,
 
@@ -99,9 +201,9 @@ class FoodSearchResultSerializer(serializers.Serializer):
         For the purpose of my API, I will be using "Total lipd (fat)" to only track
         the sum of all fats.
         """
-        return self.get_nutrient_info(food["foodNutrients"], "Total lipid (fat)")
+        return self.get_nutrient_info(nutrients, FAT_INDEX)
 
-    def get_carbs(self, food):
+    def get_carbs(self, nutrients):
         """
         The FoodData Central API returns multiple variations of carbohydrates,
 
@@ -123,4 +225,11 @@ class FoodSearchResultSerializer(serializers.Serializer):
         measuring other components like protein or fat. The "by difference" method offers a
         practical and reasonably accurate way to estimate carbohydrates.
         """
-        return self.get_nutrient_info(food["foodNutrients"], "Carbohydrate, by difference")
+        return self.get_nutrient_info(nutrients, CARBS_INDEX)
+
+
+class FoodDetailSerializer(FoodSearchResultSerializer):
+    fdc_id = serializers.IntegerField(read_only=True)
+
+    def to_representation(self, food):
+        return {"fdc_id": food["fdcId"], **super().to_representation(food)}
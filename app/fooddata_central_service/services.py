@@ -1,9 +1,74 @@
-import requests
+import time
+
 from configurations.django_config_parser import django_configs
 
+from .autocomplete import food_autocomplete_index
+from .cache import food_detail_cache, food_search_cache, normalize_query, page_cache_key
+from .circuit_breaker import food_data_central_circuit_breaker
+from .fuzzy_search import search_similar_local_foods
+from .http_client import food_data_central_client
+from .local_search import get_local_foods, search_local_foods
+from .nutrients import EXTRACTED_NUTRIENT_NUMBERS, pack_nutrients
+from .prefetch import BackgroundPrefetcher
+from .quota import low_priority
+from .single_flight import SingleFlight
+
 FOODDATA_CENTRAL_API_KEY = django_configs.get("FoodData Central", "FOODDATA_CENTRAL_API_KEY")
 
+API_SEARCH_SOURCE = "api"
+LOCAL_SEARCH_SOURCE = "local"
+FOOD_SEARCH_SOURCE = django_configs.get("FoodData Central", "FOOD_SEARCH_SOURCE")
+FOOD_SEARCH_FUZZY_FALLBACK = django_configs.get("FoodData Central", "FOOD_SEARCH_FUZZY_FALLBACK") == "True"
+
+FOOD_SEARCH_COALESCE_ACROSS_WORKERS = (
+    django_configs.get("FoodData Central", "FOOD_SEARCH_COALESCE_ACROSS_WORKERS") == "True"
+)
+FOOD_SEARCH_LOCK_TIMEOUT = int(django_configs.get("FoodData Central", "FOOD_SEARCH_LOCK_TIMEOUT"))
+FOOD_SEARCH_LOCK_POLL_INTERVAL = float(django_configs.get("FoodData Central", "FOOD_SEARCH_LOCK_POLL_INTERVAL"))
+
+FOOD_SEARCH_PREFETCH_NEXT_PAGE = django_configs.get("FoodData Central", "FOOD_SEARCH_PREFETCH_NEXT_PAGE") == "True"
+FOOD_SEARCH_PREFETCH_WORKERS = int(django_configs.get("FoodData Central", "FOOD_SEARCH_PREFETCH_WORKERS"))
+
 NUMBER_OF_FOODS_TO_RETURN = 20
+MAX_NUMBER_OF_FOODS_TO_RETURN = 50
+MAX_FDC_IDS_PER_REQUEST = 20
+MAX_NUTRIENTS_PER_REQUEST = 25
+
+food_search_single_flight = SingleFlight()
+food_search_prefetcher = BackgroundPrefetcher(max_workers=FOOD_SEARCH_PREFETCH_WORKERS)
+
+
+def _compact_food(food):
+    """
+    A single SR Legacy food from the search endpoint contains 100+ nutrients, each with 15 fields of provenance
+    data. Only the values read by `FoodSearchResultSerializer` are kept, packed in the fixed order of
+    `nutrients.NUTRIENT_PROFILE`, which shrinks a cached search result by roughly 98% and keeps far more queries inside
+    the bounded local cache.
+    """
+    return {
+        "fdcId": food.get("fdcId"),
+        "description": food["description"],
+        "nutrients": pack_nutrients(
+            (nutrient.get("nutrientId"), nutrient["value"]) for nutrient in food["foodNutrients"] if "value" in nutrient
+        ),
+    }
+
+
+def _compact_food_detail(food):
+    """
+    The multi food endpoint uses a different format than the search endpoint, each nutrient is nested as
+    `{"nutrient": {"id": 1003, "name": "Protein", "unitName": "g"}, "amount": 20.8}`. It is converted to the same
+    compact format as `_compact_food`, so both are serialized by `FoodSearchResultSerializer`.
+    """
+    return {
+        "fdcId": food["fdcId"],
+        "description": food["description"],
+        "nutrients": pack_nutrients(
+            (food_nutrient["nutrient"]["id"], food_nutrient["amount"])
+            for food_nutrient in food.get("foodNutrients", [])
+            if "amount" in food_nutrient
+        ),
+    }
 
 
 class FoodDataCentralService:
@@ -20,8 +85,10 @@ class FoodDataCentralService:
     BASE_URL = "https://api.nal.usda.gov/fdc/v1/foods"
 
     @staticmethod
-    def get_foods_by_query_name(query):
+    def search_food(query, page_number=1, page_size=NUMBER_OF_FOODS_TO_RETURN):
         """
+        Performs the request against the FoodData Central search endpoint and returns the raw JSON response.
+
         The FoodData Central API offers five types of food groups,
 
         - Foundation Foods
@@ -35,9 +102,187 @@ class FoodDataCentralService:
             "query": query,
             "api_key": FOODDATA_CENTRAL_API_KEY,
             "dataType": ["SR Legacy"],
-            "pageSize": NUMBER_OF_FOODS_TO_RETURN,
-            "pageNumber": 1,
+            "pageSize": page_size,
+            "pageNumber": page_number,
         }
-        response = requests.get(url, params=params)
+        response = food_data_central_client.get(url, params=params)
         response.raise_for_status()
-        return response.json().get("foods", [])
+        return response.json()
+
+    @staticmethod
+    def get_foods(fdc_ids):
+        """
+        Performs the request against the FoodData Central multi food endpoint and returns the raw JSON response.
+        FoodData Central accepts at most 20 `fdcIds` and 25 `nutrients` per request, so only the extracted nutrients
+        are requested, split across as many requests as needed, and the nutrients of each food are merged.
+        """
+        foods = {}
+        for i in range(0, len(EXTRACTED_NUTRIENT_NUMBERS), MAX_NUTRIENTS_PER_REQUEST):
+            params = {
+                "fdcIds": ",".join(str(fdc_id) for fdc_id in fdc_ids),
+                "format": "full",
+                "nutrients": ",".join(EXTRACTED_NUTRIENT_NUMBERS[i : i + MAX_NUTRIENTS_PER_REQUEST]),
+                "api_key": FOODDATA_CENTRAL_API_KEY,
+            }
+            response = food_data_central_client.get(FoodDataCentralService.BASE_URL, params=params)
+            response.raise_for_status()
+            for food in response.json():
+                if food["fdcId"] in foods:
+                    foods[food["fdcId"]]["foodNutrients"].extend(food.get("foodNutrients", []))
+                else:
+                    foods[food["fdcId"]] = {**food, "foodNutrients": list(food.get("foodNutrients", []))}
+        return list(foods.values())
+
+    @staticmethod
+    def get_foods_by_fdc_ids(fdc_ids):
+        """
+        Returns a dictionary of `fdcId` to food for every food found, in the same format as `get_foods_by_query_name`.
+
+        Each food is cached individually in `food_detail_cache`, so lists sharing foods share cache entries. Foods
+        missing from the cache are read from the imported SR Legacy foods, and only the remainder is requested from
+        FoodData Central, 20 at a time.
+
+        Raises `CircuitOpenError` if foods must be requested while the circuit breaker is open.
+        """
+        foods = {int(fdc_id): food for fdc_id, food in food_detail_cache.get_many(map(str, fdc_ids)).items()}
+
+        missing = [fdc_id for fdc_id in fdc_ids if fdc_id not in foods]
+        found = {food["fdcId"]: food for food in get_local_foods(missing)} if missing else {}
+
+        missing = [fdc_id for fdc_id in missing if fdc_id not in found]
+        for i in range(0, len(missing), MAX_FDC_IDS_PER_REQUEST):
+            batch = missing[i : i + MAX_FDC_IDS_PER_REQUEST]
+            for food in food_data_central_circuit_breaker.call(FoodDataCentralService.get_foods, batch):
+                food = _compact_food_detail(food)
+                found[food["fdcId"]] = food
+
+        if found:
+            food_detail_cache.set_many({str(fdc_id): food for fdc_id, food in found.items()})
+        return {**foods, **found}
+
+    @staticmethod
+    def get_foods_by_query_name(query):
+        """
+        Returns the first page of foods matching `query`, see `get_foods_page`.
+        """
+        return FoodDataCentralService.get_foods_page(query)["foods"]
+
+    @staticmethod
+    def get_foods_page(query, page_number=1, page_size=NUMBER_OF_FOODS_TO_RETURN):
+        """
+        Returns a single page of foods matching `query` as `{"foods": [...], "has_next": bool}`. A page served from
+        the cache after it stopped being fresh additionally contains `"stale": True`.
+
+        SR Legacy data is effectively static, so search results are served from `food_search_cache` whenever
+        possible. Only a miss on both cache tiers results in a request to FoodData Central. While a page is returned,
+        the following page is fetched and cached in the background, so it is already cached when the user scrolls.
+
+        Empty results are cached as well, repeated searches for a misspelt food should not use the API key quota.
+
+        When `FOOD_SEARCH_SOURCE` is "local", foods are instead searched in the full-text index populated by
+        `python manage.py import_sr_legacy`. The index is already a single database query, so it is not cached.
+
+        A search without results is usually a misspelling such as "brocoli", with `FOOD_SEARCH_FUZZY_FALLBACK` enabled
+        the imported foods are then searched again by trigram similarity.
+
+        Requests to FoodData Central go through `food_data_central_circuit_breaker`. An expired page is returned as
+        stale immediately and refreshed in the background, or not refreshed at all while the circuit is open. Raises
+        `CircuitOpenError` when the circuit is open and the page has never been cached.
+        """
+        query = normalize_query(query)
+
+        if FOOD_SEARCH_SOURCE == LOCAL_SEARCH_SOURCE:
+            page = FoodDataCentralService._search_local_page(query, page_number, page_size)
+        else:
+            page = FoodDataCentralService.get_remote_foods_page(query, page_number, page_size)
+
+        if not page["foods"] and page_number == 1 and FOOD_SEARCH_FUZZY_FALLBACK:
+            return {"foods": search_similar_local_foods(query, page_size), "has_next": False}
+        return page
+
+    @staticmethod
+    def get_remote_foods_page(query, page_number=1, page_size=NUMBER_OF_FOODS_TO_RETURN, next_page=None):
+        """
+        Returns a single page of foods matching the normalized `query` from FoodData Central, using the cache and
+        prefetching the following page as described by `get_foods_page`. `next_page` is the `(page_number,
+        page_size)` of the page requested after this one, by default the following page of the same size.
+        """
+        page = FoodDataCentralService._get_cached_page(query, page_number, page_size)
+        if page["has_next"] and FOOD_SEARCH_PREFETCH_NEXT_PAGE and not food_data_central_circuit_breaker.is_open:
+            next_page_number, next_page_size = next_page or (page_number + 1, page_size)
+            food_search_prefetcher.submit(
+                page_cache_key(query, next_page_number, next_page_size),
+                low_priority(lambda: FoodDataCentralService._get_cached_page(query, next_page_number, next_page_size)),
+            )
+        return page
+
+    @staticmethod
+    def _search_local_page(query, page_number, page_size):
+        # One extra food is searched for to find out whether another page exists.
+        foods = search_local_foods(query, page_size + 1, offset=(page_number - 1) * page_size)
+        return {"foods": foods[:page_size], "has_next": len(foods) > page_size}
+
+    @staticmethod
+    def _get_cached_page(query, page_number, page_size):
+        key = page_cache_key(query, page_number, page_size)
+        if (page := food_search_cache.get(key)) is not None:
+            return page
+
+        def fetch_page():
+            return food_search_single_flight.do(
+                key, lambda: FoodDataCentralService._fetch_page(key, query, page_number, page_size)
+            )
+
+        if (stale_page := food_search_cache.get_stale(key)) is not None:
+            if not food_data_central_circuit_breaker.is_open:
+                food_search_prefetcher.submit(key, low_priority(fetch_page))
+            return {**stale_page, "stale": True}
+
+        return fetch_page()
+
+    @staticmethod
+    def _wait_for_other_worker(key):
+        """
+        Polls the shared cache while another worker holds the lock for `key`. Returns None if the lock is released
+        or expires without a result being cached, for example when the other worker's request failed.
+        """
+        deadline = time.monotonic() + FOOD_SEARCH_LOCK_TIMEOUT
+        while time.monotonic() < deadline:
+            time.sleep(FOOD_SEARCH_LOCK_POLL_INTERVAL)
+            if (page := food_search_cache.get(key)) is not None:
+                return page
+            if not food_search_cache.is_locked(key):
+                return None
+        return None
+
+    @staticmethod
+    def _fetch_page(key, query, page_number, page_size):
+        """
+        Only a single caller per process reaches this for a given page at a time, see `food_search_single_flight`.
+        When `FOOD_SEARCH_COALESCE_ACROSS_WORKERS` is enabled, a lock row in the shared cache additionally lets a
+        single worker request FoodData Central while the others wait for its result to be cached.
+        """
+        # A previous flight may have completed between the cache miss and becoming the leader.
+        if (page := food_search_cache.get(key)) is not None:
+            return page
+
+        has_lock = False
+        if FOOD_SEARCH_COALESCE_ACROSS_WORKERS:
+            has_lock = food_search_cache.acquire_lock(key, timeout=FOOD_SEARCH_LOCK_TIMEOUT)
+            if not has_lock and (page := FoodDataCentralService._wait_for_other_worker(key)) is not None:
+                return page
+
+        try:
+            response = food_data_central_circuit_breaker.call(
+                FoodDataCentralService.search_food, query, page_number, page_size
+            )
+            page = {
+                "foods": [_compact_food(food) for food in response.get("foods", [])],
+                "has_next": page_number < response.get("totalPages", 0),
+            }
+            food_search_cache.set(key, page)
+            food_autocomplete_index.add(food["description"] for food in page["foods"])
+        finally:
+            if has_lock:
+                food_search_cache.release_lock(key)
+        return page
@@ -0,0 +1,176 @@
+import hashlib
+import json
+import random
+import threading
+import time
+from pathlib import Path
+from urllib.parse import parse_qsl, urlsplit
+
+import requests
+from configurations.django_config_parser import django_configs
+from requests.adapters import BaseAdapter, HTTPAdapter
+from requests.structures import CaseInsensitiveDict
+
+OFF = "off"
+RECORD = "record"
+REPLAY = "replay"
+
+FOOD_DATA_CENTRAL_STAND_IN = django_configs.get("FoodData Central", "FOOD_DATA_CENTRAL_STAND_IN")
+FOOD_DATA_CENTRAL_RECORDINGS = django_configs.get("FoodData Central", "FOOD_DATA_CENTRAL_RECORDINGS")
+FOOD_DATA_CENTRAL_STAND_IN_LATENCY = float(django_configs.get("FoodData Central", "FOOD_DATA_CENTRAL_STAND_IN_LATENCY"))
+FOOD_DATA_CENTRAL_STAND_IN_JITTER = float(django_configs.get("FoodData Central", "FOOD_DATA_CENTRAL_STAND_IN_JITTER"))
+FOOD_DATA_CENTRAL_STAND_IN_ERROR_RATE = float(
+    django_configs.get("FoodData Central", "FOOD_DATA_CENTRAL_STAND_IN_ERROR_RATE")
+)
+FOOD_DATA_CENTRAL_STAND_IN_REQUESTS_PER_SECOND = int(
+    django_configs.get("FoodData Central", "FOOD_DATA_CENTRAL_STAND_IN_REQUESTS_PER_SECOND")
+)
+FOOD_DATA_CENTRAL_STAND_IN_SEED = int(django_configs.get("FoodData Central", "FOOD_DATA_CENTRAL_STAND_IN_SEED"))
+
+# The API key is sent as a query parameter, it must never be written to a recording or change which one is replayed.
+IGNORED_PARAMETERS = frozenset({"api_key"})
+
+
+def recording_key(url):
+    """
+    Identifies the request to `url`, independent of the order of its query parameters and the API key used.
+    """
+    parts = urlsplit(url)
+    params = sorted((name, value) for name, value in parse_qsl(parts.query) if name not in IGNORED_PARAMETERS)
+    return json.dumps([parts.path, params])
+
+
+def _recording_path(directory, url):
+    return Path(directory) / f"{hashlib.sha256(recording_key(url).encode()).hexdigest()}.json"
+
+
+def save_recording(directory, url, status_code, body):
+    """
+    Saves the response to `url` so it can be replayed by `ReplayAdapter`. The recording is readable JSON, so recordings
+    can also be written by hand.
+    """
+    Path(directory).mkdir(parents=True, exist_ok=True)
+    recording = {"request": json.loads(recording_key(url)), "status_code": status_code, "body": body}
+    _recording_path(directory, url).write_text(json.dumps(recording), encoding="utf-8")
+
+
+def _build_response(request, status_code, content, headers=None):
+    response = requests.Response()
+    response.status_code = status_code
+    response.reason = "Replayed"
+    response.headers = CaseInsensitiveDict({"Content-Type": "application/json", **(headers or {})})
+    response._content = content
+    response.encoding = "utf-8"
+    response.url = request.url
+    response.request = request
+    return response
+
+
+class RecordingAdapter(HTTPAdapter):
+    """
+    Sends requests to FoodData Central as normal, saving every successful response to `directory`.
+    """
+
+    def __init__(self, directory, **kwargs):
+        super().__init__(**kwargs)
+        self._directory = directory
+
+    def send(self, request, **kwargs):
+        response = super().send(request, **kwargs)
+        if response.status_code == 200:
+            save_recording(self._directory, request.url, response.status_code, response.json())
+        return response
+
+
+class ReplayAdapter(BaseAdapter):
+    """
+    A local stand-in for FoodData Central, replaying the responses saved by `RecordingAdapter` without any network
+    access. Requests which were never recorded are answered with 404.
+
+    The stand-in can behave like a slow or struggling FoodData Central,
+
+    1. Every response is delayed by `latency` seconds, varied by up to `jitter` seconds either side. When the delay
+       exceeds the read timeout of the request, `requests.ReadTimeout` is raised once the timeout has passed.
+    2. A fraction `error_rate` of requests is answered with 503.
+    3. Requests beyond `requests_per_second` within the current second are answered with 429, 0 is unlimited.
+
+    Latency and errors are drawn from a random generator seeded by `seed`, so a benchmark is repeatable.
+    """
+
+    def __init__(self, directory, latency=0.0, jitter=0.0, error_rate=0.0, requests_per_second=0, seed=0):
+        super().__init__()
+        self._directory = directory
+        self._latency = latency
+        self._jitter = jitter
+        self._error_rate = error_rate
+        self._requests_per_second = requests_per_second
+
+        self._lock = threading.Lock()
+        self._random = random.Random(seed)
+        self._recordings = {}
+        self._window = None
+        self._requests_in_window = 0
+
+    def _recording(self, url):
+        path = _recording_path(self._directory, url)
+        with self._lock:
+            if path not in self._recordings:
+                self._recordings[path] = json.loads(path.read_text(encoding="utf-8")) if path.exists() else None
+            return self._recordings[path]
+
+    def _is_throttled(self):
+        if not self._requests_per_second:
+            return False
+        with self._lock:
+            window = int(time.monotonic())
+            if window != self._window:
+                self._window, self._requests_in_window = window, 0
+            self._requests_in_window += 1
+            return self._requests_in_window > self._requests_per_second
+
+    def _simulate_latency(self, timeout):
+        with self._lock:
+            latency = max(0.0, self._latency + self._random.uniform(-self._jitter, self._jitter))
+        read_timeout = timeout[1] if isinstance(timeout, tuple) else timeout
+        if read_timeout is not None and latency > read_timeout:
+            time.sleep(read_timeout)
+            raise requests.ReadTimeout(f"The stand-in did not respond within {read_timeout} seconds")
+        time.sleep(latency)
+
+    def send(self, request, stream=False, timeout=None, verify=True, cert=None, proxies=None):
+        if self._is_throttled():
+            return _build_response(request, 429, b'{"error": "Too Many Requests"}', {"Retry-After": "1"})
+
+        self._simulate_latency(timeout)
+
+        with self._lock:
+            failed = self._random.random() < self._error_rate
+        if failed:
+            return _build_response(request, 503, b'{"error": "Service Unavailable"}')
+
+        recording = self._recording(request.url)
+        if recording is None:
+            return _build_response(request, 404, b'{"error": "No recording"}')
+        return _build_response(request, recording["status_code"], json.dumps(recording["body"]).encode())
+
+    def close(self):
+        pass
+
+
+def create_adapter(pool_size):
+    """
+    Creates the transport used by `http_client.food_data_central_client`, selected by `FOOD_DATA_CENTRAL_STAND_IN`.
+    Returns None when requests are sent to FoodData Central as normal.
+    """
+    if FOOD_DATA_CENTRAL_STAND_IN == RECORD:
+        return RecordingAdapter(FOOD_DATA_CENTRAL_RECORDINGS, pool_connections=1, pool_maxsize=pool_size, max_retries=0)
+    if FOOD_DATA_CENTRAL_STAND_IN == REPLAY:
+        return ReplayAdapter(
+            FOOD_DATA_CENTRAL_RECORDINGS,
+            latency=FOOD_DATA_CENTRAL_STAND_IN_LATENCY,
+            jitter=FOOD_DATA_CENTRAL_STAND_IN_JITTER,
+            error_rate=FOOD_DATA_CENTRAL_STAND_IN_ERROR_RATE,
+            requests_per_second=FOOD_DATA_CENTRAL_STAND_IN_REQUESTS_PER_SECOND,
+            seed=FOOD_DATA_CENTRAL_STAND_IN_SEED,
+        )
+    return None
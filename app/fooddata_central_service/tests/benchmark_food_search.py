@@ -0,0 +1,131 @@
+"""
+Offline benchmark of food searches against the FoodData Central stand-in, see `stand_in.ReplayAdapter`. A burst of
+concurrent identical searches is made while nothing is cached, followed by the same burst once the result is cached.
+The number of requests which reached the stand-in shows the effect of request coalescing, and the latency of each
+burst the effect of caching. The stand-in is seeded, so repeated runs are comparable.
+
+Run from the `app` directory using,
+
+    python -m fooddata_central_service.tests.benchmark_food_search [concurrent searches] [latency] [error rate]
+"""
+
+import os
+import statistics
+import sys
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+from unittest.mock import patch
+
+from backend.configurations.setup_python_path import setup_python_path
+
+setup_python_path()
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "backend.settings")
+
+import django  # noqa: E402
+
+django.setup()
+
+import requests  # noqa: E402
+from django.test.utils import override_settings  # noqa: E402
+
+from fooddata_central_service.cache import food_search_cache  # noqa: E402
+from fooddata_central_service.circuit_breaker import (  # noqa: E402
+    food_data_central_circuit_breaker,
+)
+from fooddata_central_service.http_client import (  # noqa: E402
+    FOOD_DATA_CENTRAL_BACKOFF,
+    FOOD_DATA_CENTRAL_CONNECT_TIMEOUT,
+    FOOD_DATA_CENTRAL_DEADLINE,
+    FOOD_DATA_CENTRAL_MAX_RETRIES,
+    FOOD_DATA_CENTRAL_READ_TIMEOUT,
+    PooledHTTPClient,
+)
+from fooddata_central_service.services import FoodDataCentralService  # noqa: E402
+from fooddata_central_service.stand_in import (  # noqa: E402
+    ReplayAdapter,
+    save_recording,
+)
+from fooddata_central_service.tests.fixtures import (  # noqa: E402
+    load_search_raw_chicken_breast,
+)
+
+DEFAULT_CONCURRENT_SEARCHES = 50
+DEFAULT_LATENCY = 0.3
+DEFAULT_ERROR_RATE = 0.0
+QUERY = "raw chicken breast"
+
+# The shared tier is replaced by an in-memory cache, so the benchmark needs neither a database nor network access.
+LOCAL_MEMORY_CACHES = {"default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"}}
+
+
+class CountingReplayAdapter(ReplayAdapter):
+
+    requests = 0
+
+    def send(self, request, **kwargs):
+        CountingReplayAdapter.requests += 1
+        return super().send(request, **kwargs)
+
+
+def _record_search(directory):
+    body = load_search_raw_chicken_breast()
+    params = {"query": QUERY, "dataType": ["SR Legacy"], "pageSize": 20, "pageNumber": 1}
+    url = requests.Request("GET", f"{FoodDataCentralService.BASE_URL}/search", params=params).prepare().url
+    save_recording(directory, url, 200, body)
+
+
+def _burst(concurrent_searches):
+    def search(_):
+        started = time.perf_counter()
+        try:
+            FoodDataCentralService.get_foods_page(QUERY)
+            return time.perf_counter() - started, True
+        except Exception:
+            return time.perf_counter() - started, False
+
+    requests_before = CountingReplayAdapter.requests
+    with ThreadPoolExecutor(max_workers=concurrent_searches) as executor:
+        results = list(executor.map(search, range(concurrent_searches)))
+    timings = sorted(seconds for seconds, _ in results)
+    failures = sum(not succeeded for _, succeeded in results)
+    return timings, failures, CountingReplayAdapter.requests - requests_before
+
+
+def main():
+    concurrent_searches = int(sys.argv[1]) if len(sys.argv) > 1 else DEFAULT_CONCURRENT_SEARCHES
+    latency = float(sys.argv[2]) if len(sys.argv) > 2 else DEFAULT_LATENCY
+    error_rate = float(sys.argv[3]) if len(sys.argv) > 3 else DEFAULT_ERROR_RATE
+
+    with tempfile.TemporaryDirectory() as directory, override_settings(CACHES=LOCAL_MEMORY_CACHES):
+        _record_search(directory)
+        client = PooledHTTPClient(
+            pool_size=concurrent_searches,
+            connect_timeout=FOOD_DATA_CENTRAL_CONNECT_TIMEOUT,
+            read_timeout=FOOD_DATA_CENTRAL_READ_TIMEOUT,
+            deadline=FOOD_DATA_CENTRAL_DEADLINE,
+            max_retries=FOOD_DATA_CENTRAL_MAX_RETRIES,
+            backoff=FOOD_DATA_CENTRAL_BACKOFF,
+            adapter_factory=lambda pool_size: CountingReplayAdapter(
+                directory, latency=latency, jitter=latency / 10, error_rate=error_rate
+            ),
+        )
+        food_search_cache.clear()
+        food_data_central_circuit_breaker.reset()
+
+        with (
+            patch("fooddata_central_service.services.food_data_central_client", client),
+            patch("fooddata_central_service.services.FOOD_SEARCH_PREFETCH_NEXT_PAGE", False),
+        ):
+            print(f"{concurrent_searches} concurrent searches, latency {latency} s, error rate {error_rate}")
+            for name in ("Cold", "Cached"):
+                timings, failures, upstream_requests = _burst(concurrent_searches)
+                print(
+                    f"{name:<8} p50 {statistics.median(timings) * 1000:>7.1f} ms  "
+                    f"max {timings[-1] * 1000:>7.1f} ms  "
+                    f"failures {failures:>3}  requests to the stand-in {upstream_requests}"
+                )
+
+
+if __name__ == "__main__":
+    main()
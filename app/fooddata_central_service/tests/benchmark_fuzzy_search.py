@@ -0,0 +1,76 @@
+"""
+Latency benchmark of the pure Python `TrigramIndex` for a catalog of several hundred thousand foods, roughly the size
+of SR Legacy and the Branded Foods dataset combined. Descriptions are generated from common food words plus random
+brand names, which gives the large vocabulary of a branded catalog.
+
+Run from the `app` directory using,
+
+    python -m fooddata_central_service.tests.benchmark_fuzzy_search [number of foods]
+"""
+
+import os
+import random
+import string
+import sys
+import time
+import tracemalloc
+
+from backend.configurations.setup_python_path import setup_python_path
+
+setup_python_path()
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "backend.settings")
+
+import django  # noqa: E402
+
+django.setup()
+
+from fooddata_central_service.fuzzy_search import TrigramIndex  # noqa: E402
+
+DEFAULT_NUMBER_OF_FOODS = 300_000
+NUMBER_OF_BRANDS = 20_000
+
+FOOD_WORDS = (
+    "apple apples banana bananas broccoli cauliflower carrot carrots chicken breast thigh ground beef pork lamb turkey "
+    "salmon tuna cod shrimp egg eggs milk cheese cheddar mozzarella yogurt butter bread wheat whole white rice brown "
+    "pasta noodles oats cereal granola almonds peanuts walnuts cashews beans lentils chickpeas tofu soy spinach kale "
+    "lettuce tomato tomatoes potato potatoes onion garlic pepper peppers mushroom mushrooms orange oranges grape "
+    "grapes strawberry strawberries blueberry blueberries chocolate vanilla sugar honey oil olive coconut soup sauce"
+).split()
+PREPARATIONS = "raw cooked boiled baked fried roasted grilled steamed canned frozen dried smoked organic".split()
+QUERIES = ["brocoli", "chiken brest", "bananna", "yoghurt", "strawbery", "salmn grilled", "chedar chese", "tomatos"]
+
+
+def _descriptions(number_of_foods):
+    random.seed(0)
+    brands = ["".join(random.choices(string.ascii_lowercase, k=random.randint(4, 10))) for _ in range(NUMBER_OF_BRANDS)]
+    for _ in range(number_of_foods):
+        words = random.sample(FOOD_WORDS, random.randint(1, 4)) + random.sample(PREPARATIONS, random.randint(0, 2))
+        yield f"{random.choice(brands).title()}, {', '.join(words)}"
+
+
+def main():
+    number_of_foods = int(sys.argv[1]) if len(sys.argv) > 1 else DEFAULT_NUMBER_OF_FOODS
+
+    index = TrigramIndex(threshold=0.3)
+    index._loaded = True
+
+    tracemalloc.start()
+    started = time.perf_counter()
+    for fdc_id, description in enumerate(_descriptions(number_of_foods)):
+        index.add(fdc_id, description)
+    build_seconds = time.perf_counter() - started
+    _, peak_bytes = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    print(f"Indexed {number_of_foods} foods in {build_seconds:.1f} s, peak memory {peak_bytes / 2**20:.0f} MB")
+    for query in QUERIES:
+        timings = []
+        for _ in range(5):
+            started = time.perf_counter()
+            index.search(query, 20)
+            timings.append(time.perf_counter() - started)
+        print(f"{query:<16} {min(timings) * 1000:>7.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,126 @@
+"""
+Micro-benchmark of `FoodSearchResultSerializer` against the raw `search_raw_chicken_breast.json` fixture, compared
+with the previous implementation which scanned `foodNutrients` once per field through `SerializerMethodField`. The
+size of a cached search result holding the whole nutrient profile is compared between the packed nutrients of
+`services._compact_food` and a list of nutrient dictionaries.
+
+Run from the `app` directory using,
+
+    python -m fooddata_central_service.tests.benchmark_serializer
+"""
+
+import os
+import pickle
+import timeit
+
+from backend.configurations.setup_python_path import setup_python_path
+
+setup_python_path()
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "backend.settings")
+
+import django  # noqa: E402
+
+django.setup()
+
+from rest_framework import serializers  # noqa: E402
+
+from fooddata_central_service.nutrients import (  # noqa: E402
+    EXTRACTED_NUTRIENT_IDS,
+    kj_to_kcal,
+)
+from fooddata_central_service.serializers import (  # noqa: E402
+    FoodSearchResultSerializer,
+)
+from fooddata_central_service.services import _compact_food  # noqa: E402
+from fooddata_central_service.tests.fixtures import (  # noqa: E402
+    load_search_raw_chicken_breast,
+)
+
+NUMBER_OF_SEARCHES = 200
+
+# The previous implementation matched nutrients by their English name.
+ENERGY = "Energy"
+PROTEIN = "Protein"
+TOTAL_FAT = "Total lipid (fat)"
+CARBOHYDRATE = "Carbohydrate, by difference"
+
+
+class LinearScanSerializer(serializers.Serializer):
+    description = serializers.SerializerMethodField()
+    calories = serializers.SerializerMethodField()
+    protein = serializers.SerializerMethodField()
+    fat = serializers.SerializerMethodField()
+    carbs = serializers.SerializerMethodField()
+
+    def get_nutrient_info(self, food_nutrients, nutrient_name):
+        for nutrient in food_nutrients:
+            if nutrient["nutrientName"] == nutrient_name:
+                return {"value": nutrient["value"], "unit": nutrient["unitName"]}
+        return None
+
+    def get_description(self, food):
+        return food["description"]
+
+    def get_calories(self, food):
+        info = self.get_nutrient_info(food["foodNutrients"], ENERGY)
+        if info["unit"] == "kJ":
+            info["unit"] = "KCAL"
+            info["value"] = kj_to_kcal(info["value"])
+        return info
+
+    def get_protein(self, food):
+        return self.get_nutrient_info(food["foodNutrients"], PROTEIN)
+
+    def get_fat(self, food):
+        return self.get_nutrient_info(food["foodNutrients"], TOTAL_FAT)
+
+    def get_carbs(self, food):
+        return self.get_nutrient_info(food["foodNutrients"], CARBOHYDRATE)
+
+
+def _compact_food_dictionaries(food):
+    return {
+        "fdcId": food.get("fdcId"),
+        "description": food["description"],
+        "foodNutrients": [
+            {key: nutrient[key] for key in ("nutrientId", "nutrientName", "unitName", "value")}
+            for nutrient in food["foodNutrients"]
+            if nutrient["nutrientId"] in EXTRACTED_NUTRIENT_IDS
+        ],
+    }
+
+
+def main():
+    foods = load_search_raw_chicken_breast()["foods"]
+    packed_foods = [_compact_food(food) for food in foods]
+
+    # The linear scan returns the first Energy, which can be in kJ even when kcal is reported, so only the other
+    # fields are compared.
+    fields = ("description", "protein", "fat", "carbs")
+    expected = [
+        {field: food[field] for field in fields} for food in (LinearScanSerializer(food).data for food in foods)
+    ]
+    results = FoodSearchResultSerializer(packed_foods, many=True).data
+    assert [{field: food[field] for field in fields} for food in results] == expected
+
+    benchmarks = {
+        "Linear scan per field": lambda: [LinearScanSerializer(food).data for food in foods],
+        "Pack and serialize": lambda: FoodSearchResultSerializer(
+            [_compact_food(food) for food in foods], many=True
+        ).data,
+        "Serialize packed": lambda: FoodSearchResultSerializer(packed_foods, many=True).data,
+    }
+    for name, benchmark in benchmarks.items():
+        seconds = min(timeit.repeat(benchmark, number=NUMBER_OF_SEARCHES, repeat=5))
+        print(f"{name:<24} {seconds / NUMBER_OF_SEARCHES * 1e6:>8.1f} us per search of {len(foods)} foods")
+
+    sizes = {
+        "Nutrient dictionaries": [_compact_food_dictionaries(food) for food in foods],
+        "Packed nutrients": packed_foods,
+    }
+    for name, cached_foods in sizes.items():
+        print(f"{name:<24} {len(pickle.dumps(cached_foods)):>8} bytes per cached search")
+
+
+if __name__ == "__main__":
+    main()
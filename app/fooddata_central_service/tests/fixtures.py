@@ -0,0 +1,34 @@
+"""
+Fixtures shared by the tests of FoodData Central responses and imports.
+"""
+
+import json
+import os
+
+SEARCH_RAW_CHICKEN_BREAST = os.path.join(os.path.dirname(__file__), "search_raw_chicken_breast.json")
+
+
+def load_search_raw_chicken_breast():
+    """
+    The response of the FoodData Central search endpoint for "raw chicken breast".
+    """
+    with open(SEARCH_RAW_CHICKEN_BREAST) as f:
+        return json.load(f)
+
+
+def branded_food(fdc_id, description, food_nutrients, gtin_upc=None):
+    """
+    A food of the Branded Foods download, where `food_nutrients` are `(nutrientId, name, unitName, amount)` tuples.
+    """
+    food = {
+        "fdcId": fdc_id,
+        "description": description,
+        "brandOwner": "Test Foods Inc.",
+        "foodNutrients": [
+            {"nutrient": {"id": nutrient_id, "name": name, "unitName": unit_name}, "amount": amount}
+            for nutrient_id, name, unit_name, amount in food_nutrients
+        ],
+    }
+    if gtin_upc is not None:
+        food["gtinUpc"] = gtin_upc
+    return food
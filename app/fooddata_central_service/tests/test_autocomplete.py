@@ -0,0 +1,129 @@
+import os
+from io import StringIO
+from unittest.mock import patch
+
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.core.management import call_command
+from django.test import TestCase
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APIClient, APITestCase
+
+from fooddata_central_service.autocomplete import PrefixIndex, food_autocomplete_index
+from fooddata_central_service.cache import food_search_cache
+from fooddata_central_service.models import Food
+from fooddata_central_service.services import FoodDataCentralService
+
+SR_LEGACY_SAMPLE = os.path.join(os.path.dirname(__file__), "sr_legacy_sample.json")
+
+
+class PrefixIndexTests(TestCase):
+
+    def setUp(self):
+        self.index = PrefixIndex(max_descriptions=100)
+        self.index.add(
+            [
+                "Chicken, broilers or fryers, breast, meat and skin, raw",
+                "Chicken, ground, raw",
+                "Soup, chicken noodle, canned",
+                "Chickpeas (garbanzo beans), mature seeds, raw",
+            ]
+        )
+
+    def test_every_word_is_a_prefix(self):
+        self.assertEqual(
+            self.index.suggest("chick bre", 10), ["Chicken, broilers or fryers, breast, meat and skin, raw"]
+        )
+        self.assertEqual(self.index.suggest("noodle chi", 10), ["Soup, chicken noodle, canned"])
+
+    def test_leading_word_matches_are_first(self):
+        self.assertEqual(
+            self.index.suggest("chicken", 10),
+            [
+                "Chicken, ground, raw",
+                "Chicken, broilers or fryers, breast, meat and skin, raw",
+                "Soup, chicken noodle, canned",
+            ],
+        )
+
+    def test_limit_and_no_matches(self):
+        self.assertEqual(len(self.index.suggest("chi", 2)), 2)
+        self.assertEqual(self.index.suggest("banana", 10), [])
+        self.assertEqual(self.index.suggest(" , ", 10), [])
+
+    def test_size_is_bounded(self):
+        index = PrefixIndex(max_descriptions=1)
+        index.add(["Chicken, ground, raw", "Chicken, ground, raw", "Bananas, raw"])
+
+        self.assertEqual(index.suggest("raw", 10), ["Chicken, ground, raw"])
+
+    def test_loads_imported_foods_lazily(self):
+        call_command("import_sr_legacy", SR_LEGACY_SAMPLE, stdout=StringIO())
+
+        self.assertEqual(
+            PrefixIndex(max_descriptions=100).suggest("apple", 10),
+            ["Apples, raw, with skin (Includes foods for USDA's Food Distribution Program)"],
+        )
+
+    def test_loads_only_sr_legacy_foods_up_to_the_bound(self):
+        call_command("import_sr_legacy", SR_LEGACY_SAMPLE, stdout=StringIO())
+        Food.objects.create(fdc_id=1, description="Apple pie, branded", data_type=Food.BRANDED)
+
+        self.assertNotIn("Apple pie, branded", PrefixIndex(max_descriptions=100).suggest("apple", 10))
+        index = PrefixIndex(max_descriptions=2)
+        index.suggest("apple", 10)
+        self.assertEqual(len(index._descriptions), 2)
+
+    @patch("fooddata_central_service.services.FoodDataCentralService.search_food")
+    def test_food_data_central_results_are_added(self, mock_search_food):
+        food_search_cache.clear()
+        cache.clear()
+        food_autocomplete_index.clear()
+        self.addCleanup(food_autocomplete_index.clear)
+        mock_search_food.return_value = {"foods": [{"description": "Bananas, raw", "foodNutrients": []}]}
+
+        FoodDataCentralService.get_foods_by_query_name("banana")
+
+        self.assertEqual(food_autocomplete_index.suggest("ban", 10), ["Bananas, raw"])
+
+
+class FoodAutocompleteViewTests(APITestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        User.objects.create(id=1, username="Test User")
+        call_command("import_sr_legacy", SR_LEGACY_SAMPLE, stdout=StringIO())
+
+    def setUp(self):
+        self.client = APIClient()
+        self.client.force_authenticate(user=User.objects.get(id=1))
+        self.url = reverse("food-autocomplete")
+
+        food_autocomplete_index.clear()
+        self.addCleanup(food_autocomplete_index.clear)
+
+    def test_autocomplete(self):
+        response = self.client.get(self.url, {"food": "chick brea"})
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data["search_query"], "chick brea")
+        self.assertEqual(
+            response.data["suggestions"],
+            [
+                "Chicken, broilers or fryers, breast, meat and skin, raw",
+                "Chicken, broiler or fryers, breast, skinless, boneless, meat only, raw",
+            ],
+        )
+
+    def test_autocomplete_no_suggestions(self):
+        response = self.client.get(self.url, {"food": "zzz"})
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data["suggestions"], [])
+
+    def test_autocomplete_missing_query_param(self):
+        response = self.client.get(self.url)
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(response.data["error"], "Query parameter is required")
@@ -0,0 +1,141 @@
+import json
+import tempfile
+from io import StringIO
+from pathlib import Path
+
+from django.contrib.auth.models import User
+from django.core.management import call_command
+from django.test import SimpleTestCase
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APIClient, APITestCase
+
+from fooddata_central_service.barcode import (
+    food_barcode_lookup,
+    is_valid_gtin,
+    normalize_gtin,
+)
+from fooddata_central_service.models import FoodBarcode
+
+from .fixtures import branded_food
+
+
+def _branded_food(fdc_id, gtin_upc, description, protein):
+    return branded_food(
+        fdc_id, description, [(1003, "Protein", "g", protein), (1008, "Energy", "kcal", 110)], gtin_upc=gtin_upc
+    )
+
+
+BRANDED_FOODS = {
+    "BrandedFoods": [
+        _branded_food(2000001, "036000291452", "PROTEIN BAR", 20),
+        # The same product after it was reformulated.
+        _branded_food(2000005, "036000291452", "PROTEIN BAR, NEW RECIPE", 21.5),
+        _branded_food(2000002, "96385074", "SPARKLING WATER", 0),
+        _branded_food(2000003, "", "UNLABELLED FOOD", 1),
+    ]
+}
+
+
+class GtinTests(SimpleTestCase):
+
+    def test_normalize_gtin(self):
+        self.assertEqual(normalize_gtin("036000291452"), "00036000291452")
+        self.assertEqual(normalize_gtin(" 0036000291452 "), "00036000291452")
+        self.assertEqual(normalize_gtin("96385074"), "00000096385074")
+        self.assertIsNone(normalize_gtin("12345"))
+        self.assertIsNone(normalize_gtin("03600029145A"))
+        self.assertIsNone(normalize_gtin(""))
+
+    def test_check_digit(self):
+        self.assertTrue(is_valid_gtin("00036000291452"))
+        self.assertTrue(is_valid_gtin("00000096385074"))
+        self.assertTrue(is_valid_gtin("04006381333931"))
+        self.assertFalse(is_valid_gtin("00036000291453"))
+
+
+class FoodBarcodeViewTests(APITestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        User.objects.create(id=1, username="Test User")
+        with tempfile.TemporaryDirectory() as directory:
+            json_path = Path(directory) / "branded.json"
+            json_path.write_text(json.dumps(BRANDED_FOODS), encoding="utf-8")
+            call_command("import_branded_foods", str(json_path), stdout=StringIO())
+
+    def setUp(self):
+        self.client = APIClient()
+        self.client.force_authenticate(user=User.objects.get(id=1))
+        self.url = reverse("food-barcode")
+
+        food_barcode_lookup.clear()
+        self.addCleanup(food_barcode_lookup.clear)
+
+    def test_barcodes_are_imported(self):
+        self.assertEqual(
+            sorted(FoodBarcode.objects.values_list("gtin_upc", "food_id")),
+            [("00000096385074", 2000002), ("00036000291452", 2000001), ("00036000291452", 2000005)],
+        )
+
+    def test_newest_food_with_barcode(self):
+        response = self.client.get(self.url, {"gtin": "036000291452"})
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(
+            response.data,
+            {
+                "gtin": "00036000291452",
+                "food_weight": 100,
+                "food_unit": "G",
+                "food": {
+                    "description": "PROTEIN BAR, NEW RECIPE",
+                    "calories": {"value": 110, "unit": "KCAL"},
+                    "protein": {"value": 21.5, "unit": "G"},
+                    "fat": None,
+                    "carbs": None,
+                },
+            },
+        )
+
+    def test_gtin_8(self):
+        response = self.client.get(self.url, {"gtin": "96385074"})
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data["food"]["description"], "SPARKLING WATER")
+
+    def test_hot_barcodes_are_served_from_memory(self):
+        self.client.get(self.url, {"gtin": "036000291452"})
+
+        with self.assertNumQueries(0):
+            food = food_barcode_lookup.get("00036000291452")
+        self.assertEqual(food["fdcId"], 2000005)
+
+    def test_reimport_clears_the_hot_barcodes(self):
+        food_barcode_lookup.get("00036000291452")
+        with tempfile.TemporaryDirectory() as directory:
+            json_path = Path(directory) / "branded.json"
+            json_path.write_text(
+                json.dumps({"BrandedFoods": [_branded_food(2000009, "036000291452", "PROTEIN BAR, LOW SUGAR", 22)]}),
+                encoding="utf-8",
+            )
+            call_command("import_branded_foods", str(json_path), stdout=StringIO())
+
+        self.assertEqual(food_barcode_lookup.get("00036000291452")["fdcId"], 2000009)
+
+    def test_unknown_barcode(self):
+        response = self.client.get(self.url, {"gtin": "04006381333931"})
+
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+    def test_invalid_barcode(self):
+        for gtin in ["", "12345", "036000291453"]:
+            with self.subTest(gtin=gtin):
+                response = self.client.get(self.url, {"gtin": gtin})
+
+                self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_missing_barcode(self):
+        response = self.client.get(self.url)
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
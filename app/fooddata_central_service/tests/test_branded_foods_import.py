@@ -0,0 +1,188 @@
+import csv
+import json
+import os
+import tempfile
+from io import StringIO
+from pathlib import Path
+from unittest.mock import patch
+
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.test import SimpleTestCase, TestCase
+
+from fooddata_central_service.ingest import FdcIdSet, iter_json_array
+from fooddata_central_service.local_search import search_local_foods
+from fooddata_central_service.models import Food, FoodBarcode, FoodNutrient
+
+from .fixtures import branded_food
+
+SR_LEGACY_SAMPLE = os.path.join(os.path.dirname(__file__), "sr_legacy_sample.json")
+
+
+BRANDED_FOODS = {
+    "BrandedFoods": [
+        branded_food(
+            2000001,
+            "CHICKEN NUGGETS",
+            [
+                (1003, "Protein", "g", 14.3),
+                (1008, "Energy", "kcal", 250),
+                (1003, "Protein", "g", 99),
+                (1057, "Caffeine", "mg", 12),
+            ],
+        ),
+        branded_food(2000002, "GREEK YOGURT, PLAIN", [(1003, "Protein", "g", 9.1)]),
+        branded_food(2000003, "SPARKLING WATER", []),
+    ]
+}
+
+
+class IterJsonArrayTests(SimpleTestCase):
+
+    @patch("fooddata_central_service.ingest.READ_SIZE", 7)
+    def test_items_spanning_reads(self):
+        json_file = StringIO(json.dumps(BRANDED_FOODS, indent=2))
+
+        self.assertEqual(list(iter_json_array(json_file, "BrandedFoods")), BRANDED_FOODS["BrandedFoods"])
+
+    def test_empty_array(self):
+        self.assertEqual(list(iter_json_array(StringIO('{"BrandedFoods": []}'), "BrandedFoods")), [])
+
+    def test_missing_key(self):
+        with self.assertRaises(ValueError):
+            list(iter_json_array(StringIO('{"SRLegacyFoods": []}'), "BrandedFoods"))
+
+    def test_truncated_file(self):
+        with self.assertRaises(ValueError):
+            list(iter_json_array(StringIO('{"BrandedFoods": [{"fdcId": 1}, '), "BrandedFoods"))
+
+
+class FdcIdSetTests(SimpleTestCase):
+
+    def test_membership(self):
+        fdc_ids = FdcIdSet()
+        fdc_ids.add(2000001)
+        fdc_ids.add(7)
+
+        self.assertIn(2000001, fdc_ids)
+        self.assertIn(7, fdc_ids)
+        self.assertNotIn(2000002, fdc_ids)
+        self.assertNotIn(6, fdc_ids)
+        self.assertNotIn(90000000, fdc_ids)
+
+
+class ImportBrandedFoodsTests(TestCase):
+
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.directory = Path(directory.name)
+        self.json_path = self.directory / "branded.json"
+        self.json_path.write_text(json.dumps(BRANDED_FOODS), encoding="utf-8")
+
+    def test_import_json_only_keeps_extracted_nutrients(self):
+        output = StringIO()
+        call_command("import_branded_foods", str(self.json_path), "--chunk-size", "2", stdout=output)
+
+        self.assertEqual(
+            list(Food.objects.values_list("fdc_id", "data_type")),
+            [(2000001, Food.BRANDED), (2000002, Food.BRANDED), (2000003, Food.BRANDED)],
+        )
+        self.assertEqual(
+            list(FoodNutrient.objects.filter(food_id=2000001).values_list("nutrient_id", "unit_name", "value")),
+            [(1003, "G", 14.3), (1008, "KCAL", 250)],
+        )
+        self.assertIn("3 foods and 3 nutrients", output.getvalue())
+        self.assertIn("rows/s", output.getvalue())
+
+    def test_import_keeps_sr_legacy_foods(self):
+        call_command("import_sr_legacy", SR_LEGACY_SAMPLE, stdout=StringIO())
+        call_command("import_branded_foods", str(self.json_path), stdout=StringIO())
+        call_command("import_branded_foods", str(self.json_path), stdout=StringIO())
+
+        self.assertEqual(Food.objects.filter(data_type=Food.SR_LEGACY).count(), 4)
+        self.assertEqual(Food.objects.filter(data_type=Food.BRANDED).count(), 3)
+        self.assertEqual(len(search_local_foods("chicken", 20)), 4)
+
+        call_command("import_sr_legacy", SR_LEGACY_SAMPLE, stdout=StringIO())
+
+        self.assertEqual(Food.objects.filter(data_type=Food.BRANDED).count(), 3)
+        self.assertEqual(FoodNutrient.objects.filter(food__data_type=Food.BRANDED).count(), 3)
+
+    def _import_csv(self, tables):
+        csv_directory = self.directory / "csv"
+        csv_directory.mkdir()
+        for name, rows in tables.items():
+            with open(csv_directory / name, "w", newline="") as csv_file:
+                csv.writer(csv_file).writerows(rows)
+
+        call_command("import_branded_foods", str(csv_directory), "--chunk-size", "1", stdout=StringIO())
+
+    def test_import_csv_directory(self):
+        tables = {
+            "food.csv": [
+                ["fdc_id", "data_type", "description"],
+                ["2000001", "branded_food", "CHICKEN NUGGETS"],
+                ["2000002", "branded_food", "GREEK YOGURT, PLAIN"],
+                ["171116", "sr_legacy_food", "Chicken, ground, raw"],
+            ],
+            "branded_food.csv": [
+                ["fdc_id", "brand_owner", "gtin_upc"],
+                ["2000001", "Test Foods Inc.", "036000291452"],
+                ["2000002", "Test Foods Inc.", "not a barcode"],
+            ],
+            "nutrient.csv": [
+                ["id", "name", "unit_name"],
+                ["1003", "Protein", "G"],
+                ["1008", "Energy", "KCAL"],
+                ["1057", "Caffeine", "MG"],
+            ],
+            "food_nutrient.csv": [
+                ["id", "fdc_id", "nutrient_id", "amount"],
+                ["1", "2000001", "1003", "14.3"],
+                ["2", "2000001", "1008", "250"],
+                ["3", "2000001", "1003", "99"],
+                ["4", "2000001", "1057", "12"],
+                ["5", "2000002", "1003", ""],
+                ["6", "2000002", "1008", "59"],
+                ["7", "171116", "1003", "17.4"],
+            ],
+        }
+        self._import_csv(tables)
+
+        self.assertEqual(list(Food.objects.values_list("fdc_id", flat=True)), [2000001, 2000002])
+        self.assertEqual(
+            list(
+                FoodNutrient.objects.order_by("food_id", "nutrient_id").values_list("food_id", "nutrient_id", "value")
+            ),
+            [(2000001, 1003, 14.3), (2000001, 1008, 250), (2000002, 1008, 59)],
+        )
+        self.assertEqual(list(FoodBarcode.objects.values_list("gtin_upc", "food_id")), [("00036000291452", 2000001)])
+
+    def test_import_csv_repeated_nutrients_apart(self):
+        self._import_csv(
+            {
+                "food.csv": [
+                    ["fdc_id", "data_type", "description"],
+                    ["2000001", "branded_food", "CHICKEN NUGGETS"],
+                    ["2000002", "branded_food", "GREEK YOGURT, PLAIN"],
+                ],
+                "branded_food.csv": [["fdc_id", "brand_owner", "gtin_upc"]],
+                "nutrient.csv": [["id", "name", "unit_name"], ["1003", "Protein", "G"]],
+                "food_nutrient.csv": [
+                    ["id", "fdc_id", "nutrient_id", "amount"],
+                    ["1", "2000001", "1003", "14.3"],
+                    ["2", "2000002", "1003", "10"],
+                    ["3", "2000001", "1003", "99"],
+                ],
+            }
+        )
+
+        self.assertEqual(
+            list(FoodNutrient.objects.order_by("food_id").values_list("food_id", "value")),
+            [(2000001, 14.3), (2000002, 10)],
+        )
+
+    def test_import_missing_path(self):
+        with self.assertRaises(CommandError):
+            call_command("import_branded_foods", "does/not/exist.json", stdout=StringIO())
@@ -0,0 +1,193 @@
+import time
+from unittest.mock import MagicMock, patch
+
+import requests
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.test import SimpleTestCase
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APIClient, APITestCase
+
+from fooddata_central_service.cache import food_search_cache, page_cache_key
+from fooddata_central_service.circuit_breaker import (
+    CLOSED,
+    HALF_OPEN,
+    OPEN,
+    CircuitBreaker,
+    CircuitOpenError,
+    food_data_central_circuit_breaker,
+    is_upstream_failure,
+)
+from fooddata_central_service.nutrients import pack_nutrients
+from fooddata_central_service.services import (
+    FoodDataCentralService,
+    food_search_prefetcher,
+)
+
+
+def _http_error(status_code):
+    response = MagicMock()
+    response.status_code = status_code
+    return requests.HTTPError(response=response)
+
+
+def _fail(error):
+    def fn():
+        raise error
+
+    return fn
+
+
+class CircuitBreakerTests(SimpleTestCase):
+
+    def setUp(self):
+        self.breaker = CircuitBreaker(failure_threshold=2, recovery_timeout=30)
+
+    def test_is_upstream_failure(self):
+        self.assertTrue(is_upstream_failure(requests.ConnectionError()))
+        self.assertTrue(is_upstream_failure(requests.ReadTimeout()))
+        self.assertTrue(is_upstream_failure(_http_error(503)))
+        self.assertTrue(is_upstream_failure(_http_error(429)))
+        self.assertFalse(is_upstream_failure(_http_error(400)))
+        self.assertFalse(is_upstream_failure(ValueError()))
+
+    def test_opens_after_consecutive_failures(self):
+        for _ in range(2):
+            with self.assertRaises(requests.ConnectionError):
+                self.breaker.call(_fail(requests.ConnectionError()))
+
+        self.assertEqual(self.breaker.state, OPEN)
+        fn = MagicMock()
+        with self.assertRaises(CircuitOpenError):
+            self.breaker.call(fn)
+        fn.assert_not_called()
+
+    def test_success_resets_failures(self):
+        with self.assertRaises(requests.ConnectionError):
+            self.breaker.call(_fail(requests.ConnectionError()))
+        self.assertEqual(self.breaker.call(lambda: "ok"), "ok")
+        with self.assertRaises(requests.ConnectionError):
+            self.breaker.call(_fail(requests.ConnectionError()))
+
+        self.assertEqual(self.breaker.state, CLOSED)
+
+    def test_client_errors_do_not_open(self):
+        for _ in range(3):
+            with self.assertRaises(requests.HTTPError):
+                self.breaker.call(_fail(_http_error(400)))
+
+        self.assertEqual(self.breaker.state, CLOSED)
+
+    @patch("fooddata_central_service.circuit_breaker.time.monotonic")
+    def test_half_open_allows_single_trial(self, mock_monotonic):
+        mock_monotonic.return_value = 100
+        for _ in range(2):
+            with self.assertRaises(requests.ConnectionError):
+                self.breaker.call(_fail(requests.ConnectionError()))
+
+        mock_monotonic.return_value = 130
+        self.assertEqual(self.breaker.state, HALF_OPEN)
+        self.assertFalse(self.breaker.is_open)
+
+        # A failed trial opens the circuit again for the full recovery timeout
+        with self.assertRaises(requests.ConnectionError):
+            self.breaker.call(_fail(requests.ConnectionError()))
+        mock_monotonic.return_value = 159
+        self.assertEqual(self.breaker.state, OPEN)
+
+        mock_monotonic.return_value = 160
+        self.assertEqual(self.breaker.call(lambda: "ok"), "ok")
+        self.assertEqual(self.breaker.state, CLOSED)
+
+
+class StaleWhileRevalidateTests(APITestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        User.objects.create(id=1, username="Test User")
+
+    def setUp(self):
+        self.client = APIClient()
+        self.client.force_authenticate(user=User.objects.get(id=1))
+        self.url = reverse("food-search")
+
+        food_search_cache.clear()
+        cache.clear()
+        food_data_central_circuit_breaker.reset()
+        self.addCleanup(food_data_central_circuit_breaker.reset)
+
+        patcher = patch.object(food_search_prefetcher, "submit")
+        self.mock_prefetch = patcher.start()
+        self.addCleanup(patcher.stop)
+
+        self.key = page_cache_key("banana", 1, 20)
+        self.page = {
+            "foods": [{"fdcId": 173944, "description": "Bananas, raw", "nutrients": pack_nutrients([])}],
+            "has_next": False,
+        }
+
+    def _cache_expired_page(self):
+        # The shared tier stores each value with the time it stays fresh until
+        cache.set(food_search_cache._key(self.key), (self.page, time.time() - 1))
+
+    def _open_circuit(self):
+        for _ in range(5):
+            with self.assertRaises(requests.ConnectionError):
+                food_data_central_circuit_breaker.call(_fail(requests.ConnectionError()))
+
+    @patch("fooddata_central_service.services.FoodDataCentralService.search_food")
+    def test_expired_page_is_served_stale_and_refreshed(self, mock_search_food):
+        self._cache_expired_page()
+
+        page = FoodDataCentralService.get_foods_page("banana")
+
+        self.assertTrue(page["stale"])
+        self.assertEqual(page["foods"], self.page["foods"])
+        mock_search_food.assert_not_called()
+
+        key, refresh = self.mock_prefetch.call_args.args
+        self.assertEqual(key, self.key)
+
+        mock_search_food.return_value = {"foods": [], "totalPages": 0}
+        refresh()
+        self.assertEqual(food_search_cache.get(self.key), {"foods": [], "has_next": False})
+
+    @patch("fooddata_central_service.services.FoodDataCentralService.search_food")
+    def test_stale_page_is_not_refreshed_while_open(self, mock_search_food):
+        self._cache_expired_page()
+        self._open_circuit()
+
+        response = self.client.get(self.url, {"food": "banana"})
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response["Warning"], '110 - "Response is Stale"')
+        self.mock_prefetch.assert_not_called()
+        mock_search_food.assert_not_called()
+
+    @patch("fooddata_central_service.services.FoodDataCentralService.search_food")
+    def test_fresh_page_is_not_marked_stale(self, mock_search_food):
+        food_search_cache.set(self.key, self.page)
+
+        response = self.client.get(self.url, {"food": "banana"})
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertFalse(response.has_header("Warning"))
+
+    @patch("fooddata_central_service.services.FoodDataCentralService.search_food")
+    def test_uncached_search_fails_fast_while_open(self, mock_search_food):
+        self._open_circuit()
+
+        response = self.client.get(self.url, {"food": "banana"})
+
+        self.assertEqual(response.status_code, status.HTTP_503_SERVICE_UNAVAILABLE)
+        mock_search_food.assert_not_called()
+
+    @patch("fooddata_central_service.services.FoodDataCentralService.search_food")
+    def test_upstream_failure_is_service_unavailable(self, mock_search_food):
+        mock_search_food.side_effect = _http_error(502)
+
+        response = self.client.get(self.url, {"food": "banana"})
+
+        self.assertEqual(response.status_code, status.HTTP_503_SERVICE_UNAVAILABLE)
+        self.assertEqual(response.data["error"], "FoodData Central is unavailable")
@@ -0,0 +1,141 @@
+import json
+import os
+from io import StringIO
+from unittest.mock import MagicMock, patch
+
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.core.management import call_command
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APIClient, APITestCase
+
+from fooddata_central_service.cache import food_detail_cache
+from fooddata_central_service.nutrients import (
+    ENERGY_KJ_ID,
+    EXTRACTED_NUTRIENT_IDS,
+    EXTRACTED_NUTRIENT_NUMBERS,
+    PROFILE_INDEX_BY_NUTRIENT_ID,
+)
+from fooddata_central_service.services import (
+    MAX_NUTRIENTS_PER_REQUEST,
+    FoodDataCentralService,
+)
+
+SR_LEGACY_SAMPLE = os.path.join(os.path.dirname(__file__), "sr_legacy_sample.json")
+
+
+def _food_data_central_foods(*fdc_ids):
+    """
+    The multi food endpoint returns foods in the same format as the downloadable JSON dataset.
+    """
+    with open(SR_LEGACY_SAMPLE) as f:
+        foods = {food["fdcId"]: food for food in json.load(f)["SRLegacyFoods"]}
+    return [{**foods[fdc_id], "fdcId": fdc_id + 1} for fdc_id in fdc_ids]
+
+
+class FoodDetailsViewTests(APITestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        User.objects.create(id=1, username="Test User")
+        call_command("import_sr_legacy", SR_LEGACY_SAMPLE, stdout=StringIO())
+
+    def setUp(self):
+        self.client = APIClient()
+        self.client.force_authenticate(user=User.objects.get(id=1))
+        self.url = reverse("food-details")
+
+        food_detail_cache.clear()
+        cache.clear()
+
+    @patch("fooddata_central_service.services.FoodDataCentralService.get_foods")
+    def test_imported_foods_do_not_request_food_data_central(self, mock_get_foods):
+        response = self.client.get(self.url, {"fdc_ids": "171688,171116"})
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data["food_weight"], 100)
+        self.assertEqual([food["fdc_id"] for food in response.data["foods"]], [171688, 171116])
+        self.assertEqual(
+            response.data["foods"][1],
+            {
+                "fdc_id": 171116,
+                "description": "Chicken, ground, raw",
+                "calories": {"value": 143.06, "unit": "KCAL"},
+                "protein": {"value": 17.4, "unit": "G"},
+                "fat": {"value": 8.1, "unit": "G"},
+                "carbs": {"value": 0.04, "unit": "G"},
+            },
+        )
+        self.assertEqual(response.data["not_found"], [])
+        mock_get_foods.assert_not_called()
+
+    @patch("fooddata_central_service.services.FoodDataCentralService.get_foods")
+    def test_missing_foods_are_requested_together_and_cached(self, mock_get_foods):
+        # fdcIds 171475 and 171078 are not imported and are returned by FoodData Central
+        mock_get_foods.return_value = _food_data_central_foods(171474, 171077)
+
+        response = self.client.get(self.url, {"fdc_ids": "171475,171688,171078,1"})
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual([food["fdc_id"] for food in response.data["foods"]], [171475, 171688, 171078])
+        self.assertEqual(response.data["foods"][0]["calories"], {"value": 172, "unit": "KCAL"})
+        self.assertEqual(response.data["foods"][0]["protein"], {"value": 20.8, "unit": "G"})
+        self.assertEqual(response.data["not_found"], [1])
+        mock_get_foods.assert_called_once_with([171475, 171078, 1])
+
+        mock_get_foods.return_value = []
+        response = self.client.get(self.url, {"fdc_ids": "171078,171475"})
+
+        self.assertEqual([food["fdc_id"] for food in response.data["foods"]], [171078, 171475])
+        self.assertEqual(mock_get_foods.call_count, 1)
+
+    @patch("fooddata_central_service.services.FoodDataCentralService.get_foods")
+    def test_requests_are_split_into_batches_of_twenty(self, mock_get_foods):
+        mock_get_foods.return_value = []
+
+        self.client.get(self.url, {"fdc_ids": ",".join(str(fdc_id) for fdc_id in range(1, 46))})
+
+        self.assertEqual([len(call.args[0]) for call in mock_get_foods.call_args_list], [20, 20, 5])
+
+    @patch("fooddata_central_service.services.food_data_central_client.get")
+    def test_nutrients_are_split_across_requests(self, mock_get):
+        food = _food_data_central_foods(171474)[0]
+        nutrient_ids = dict(zip(EXTRACTED_NUTRIENT_NUMBERS, [*PROFILE_INDEX_BY_NUTRIENT_ID, ENERGY_KJ_ID]))
+        requested = []
+
+        def get(url, params):
+            # Each response only holds the requested nutrients.
+            ids = {nutrient_ids[number] for number in params["nutrients"].split(",")}
+            requested.append(params)
+            mock_response = MagicMock()
+            mock_response.json.return_value = [
+                {**food, "foodNutrients": [n for n in food["foodNutrients"] if n["nutrient"]["id"] in ids]}
+            ]
+            return mock_response
+
+        mock_get.side_effect = get
+
+        foods = FoodDataCentralService.get_foods([171475])
+
+        self.assertGreater(len(requested), 1)
+        self.assertTrue(all(len(params["nutrients"].split(",")) <= MAX_NUTRIENTS_PER_REQUEST for params in requested))
+        self.assertEqual(
+            [number for params in requested for number in params["nutrients"].split(",")],
+            list(EXTRACTED_NUTRIENT_NUMBERS),
+        )
+        self.assertEqual({params["fdcIds"] for params in requested}, {"171475"})
+        self.assertEqual(len(foods), 1)
+        self.assertCountEqual(
+            foods[0]["foodNutrients"],
+            [n for n in food["foodNutrients"] if n["nutrient"]["id"] in EXTRACTED_NUTRIENT_IDS],
+        )
+
+    def test_invalid_fdc_ids(self):
+        for fdc_ids in ("", "abc", "1,,2", "-1", ",".join(str(fdc_id) for fdc_id in range(1, 52))):
+            response = self.client.get(self.url, {"fdc_ids": fdc_ids})
+            self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST, fdc_ids)
+
+    def test_missing_fdc_ids(self):
+        response = self.client.get(self.url)
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
@@ -1,5 +1,3 @@
-import json
-import os
 from unittest.mock import patch
 
 from django.contrib.auth.models import User
@@ -7,6 +5,12 @@ from django.urls import reverse
 from rest_framework import status
 from rest_framework.test import APIClient, APITestCase
 
+from fooddata_central_service.cache import food_search_cache
+from fooddata_central_service.serializers import encode_cursor
+from fooddata_central_service.services import food_search_prefetcher
+
+from .fixtures import load_search_raw_chicken_breast
+
 
 class FoodSearchViewTests(APITestCase):
 
@@ -21,12 +25,15 @@ class FoodSearchViewTests(APITestCase):
         self.client.force_authenticate(user=self.user)
         self.url = reverse("food-search")
 
+        food_search_cache.clear()
+
+        patcher = patch.object(food_search_prefetcher, "submit")
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
     @patch("fooddata_central_service.services.FoodDataCentralService.search_food")
     def test_search_food_success(self, mock_search_food):
-        current_dir = os.path.dirname(__file__)
-
-        with open(os.path.join(current_dir, "search_raw_chicken_breast.json")) as search_raw_chicken_breast:
-            mock_search_food.return_value = json.loads(search_raw_chicken_breast.read())
+        mock_search_food.return_value = load_search_raw_chicken_breast()
 
         response = self.client.get(self.url, {"food": "Raw Chicken Breast"})
 
@@ -36,15 +43,8 @@ class FoodSearchViewTests(APITestCase):
         self.assertEqual(response.data["food_unit"], "G")
         self.assertEqual(len(response.data["search_results"]), 10)
 
-        # Define expected values for each food item
+        # Define expected values for each food item, in the relevance order returned by FoodData Central
         expected_results = [
-            {
-                "description": "Chicken, broiler or fryers, breast, skinless, boneless, meat only, raw",
-                "calories": {"value": 120, "unit": "KCAL"},
-                "protein": {"value": 22.5, "unit": "G"},
-                "fat": {"value": 2.62, "unit": "G"},
-                "carbs": {"value": 0.0, "unit": "G"},
-            },
             {
                 "description": "Chicken, broilers or fryers, breast, meat and skin, raw",
                 "calories": {"value": 172, "unit": "KCAL"},
@@ -53,19 +53,12 @@ class FoodSearchViewTests(APITestCase):
                 "carbs": {"value": 0.0, "unit": "G"},
             },
             {
-                "description": "Chicken, broilers or fryers, breast, skinless, boneless, meat only, with added solution, raw",
-                "calories": {"value": 108, "unit": "KCAL"},
-                "protein": {"value": 20.3, "unit": "G"},
-                "fat": {"value": 3.0, "unit": "G"},
+                "description": "Chicken, broiler or fryers, breast, skinless, boneless, meat only, raw",
+                "calories": {"value": 120, "unit": "KCAL"},
+                "protein": {"value": 22.5, "unit": "G"},
+                "fat": {"value": 2.62, "unit": "G"},
                 "carbs": {"value": 0.0, "unit": "G"},
             },
-            {
-                "description": "Chicken, capons, giblets, raw",
-                "calories": {"value": 130.14, "unit": "KCAL"},
-                "protein": {"value": 18.3, "unit": "G"},
-                "fat": {"value": 5.18, "unit": "G"},
-                "carbs": {"value": 1.42, "unit": "G"},
-            },
             {
                 "description": "Chicken, ground, raw",
                 "calories": {"value": 143, "unit": "KCAL"},
@@ -73,27 +66,34 @@ class FoodSearchViewTests(APITestCase):
                 "fat": {"value": 8.1, "unit": "G"},
                 "carbs": {"value": 0.04, "unit": "G"},
             },
-            {
-                "description": "Duck, wild, breast, meat only, raw",
-                "calories": {"value": 123.21, "unit": "KCAL"},
-                "protein": {"value": 19.8, "unit": "G"},
-                "fat": {"value": 4.25, "unit": "G"},
-                "carbs": {"value": 0.0, "unit": "G"},
-            },
             {
                 "description": "Pheasant, breast, meat only, raw",
-                "calories": {"value": 133.01, "unit": "KCAL"},
+                "calories": {"value": 133, "unit": "KCAL"},
                 "protein": {"value": 24.4, "unit": "G"},
                 "fat": {"value": 3.25, "unit": "G"},
                 "carbs": {"value": 0.0, "unit": "G"},
             },
             {
                 "description": "Quail, breast, meat only, raw",
-                "calories": {"value": 123.21, "unit": "KCAL"},
+                "calories": {"value": 123, "unit": "KCAL"},
                 "protein": {"value": 22.6, "unit": "G"},
                 "fat": {"value": 2.99, "unit": "G"},
                 "carbs": {"value": 0.0, "unit": "G"},
             },
+            {
+                "description": "Chicken, broilers or fryers, breast, skinless, boneless, meat only, with added solution, raw",
+                "calories": {"value": 108, "unit": "KCAL"},
+                "protein": {"value": 20.3, "unit": "G"},
+                "fat": {"value": 3.0, "unit": "G"},
+                "carbs": {"value": 0.0, "unit": "G"},
+            },
+            {
+                "description": "Duck, wild, breast, meat only, raw",
+                "calories": {"value": 123, "unit": "KCAL"},
+                "protein": {"value": 19.8, "unit": "G"},
+                "fat": {"value": 4.25, "unit": "G"},
+                "carbs": {"value": 0.0, "unit": "G"},
+            },
             {
                 "description": "Ruffed Grouse, breast meat, skinless, raw",
                 "calories": {"value": 112, "unit": "KCAL"},
@@ -108,6 +108,13 @@ class FoodSearchViewTests(APITestCase):
                 "fat": {"value": 1.48, "unit": "G"},
                 "carbs": {"value": 0.14, "unit": "G"},
             },
+            {
+                "description": "Chicken, capons, giblets, raw",
+                "calories": {"value": 130, "unit": "KCAL"},
+                "protein": {"value": 18.3, "unit": "G"},
+                "fat": {"value": 5.18, "unit": "G"},
+                "carbs": {"value": 1.42, "unit": "G"},
+            },
         ]
 
         self.assertEqual(len(response.data["search_results"]), len(expected_results))
@@ -119,6 +126,23 @@ class FoodSearchViewTests(APITestCase):
             self.assertEqual(expected["fat"], actual["fat"])
             self.assertEqual(expected["carbs"], actual["carbs"])
 
+    @patch("fooddata_central_service.services.FoodDataCentralService.search_food")
+    def test_search_food_detailed(self, mock_search_food):
+        mock_search_food.return_value = load_search_raw_chicken_breast()
+
+        response = self.client.get(self.url, {"food": "Raw Chicken Breast", "detailed": "true"})
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        food = response.data["search_results"][0]
+        self.assertEqual(food["protein"], {"value": 20.8, "unit": "G"})
+        self.assertEqual(food["nutrients"]["vitamin_e"], {"value": 0.27, "unit": "MG"})
+        self.assertIn("sodium", food["nutrients"])
+
+        # The compact foods cached by the first search hold the whole profile, so the summary is served from cache.
+        response = self.client.get(self.url, {"food": "Raw Chicken Breast"})
+        self.assertNotIn("nutrients", response.data["search_results"][0])
+        self.assertEqual(mock_search_food.call_count, 1)
+
     def test_search_food_missing_query_param(self):
         response = self.client.get(self.url)
         self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
@@ -132,3 +156,41 @@ class FoodSearchViewTests(APITestCase):
         response = self.client.get(self.url, {"food": "unknownfood"})
         self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
         self.assertEqual(response.data["error"], "No foods found")
+
+    @patch("fooddata_central_service.services.FoodDataCentralService.search_food")
+    def test_search_food_pagination(self, mock_search_food):
+        mock_search_food.return_value = load_search_raw_chicken_breast()
+
+        response = self.client.get(self.url, {"food": "Raw Chicken Breast", "page_size": 10})
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data["page_size"], 10)
+        self.assertEqual(response.data["next_cursor"], encode_cursor(2, 10))
+
+        # The page size is kept by the cursor, even when the client sends a different one
+        response = self.client.get(
+            self.url, {"food": "Raw Chicken Breast", "cursor": response.data["next_cursor"], "page_size": 5}
+        )
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data["page_size"], 10)
+        mock_search_food.assert_called_with("raw chicken breast", 2, 10)
+
+    @patch("fooddata_central_service.services.FoodDataCentralService.search_food")
+    def test_search_food_last_page(self, mock_search_food):
+        mock_search_food.return_value = {**load_search_raw_chicken_breast(), "totalPages": 1}
+
+        response = self.client.get(self.url, {"food": "Raw Chicken Breast"})
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertIsNone(response.data["next_cursor"])
+
+    def test_search_food_invalid_page_size(self):
+        for page_size in (0, 51, "ten"):
+            response = self.client.get(self.url, {"food": "apple", "page_size": page_size})
+            self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_search_food_invalid_cursor(self):
+        for cursor in ("not a cursor", encode_cursor(0, 20), encode_cursor(2, 500)):
+            response = self.client.get(self.url, {"food": "apple", "cursor": cursor})
+            self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
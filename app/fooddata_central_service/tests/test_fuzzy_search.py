@@ -0,0 +1,103 @@
+import os
+from io import StringIO
+from unittest.mock import patch
+
+from django.core.cache import cache
+from django.core.management import call_command
+from django.test import SimpleTestCase, TestCase
+
+from fooddata_central_service.cache import food_search_cache
+from fooddata_central_service.fuzzy_search import (
+    TrigramIndex,
+    food_trigram_index,
+    search_similar_local_foods,
+    trigrams,
+)
+from fooddata_central_service.models import Food
+from fooddata_central_service.services import FoodDataCentralService
+
+SR_LEGACY_SAMPLE = os.path.join(os.path.dirname(__file__), "sr_legacy_sample.json")
+
+
+class TrigramIndexTests(SimpleTestCase):
+
+    def setUp(self):
+        self.index = TrigramIndex(threshold=0.3)
+        self.index._loaded = True
+        self.index.add(1, "Broccoli, raw")
+        self.index.add(2, "Broccoli, cooked, boiled, drained, without salt")
+        self.index.add(3, "Chicken, ground, raw")
+        self.index.add(4, "Cauliflower, raw")
+
+    def test_trigrams(self):
+        self.assertEqual(trigrams("cat"), {"  c", " ca", "cat", "at "})
+
+    def test_misspelt_words_match(self):
+        self.assertEqual(self.index.search("brocoli", 10), [1, 2])
+        self.assertEqual(self.index.search("chiken", 10), [3])
+
+    def test_every_word_must_match(self):
+        self.assertEqual(self.index.search("brocoli cookd", 10), [2])
+        self.assertEqual(self.index.search("brocoli banana", 10), [])
+
+    def test_closer_matches_rank_first(self):
+        self.assertEqual(self.index.search("brocoli raw", 10), [1])
+        self.assertEqual(self.index.search("raw", 10), [1, 4, 3])
+
+    def test_limit_and_no_words(self):
+        self.assertEqual(self.index.search("brocoli", 1), [1])
+        self.assertEqual(self.index.search(" , ", 10), [])
+
+
+class FuzzySearchFallbackTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        call_command("import_sr_legacy", SR_LEGACY_SAMPLE, stdout=StringIO())
+
+    def setUp(self):
+        food_search_cache.clear()
+        cache.clear()
+        food_trigram_index.clear()
+        self.addCleanup(food_trigram_index.clear)
+
+    def test_search_similar_local_foods(self):
+        foods = search_similar_local_foods("grond chiken", 20)
+
+        self.assertEqual([food["description"] for food in foods], ["Chicken, ground, raw"])
+        self.assertEqual(sum(value is not None for value in foods[0]["nutrients"]), 4)
+
+    def test_branded_foods_are_not_indexed(self):
+        Food.objects.create(fdc_id=1, description="Chicken, ground, branded", data_type=Food.BRANDED)
+
+        self.assertEqual(
+            food_trigram_index.search("grond chiken", 20), [Food.objects.get(description="Chicken, ground, raw").fdc_id]
+        )
+
+    @patch("fooddata_central_service.fuzzy_search.connection")
+    def test_branded_foods_are_not_searched_on_postgresql(self, mock_connection):
+        mock_connection.vendor = "postgresql"
+        cursor = mock_connection.cursor.return_value.__enter__.return_value
+        cursor.fetchall.return_value = []
+
+        search_similar_local_foods("grond chiken", 20)
+
+        sql, params = cursor.execute.call_args.args
+        self.assertIn("data_type = %s", sql)
+        self.assertEqual(params[0], Food.SR_LEGACY)
+
+    @patch("fooddata_central_service.services.FoodDataCentralService.search_food")
+    def test_misspelt_search_falls_back_to_similar_foods(self, mock_search_food):
+        mock_search_food.return_value = {"foods": []}
+
+        foods = FoodDataCentralService.get_foods_by_query_name("aples")
+
+        self.assertEqual([food["fdcId"] for food in foods], [171688])
+        mock_search_food.assert_called_once_with("aples", 1, 20)
+
+    @patch("fooddata_central_service.services.FOOD_SEARCH_FUZZY_FALLBACK", False)
+    @patch("fooddata_central_service.services.FoodDataCentralService.search_food")
+    def test_fallback_can_be_disabled(self, mock_search_food):
+        mock_search_food.return_value = {"foods": []}
+
+        self.assertEqual(FoodDataCentralService.get_foods_by_query_name("aples"), [])
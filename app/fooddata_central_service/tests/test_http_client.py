@@ -0,0 +1,81 @@
+from unittest.mock import MagicMock, patch
+
+import requests
+from django.test import SimpleTestCase
+
+from fooddata_central_service.http_client import DeadlineExceeded, PooledHTTPClient
+
+URL = "https://api.nal.usda.gov/fdc/v1/foods/search"
+
+
+def _response(status_code):
+    response = MagicMock()
+    response.status_code = status_code
+    return response
+
+
+@patch("fooddata_central_service.http_client.time.sleep")
+class PooledHTTPClientTests(SimpleTestCase):
+
+    def setUp(self):
+        self.client = PooledHTTPClient(
+            pool_size=2, connect_timeout=1, read_timeout=2, deadline=5, max_retries=2, backoff=0.1
+        )
+        self.session_get = patch.object(self.client.session, "get").start()
+        self.addCleanup(patch.stopall)
+
+    def test_session_is_reused(self, _):
+        self.assertIs(self.client.session, self.client.session)
+
+    def test_request_uses_timeouts(self, mock_sleep):
+        self.session_get.return_value = _response(200)
+
+        self.assertEqual(self.client.get(URL, params={"query": "apple"}).status_code, 200)
+        self.session_get.assert_called_once_with(URL, params={"query": "apple"}, timeout=(1, 2))
+        mock_sleep.assert_not_called()
+
+    def test_transient_failures_are_retried(self, mock_sleep):
+        self.session_get.side_effect = [requests.ConnectionError(), _response(503), _response(200)]
+
+        self.assertEqual(self.client.get(URL).status_code, 200)
+        self.assertEqual(self.session_get.call_count, 3)
+        self.assertEqual(mock_sleep.call_count, 2)
+        for call in mock_sleep.call_args_list:
+            self.assertLessEqual(call.args[0], 0.4)
+
+    def test_client_errors_are_not_retried(self, _):
+        self.session_get.return_value = _response(400)
+
+        self.assertEqual(self.client.get(URL).status_code, 400)
+        self.assertEqual(self.session_get.call_count, 1)
+
+    def test_retry_budget_is_bounded(self, _):
+        self.session_get.side_effect = requests.ReadTimeout()
+
+        with self.assertRaises(requests.ReadTimeout):
+            self.client.get(URL)
+        self.assertEqual(self.session_get.call_count, 3)
+
+    def test_last_response_is_returned_when_retries_are_exhausted(self, _):
+        self.session_get.return_value = _response(503)
+
+        self.assertEqual(self.client.get(URL).status_code, 503)
+        self.assertEqual(self.session_get.call_count, 3)
+
+    @patch("fooddata_central_service.http_client.time.monotonic")
+    def test_deadline_shortens_timeouts(self, mock_monotonic, _):
+        mock_monotonic.side_effect = [100, 104.5]
+        self.session_get.return_value = _response(200)
+
+        self.client.get(URL)
+        self.session_get.assert_called_once_with(URL, params=None, timeout=(0.5, 0.5))
+
+    @patch("fooddata_central_service.http_client.time.monotonic")
+    def test_deadline_exceeded(self, mock_monotonic, mock_sleep):
+        mock_monotonic.side_effect = [100, 101, 105]
+        self.session_get.side_effect = requests.ConnectionError()
+
+        with self.assertRaises(DeadlineExceeded):
+            self.client.get(URL)
+        self.assertEqual(self.session_get.call_count, 1)
+        mock_sleep.assert_not_called()
@@ -0,0 +1,132 @@
+import csv
+import os
+import tempfile
+from io import StringIO
+from pathlib import Path
+from unittest.mock import patch
+
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.test import TestCase
+
+from fooddata_central_service.local_search import search_local_foods
+from fooddata_central_service.models import Food, FoodNutrient
+from fooddata_central_service.serializers import FoodSearchResultSerializer
+from fooddata_central_service.services import FoodDataCentralService
+
+SR_LEGACY_SAMPLE = os.path.join(os.path.dirname(__file__), "sr_legacy_sample.json")
+
+
+class ImportSRLegacyTests(TestCase):
+
+    def test_import_json_only_keeps_extracted_nutrients(self):
+        call_command("import_sr_legacy", SR_LEGACY_SAMPLE, stdout=StringIO())
+
+        self.assertEqual(Food.objects.count(), 4)
+        self.assertEqual(
+            list(FoodNutrient.objects.filter(food_id=171474).values_list("nutrient_id", "unit_name")),
+            [(1003, "G"), (1004, "G"), (1005, "G"), (1008, "KCAL"), (1062, "kJ")],
+        )
+
+    def test_import_replaces_previous_import(self):
+        call_command("import_sr_legacy", SR_LEGACY_SAMPLE, stdout=StringIO())
+        call_command("import_sr_legacy", SR_LEGACY_SAMPLE, stdout=StringIO())
+
+        self.assertEqual(Food.objects.count(), 4)
+        self.assertEqual(len(search_local_foods("chicken", 20)), 3)
+
+    def test_import_csv_directory(self):
+        with tempfile.TemporaryDirectory() as directory:
+            directory = Path(directory)
+            tables = {
+                "food.csv": [
+                    ["fdc_id", "data_type", "description"],
+                    ["171116", "sr_legacy_food", "Chicken, ground, raw"],
+                    ["999999", "branded_food", "Chicken nuggets"],
+                ],
+                "nutrient.csv": [
+                    ["id", "name", "unit_name"],
+                    ["1003", "Protein", "G"],
+                    ["1008", "Energy", "KCAL"],
+                    ["1186", "Folic acid", "UG"],
+                ],
+                "food_nutrient.csv": [
+                    ["id", "fdc_id", "nutrient_id", "amount"],
+                    ["1", "171116", "1003", "17.4"],
+                    ["2", "171116", "1008", "143"],
+                    ["3", "171116", "1186", "0"],
+                    ["4", "999999", "1003", "12"],
+                ],
+            }
+            for name, rows in tables.items():
+                with open(directory / name, "w", newline="") as csv_file:
+                    csv.writer(csv_file).writerows(rows)
+
+            call_command("import_sr_legacy", str(directory), stdout=StringIO())
+
+        self.assertEqual(list(Food.objects.values_list("fdc_id", flat=True)), [171116])
+        self.assertEqual(sorted(FoodNutrient.objects.values_list("nutrient_id", flat=True)), [1003, 1008])
+
+    def test_import_missing_path(self):
+        with self.assertRaises(CommandError):
+            call_command("import_sr_legacy", "does/not/exist.json", stdout=StringIO())
+
+
+class LocalFoodSearchTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        call_command("import_sr_legacy", SR_LEGACY_SAMPLE, stdout=StringIO())
+
+    def test_every_word_must_match(self):
+        descriptions = [food["description"] for food in search_local_foods("raw chicken breast", 20)]
+
+        self.assertEqual(
+            descriptions,
+            [
+                "Chicken, broilers or fryers, breast, meat and skin, raw",
+                "Chicken, broiler or fryers, breast, skinless, boneless, meat only, raw",
+            ],
+        )
+
+    def test_prefix_and_stemmed_words_match(self):
+        self.assertEqual([food["fdcId"] for food in search_local_foods("appl", 20)], [171688])
+        self.assertEqual([food["fdcId"] for food in search_local_foods("chicken breasts", 20)], [171474, 171077])
+
+    def test_limit(self):
+        self.assertEqual(len(search_local_foods("chicken", 1)), 1)
+
+    def test_no_words(self):
+        self.assertEqual(search_local_foods("  ,, ", 20), [])
+
+    def test_results_are_serializable(self):
+        food = search_local_foods("ground chicken", 20)[0]
+
+        self.assertEqual(
+            FoodSearchResultSerializer(food).data,
+            {
+                "description": "Chicken, ground, raw",
+                "calories": {"value": 143.06, "unit": "KCAL"},
+                "protein": {"value": 17.4, "unit": "G"},
+                "fat": {"value": 8.1, "unit": "G"},
+                "carbs": {"value": 0.04, "unit": "G"},
+            },
+        )
+
+    @patch("fooddata_central_service.services.FOOD_SEARCH_SOURCE", "local")
+    def test_local_source_pagination(self):
+        first_page = FoodDataCentralService.get_foods_page("chicken", 1, 2)
+        second_page = FoodDataCentralService.get_foods_page("chicken", 2, 2)
+
+        self.assertEqual([food["fdcId"] for food in first_page["foods"]], [171116, 171474])
+        self.assertTrue(first_page["has_next"])
+        self.assertEqual([food["fdcId"] for food in second_page["foods"]], [171077])
+        self.assertFalse(second_page["has_next"])
+
+    @patch("fooddata_central_service.services.FOOD_SEARCH_SOURCE", "local")
+    @patch("fooddata_central_service.services.FoodDataCentralService.search_food")
+    def test_local_source_does_not_request_food_data_central(self, mock_search_food):
+        foods = FoodDataCentralService.get_foods_by_query_name("Raw Chicken Breast")
+
+        self.assertEqual(len(foods), 2)
+        mock_search_food.assert_not_called()
@@ -0,0 +1,98 @@
+from django.test import SimpleTestCase
+
+from fooddata_central_service.nutrients import (
+    CALORIES_INDEX,
+    ENERGY_KCAL_ID,
+    ENERGY_KJ_ID,
+    MACRONUTRIENTS,
+    NUTRIENT_PROFILE,
+    PROTEIN_ID,
+    PROTEIN_INDEX,
+    normalize_unit_name,
+    pack_nutrients,
+)
+from fooddata_central_service.serializers import FoodSearchResultSerializer
+
+FOLIC_ACID_ID = 1186
+SODIUM_ID = 1093
+FIBER_ID = 1079
+
+
+def _food(description, nutrients):
+    return {"fdcId": None, "description": description, "nutrients": pack_nutrients(nutrients)}
+
+
+class PackNutrientsTests(SimpleTestCase):
+
+    def test_every_profile_nutrient_has_a_slot(self):
+        packed = pack_nutrients([])
+
+        self.assertEqual(packed, [None] * len(NUTRIENT_PROFILE))
+
+    def test_only_profile_nutrients_are_packed(self):
+        packed = pack_nutrients([(FOLIC_ACID_ID, 0), (PROTEIN_ID, 20.8)])
+
+        self.assertEqual(packed[PROTEIN_INDEX], 20.8)
+        self.assertEqual(sum(value is not None for value in packed), 1)
+
+    def test_first_occurrence_is_kept(self):
+        packed = pack_nutrients([(PROTEIN_ID, 20.8), (PROTEIN_ID, 0)])
+
+        self.assertEqual(packed[PROTEIN_INDEX], 20.8)
+
+    def test_kcal_is_preferred_over_kj(self):
+        packed = pack_nutrients([(ENERGY_KJ_ID, 720), (ENERGY_KCAL_ID, 172)])
+
+        self.assertEqual(packed[CALORIES_INDEX], 172)
+
+    def test_kj_is_converted_when_kcal_is_missing(self):
+        packed = pack_nutrients([(ENERGY_KJ_ID, 598)])
+
+        self.assertEqual(packed[CALORIES_INDEX], 143.06)
+
+    def test_nutrient_ids_are_unique(self):
+        nutrient_ids = [nutrient.nutrient_id for nutrient in NUTRIENT_PROFILE]
+
+        self.assertEqual(len(nutrient_ids), len(set(nutrient_ids)))
+
+    def test_normalize_unit_name(self):
+        self.assertEqual(normalize_unit_name("g"), "G")
+        self.assertEqual(normalize_unit_name("kcal"), "KCAL")
+        self.assertEqual(normalize_unit_name("kJ"), "kJ")
+
+
+class FoodSearchResultSerializerTests(SimpleTestCase):
+
+    def test_missing_nutrients_are_none(self):
+        food = _food("Water, tap", [(ENERGY_KCAL_ID, 0)])
+
+        self.assertEqual(
+            FoodSearchResultSerializer(food).data,
+            {
+                "description": "Water, tap",
+                "calories": {"value": 0, "unit": "KCAL"},
+                "protein": None,
+                "fat": None,
+                "carbs": None,
+            },
+        )
+
+    def test_kj_is_converted_to_kcal(self):
+        food = _food("Chicken, ground, raw", [(ENERGY_KJ_ID, 598)])
+
+        self.assertEqual(FoodSearchResultSerializer(food).data["calories"], {"value": 143.06, "unit": "KCAL"})
+
+    def test_detailed_returns_the_rest_of_the_profile(self):
+        food = _food("Bread, white", [(ENERGY_KCAL_ID, 266), (SODIUM_ID, 477), (FIBER_ID, 2.4)])
+
+        data = FoodSearchResultSerializer(food, context={"detailed": True}).data
+
+        self.assertEqual(list(data["nutrients"]), [nutrient.field for nutrient in NUTRIENT_PROFILE[MACRONUTRIENTS:]])
+        self.assertEqual(data["nutrients"]["sodium"], {"value": 477, "unit": "MG"})
+        self.assertEqual(data["nutrients"]["fiber"], {"value": 2.4, "unit": "G"})
+        self.assertIsNone(data["nutrients"]["vitamin_c"])
+
+    def test_nutrients_are_omitted_unless_detailed(self):
+        food = _food("Bread, white", [(SODIUM_ID, 477)])
+
+        self.assertNotIn("nutrients", FoodSearchResultSerializer(food).data)
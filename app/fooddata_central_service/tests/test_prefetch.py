@@ -0,0 +1,50 @@
+import threading
+
+from django.test import SimpleTestCase
+
+from fooddata_central_service.prefetch import BackgroundPrefetcher
+
+
+class BackgroundPrefetcherTests(SimpleTestCase):
+
+    def test_prefetch_runs_in_background(self):
+        prefetcher = BackgroundPrefetcher(max_workers=1)
+        done = threading.Event()
+        threads = []
+
+        def prefetch():
+            threads.append(threading.current_thread())
+            done.set()
+
+        prefetcher.submit("banana:2:20", prefetch)
+
+        self.assertTrue(done.wait(timeout=5))
+        self.assertIsNot(threads[0], threading.current_thread())
+
+    def test_pending_key_is_not_submitted_again(self):
+        prefetcher = BackgroundPrefetcher(max_workers=1)
+        started, release = threading.Event(), threading.Event()
+        calls = []
+
+        def prefetch():
+            calls.append(1)
+            started.set()
+            release.wait(timeout=5)
+
+        prefetcher.submit("banana:2:20", prefetch)
+        started.wait(timeout=5)
+        prefetcher.submit("banana:2:20", prefetch)
+        release.set()
+        prefetcher._executor.shutdown(wait=True)
+
+        self.assertEqual(len(calls), 1)
+
+    def test_failures_are_not_raised(self):
+        prefetcher = BackgroundPrefetcher(max_workers=1)
+
+        def prefetch():
+            raise ConnectionError()
+
+        with self.assertLogs("fooddata_central_service.prefetch", level="WARNING"):
+            prefetcher.submit("banana:2:20", prefetch)
+            prefetcher._executor.shutdown(wait=True)
@@ -0,0 +1,339 @@
+import json
+import os
+import tempfile
+import threading
+import time
+from io import StringIO
+from pathlib import Path
+from unittest.mock import patch
+
+import requests
+from django.contrib.auth.models import AnonymousUser, User
+from django.core.management import call_command
+from django.test import SimpleTestCase, TestCase
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APIClient, APITestCase
+
+from fooddata_central_service.http_client import DeadlineExceeded
+from fooddata_central_service.nutrients import MACRONUTRIENTS, pack_nutrients
+from fooddata_central_service.providers import (
+    BrandedFoodProvider,
+    FoodDataCentralProvider,
+    NutritionProvider,
+    ProviderFanOut,
+    ProvidersUnavailable,
+    SRLegacyProvider,
+    UserFoodProvider,
+    food_search_fan_out,
+    merge_results,
+)
+from fooddata_central_service.quota import QuotaExceeded
+from intake.models import FoodEntry
+
+SR_LEGACY_SAMPLE = os.path.join(os.path.dirname(__file__), "sr_legacy_sample.json")
+
+
+def _food(fdc_id, description):
+    return {"fdcId": fdc_id, "description": description, "nutrients": pack_nutrients([])}
+
+
+class FakeProvider(NutritionProvider):
+
+    def __init__(self, name, foods, deadline=1, weight=1.0, delay=0, error=None, stale=False, remote=False):
+        super().__init__(deadline)
+        self.name = name
+        self.remote = remote
+        self.weight = weight
+        self.foods = foods
+        self.delay = delay
+        self.error = error
+        self.stale = stale
+        self.threads = []
+
+    def search(self, query, page_number, page_size, user):
+        self.threads.append(threading.current_thread())
+        time.sleep(self.delay)
+        if self.error is not None:
+            raise self.error
+        limit = page_number * page_size
+        result = {"foods": self.foods[:limit], "has_next": len(self.foods) > limit}
+        if self.stale:
+            result["stale"] = True
+        return result
+
+
+class MergeResultsTests(SimpleTestCase):
+
+    def test_duplicates_are_merged(self):
+        remote = FakeProvider("remote", [])
+        local = FakeProvider("local", [])
+
+        foods = merge_results(
+            [
+                (remote, {"foods": [_food(1, "Apples, raw"), _food(2, "Banana, raw")]}),
+                (local, {"foods": [_food(2, "Banana, raw"), _food(3, "Cherries"), _food(None, "apples,  RAW")]}),
+            ]
+        )
+
+        # Banana is returned by both providers, Apples is matched by its description.
+        self.assertEqual([food["description"] for food in foods], ["Banana, raw", "Apples, raw", "Cherries"])
+
+    def test_weight(self):
+        user_foods = FakeProvider("user_foods", [], weight=2.0)
+        remote = FakeProvider("remote", [])
+
+        foods = merge_results(
+            [
+                (remote, {"foods": [_food(1, "Oats"), _food(2, "Oat milk")]}),
+                (user_foods, {"foods": [_food(None, "Mum's porridge oats")]}),
+            ]
+        )
+
+        self.assertEqual([food["description"] for food in foods], ["Mum's porridge oats", "Oats", "Oat milk"])
+
+    def test_ties_keep_provider_order(self):
+        first, second = FakeProvider("first", []), FakeProvider("second", [])
+
+        foods = merge_results([(first, {"foods": [_food(1, "Kiwi")]}), (second, {"foods": [_food(2, "Lime")]})])
+
+        self.assertEqual([food["fdcId"] for food in foods], [1, 2])
+
+
+class NutritionProviderTests(SimpleTestCase):
+
+    def test_provider_without_search_can_not_be_created(self):
+        class MisconfiguredProvider(NutritionProvider):
+            name = "misconfigured"
+
+        with self.assertRaises(TypeError):
+            MisconfiguredProvider(deadline=1)
+
+    def test_errors_are_handled_like_failed_requests(self):
+        for error in (ProvidersUnavailable, QuotaExceeded, DeadlineExceeded):
+            with self.subTest(error=error.__name__):
+                self.assertTrue(issubclass(error, requests.RequestException))
+        self.assertTrue(issubclass(DeadlineExceeded, requests.Timeout))
+
+
+class ProviderFanOutTests(SimpleTestCase):
+
+    def test_providers_are_searched_concurrently(self):
+        providers = [
+            FakeProvider("remote", [_food(1, "Apples, raw")], delay=0.3),
+            FakeProvider("local", [_food(2, "Apple juice")], delay=0.3),
+        ]
+
+        started = time.monotonic()
+        page = ProviderFanOut(providers, max_workers=2).search("apple", 1, 20)
+
+        self.assertLess(time.monotonic() - started, 0.55)
+        self.assertEqual([food["fdcId"] for food in page["foods"]], [1, 2])
+        self.assertIsNot(providers[0].threads[0], providers[1].threads[0])
+
+    def test_slow_provider_is_dropped_after_its_deadline(self):
+        providers = [
+            FakeProvider("remote", [_food(1, "Apples, raw")], deadline=0.1, delay=1),
+            FakeProvider("local", [_food(2, "Apple juice")], deadline=1),
+        ]
+
+        started = time.monotonic()
+        with self.assertLogs("fooddata_central_service.providers", "WARNING"):
+            page = ProviderFanOut(providers, max_workers=2).search("apple", 1, 20)
+
+        self.assertLess(time.monotonic() - started, 0.5)
+        self.assertEqual([food["fdcId"] for food in page["foods"]], [2])
+
+    def test_slow_remote_provider_does_not_hold_up_local_providers(self):
+        providers = [
+            FakeProvider("remote", [_food(1, "Apples, raw")], deadline=0.05, delay=0.5, remote=True),
+            FakeProvider("local", [_food(2, "Apple juice")], deadline=0.2),
+        ]
+        fan_out = ProviderFanOut(providers, max_workers=1)
+
+        with self.assertLogs("fooddata_central_service.providers", "WARNING"):
+            fan_out.search("apple", 1, 20)
+            page = fan_out.search("apple", 1, 20)
+
+        self.assertEqual([food["fdcId"] for food in page["foods"]], [2])
+        self.assertIsNot(providers[0].threads[0], providers[1].threads[0])
+
+    def test_failed_provider_is_dropped(self):
+        providers = [
+            FakeProvider("remote", [], error=ConnectionError()),
+            FakeProvider("local", [_food(2, "Apple juice")]),
+        ]
+
+        with self.assertLogs("fooddata_central_service.providers", "WARNING"):
+            page = ProviderFanOut(providers, max_workers=2).search("apple", 1, 20)
+
+        self.assertEqual([food["fdcId"] for food in page["foods"]], [2])
+
+    def test_every_provider_failed(self):
+        providers = [
+            FakeProvider("remote", [], error=ConnectionError()),
+            FakeProvider("local", [], delay=1, deadline=0),
+        ]
+
+        with self.assertLogs("fooddata_central_service.providers", "WARNING"):
+            with self.assertRaises(ProvidersUnavailable):
+                ProviderFanOut(providers, max_workers=2).search("apple", 1, 20)
+
+    def test_pagination(self):
+        providers = [
+            FakeProvider("remote", [_food(fdc_id, f"Remote {fdc_id}") for fdc_id in range(1, 4)]),
+            FakeProvider("local", [_food(fdc_id, f"Local {fdc_id}") for fdc_id in range(11, 14)]),
+        ]
+        fan_out = ProviderFanOut(providers, max_workers=2)
+
+        first_page = fan_out.search("food", 1, 2)
+        second_page = fan_out.search("food", 2, 2)
+        third_page = fan_out.search("food", 3, 2)
+
+        self.assertEqual([food["fdcId"] for food in first_page["foods"]], [1, 11])
+        self.assertTrue(first_page["has_next"])
+        self.assertEqual([food["fdcId"] for food in second_page["foods"]], [2, 12])
+        self.assertEqual([food["fdcId"] for food in third_page["foods"]], [3, 13])
+        self.assertFalse(third_page["has_next"])
+
+    def test_stale_results(self):
+        providers = [FakeProvider("remote", [_food(1, "Apples, raw")], stale=True), FakeProvider("local", [])]
+
+        self.assertTrue(ProviderFanOut(providers, max_workers=2).search("apple", 1, 20)["stale"])
+
+
+class FoodDataCentralProviderTests(SimpleTestCase):
+
+    @patch("fooddata_central_service.providers.FoodDataCentralService.get_remote_foods_page")
+    def test_later_page_is_a_single_request(self, mock_get_remote_foods_page):
+        mock_get_remote_foods_page.return_value = {
+            "foods": [_food(1, "Apples, raw"), _food(2, "Apple juice")],
+            "has_next": True,
+            "stale": True,
+        }
+
+        result = FoodDataCentralProvider(deadline=1).search("apple", 2, 1, None)
+
+        self.assertEqual(
+            result, {"foods": [_food(1, "Apples, raw"), _food(2, "Apple juice")], "has_next": True, "stale": True}
+        )
+        mock_get_remote_foods_page.assert_called_once_with("apple", 1, 2, next_page=(1, 3))
+
+    @patch("fooddata_central_service.providers.FoodDataCentralService.get_remote_foods_page")
+    def test_pages_larger_than_the_api_allows_are_split(self, mock_get_remote_foods_page):
+        mock_get_remote_foods_page.side_effect = [
+            {"foods": [_food(fdc_id, "Apples") for fdc_id in range(200)], "has_next": True},
+            {"foods": [_food(fdc_id, "Apples") for fdc_id in range(200, 300)], "has_next": False},
+        ]
+
+        result = FoodDataCentralProvider(deadline=1).search("apple", 6, 50, None)
+
+        self.assertEqual(len(result["foods"]), 300)
+        self.assertFalse(result["has_next"])
+        self.assertEqual(
+            [call.args for call in mock_get_remote_foods_page.call_args_list], [("apple", 1, 200), ("apple", 2, 200)]
+        )
+
+
+class LocalProviderTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create(id=1, username="Test User")
+        call_command("import_sr_legacy", SR_LEGACY_SAMPLE, stdout=StringIO())
+        with tempfile.TemporaryDirectory() as directory:
+            json_path = Path(directory) / "branded.json"
+            json_path.write_text(
+                json.dumps(
+                    {"BrandedFoods": [{"fdcId": 2000001, "description": "CHICKEN NUGGETS", "foodNutrients": []}]}
+                ),
+                encoding="utf-8",
+            )
+            call_command("import_branded_foods", str(json_path), stdout=StringIO())
+
+        for date, food_name, weight in [
+            ("2024-09-01", "Chicken curry", 200),
+            ("2024-09-03", "chicken  curry", 400),
+            ("2024-09-02", "Chicken salad", 150),
+            ("2024-09-04", "Apple pie", 100),
+        ]:
+            FoodEntry.objects.create(
+                user=cls.user,
+                date=date,
+                food_name=food_name,
+                total_calories=weight * 1.5,
+                total_protein=weight * 0.1,
+                total_fats=weight * 0.05,
+                total_carbs=weight * 0.2,
+                food_weight=weight,
+            )
+
+    def test_datasets_are_searched_separately(self):
+        sr_legacy = SRLegacyProvider(deadline=1).search("chicken", 1, 20, None)
+        branded = BrandedFoodProvider(deadline=1).search("chicken", 1, 20, None)
+
+        self.assertEqual(len(sr_legacy["foods"]), 3)
+        self.assertEqual([food["fdcId"] for food in branded["foods"]], [2000001])
+
+    def test_user_foods_are_scaled_to_100_g(self):
+        result = UserFoodProvider(deadline=1).search("chicken", 1, 20, self.user)
+
+        self.assertEqual([food["description"] for food in result["foods"]], ["chicken  curry", "Chicken salad"])
+        self.assertEqual(
+            result["foods"][0]["nutrients"][:MACRONUTRIENTS],
+            [150, 10, 5, 20],
+        )
+        self.assertFalse(result["has_next"])
+
+    def test_user_foods_pagination(self):
+        result = UserFoodProvider(deadline=1).search("chicken", 1, 1, self.user)
+
+        self.assertEqual(len(result["foods"]), 1)
+        self.assertTrue(result["has_next"])
+
+    def test_anonymous_user_has_no_foods(self):
+        self.assertEqual(UserFoodProvider(deadline=1).search("chicken", 1, 20, AnonymousUser())["foods"], [])
+
+
+class FoodSearchViewProviderTests(APITestCase):
+
+    def setUp(self):
+        self.user = User.objects.create(id=1, username="Test User")
+        self.client = APIClient()
+        self.client.force_authenticate(user=self.user)
+        self.url = reverse("food-search")
+
+    def _providers(self, *providers):
+        patcher = patch.object(food_search_fan_out, "providers", list(providers))
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_results_of_every_provider_are_merged(self):
+        self._providers(
+            FakeProvider("remote", [_food(1, "Apples, raw")]),
+            FakeProvider("user_foods", [_food(None, "Apple crumble")]),
+        )
+
+        response = self.client.get(self.url, {"food": "apple"})
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(
+            [food["description"] for food in response.data["search_results"]], ["Apples, raw", "Apple crumble"]
+        )
+
+    def test_user_is_given_to_providers(self):
+        provider = FakeProvider("user_foods", [])
+        self._providers(provider)
+
+        with patch.object(provider, "search", return_value={"foods": [], "has_next": False}) as mock_search:
+            self.client.get(self.url, {"food": "apple"})
+
+        self.assertEqual(mock_search.call_args.args[3], self.user)
+
+    def test_every_provider_failed(self):
+        self._providers(FakeProvider("remote", [], error=ConnectionError()))
+
+        with self.assertLogs("fooddata_central_service.providers", "WARNING"):
+            response = self.client.get(self.url, {"food": "apple"})
+
+        self.assertEqual(response.status_code, status.HTTP_503_SERVICE_UNAVAILABLE)
@@ -0,0 +1,157 @@
+from unittest.mock import MagicMock, patch
+
+from django.contrib.auth.models import User
+from django.db import transaction
+from django.test import TestCase
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APIClient, APITestCase
+
+from fooddata_central_service.http_client import PooledHTTPClient
+from fooddata_central_service.models import ApiQuota
+from fooddata_central_service.quota import (
+    LOW_PRIORITY,
+    QuotaExceeded,
+    TokenBucket,
+    food_data_central_quota,
+    low_priority,
+    request_priority,
+)
+
+
+@patch("fooddata_central_service.quota.time.sleep")
+@patch("fooddata_central_service.quota.time.time")
+class TokenBucketTests(TestCase):
+
+    def setUp(self):
+        # 3600 requests per hour refills a single token every second
+        self.bucket = TokenBucket("test", requests_per_hour=3600, capacity=4, reserve=0.5, max_wait=2)
+
+    def test_tokens_are_shared_through_the_database(self, mock_time, _):
+        mock_time.return_value = 1000
+        for _ in range(4):
+            self.bucket.acquire()
+
+        other_process = TokenBucket("test", requests_per_hour=3600, capacity=4, reserve=0.5, max_wait=0)
+        self.assertEqual(other_process.remaining(), 0)
+        with self.assertRaises(QuotaExceeded):
+            other_process.acquire()
+
+    def test_bucket_created_by_another_process_is_kept(self, mock_time, _):
+        ApiQuota.objects.create(name="test", tokens=1, updated_at=1000)
+
+        # As if another process created the bucket after it was found missing.
+        with transaction.atomic():
+            bucket = self.bucket._create_bucket(1000)
+
+        self.assertEqual(bucket.tokens, 1)
+        self.assertEqual(ApiQuota.objects.count(), 1)
+
+    def test_tokens_refill_up_to_capacity(self, mock_time, _):
+        mock_time.return_value = 1000
+        for _ in range(4):
+            self.bucket.acquire()
+
+        mock_time.return_value = 1002.5
+        self.assertEqual(self.bucket.remaining(), 2.5)
+        mock_time.return_value = 2000
+        self.assertEqual(self.bucket.remaining(), 4)
+
+    def test_high_priority_waits_for_a_token(self, mock_time, mock_sleep):
+        mock_time.return_value = 1000
+        for _ in range(4):
+            self.bucket.acquire()
+
+        mock_sleep.side_effect = lambda seconds: setattr(mock_time, "return_value", mock_time.return_value + seconds)
+        self.bucket.acquire()
+
+        mock_sleep.assert_called_once_with(1)
+
+    def test_high_priority_does_not_wait_past_deadline(self, mock_time, mock_sleep):
+        mock_time.return_value = 1000
+        for _ in range(4):
+            self.bucket.acquire()
+
+        with patch("fooddata_central_service.quota.time.monotonic", return_value=50):
+            with self.assertRaises(QuotaExceeded):
+                self.bucket.acquire(deadline=50.5)
+        mock_sleep.assert_not_called()
+
+    def test_low_priority_keeps_reserve_for_users(self, mock_time, mock_sleep):
+        mock_time.return_value = 1000
+
+        low_priority(self.bucket.acquire)()
+        low_priority(self.bucket.acquire)()
+        with self.assertRaises(QuotaExceeded):
+            low_priority(self.bucket.acquire)()
+        mock_sleep.assert_not_called()
+
+        self.bucket.acquire()
+        self.bucket.acquire()
+        self.assertEqual(self.bucket.remaining(), 0)
+
+    def test_low_priority_is_scoped(self, *_):
+        self.assertEqual(low_priority(request_priority.get)(), LOW_PRIORITY)
+        self.assertNotEqual(request_priority.get(), LOW_PRIORITY)
+
+
+class RateLimitedHTTPClientTests(TestCase):
+
+    @patch("fooddata_central_service.http_client.time.sleep")
+    def test_every_attempt_acquires_a_token(self, _):
+        rate_limiter = MagicMock()
+        client = PooledHTTPClient(
+            pool_size=1,
+            connect_timeout=1,
+            read_timeout=1,
+            deadline=5,
+            max_retries=2,
+            backoff=0.1,
+            rate_limiter=rate_limiter,
+        )
+        response = MagicMock(status_code=503)
+
+        with patch.object(client.session, "get", return_value=response):
+            client.get("https://api.nal.usda.gov/fdc/v1/foods/search")
+
+        self.assertEqual(rate_limiter.acquire.call_count, 3)
+
+    def test_quota_exceeded_does_not_make_a_request(self):
+        rate_limiter = MagicMock()
+        rate_limiter.acquire.side_effect = QuotaExceeded()
+        client = PooledHTTPClient(
+            pool_size=1,
+            connect_timeout=1,
+            read_timeout=1,
+            deadline=5,
+            max_retries=2,
+            backoff=0.1,
+            rate_limiter=rate_limiter,
+        )
+
+        with patch.object(client.session, "get") as mock_get:
+            with self.assertRaises(QuotaExceeded):
+                client.get("https://api.nal.usda.gov/fdc/v1/foods/search")
+        mock_get.assert_not_called()
+
+
+class FoodDataCentralQuotaViewTests(APITestCase):
+
+    def setUp(self):
+        self.client = APIClient()
+        self.client.force_authenticate(user=User.objects.create(id=1, username="Test User", is_staff=True))
+
+    def test_remaining_quota(self):
+        food_data_central_quota.acquire()
+
+        response = self.client.get(reverse("fooddata-central-quota"))
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data["capacity"], 100)
+        self.assertEqual(response.data["remaining"], 99)
+        self.assertEqual(response.data["requests_per_hour"], 1000)
+
+    def test_only_staff_users(self):
+        self.client.force_authenticate(user=User.objects.create(id=2, username="Other User"))
+
+        self.assertEqual(self.client.get(reverse("fooddata-central-quota")).status_code, status.HTTP_403_FORBIDDEN)
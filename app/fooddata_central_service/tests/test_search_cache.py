@@ -0,0 +1,109 @@
+from unittest.mock import patch
+
+from django.core.cache import cache
+from django.test import TestCase
+
+from fooddata_central_service.cache import food_search_cache, normalize_query
+from fooddata_central_service.nutrients import NUTRIENT_PROFILE, PROTEIN_INDEX
+from fooddata_central_service.services import (
+    FoodDataCentralService,
+    food_search_prefetcher,
+)
+
+from .fixtures import load_search_raw_chicken_breast
+
+
+class FoodSearchCacheTests(TestCase):
+
+    def setUp(self):
+        food_search_cache.clear()
+        cache.clear()
+
+        patcher = patch.object(food_search_prefetcher, "submit")
+        self.mock_prefetch = patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_normalize_query(self):
+        self.assertEqual(normalize_query("  Raw   CHICKEN breast "), "raw chicken breast")
+
+    @patch("fooddata_central_service.services.FoodDataCentralService.search_food")
+    def test_repeated_search_only_requests_once(self, mock_search_food):
+        mock_search_food.return_value = load_search_raw_chicken_breast()
+
+        first = FoodDataCentralService.get_foods_by_query_name("Raw Chicken Breast")
+        second = FoodDataCentralService.get_foods_by_query_name("raw  chicken breast")
+
+        self.assertEqual(mock_search_food.call_count, 1)
+        mock_search_food.assert_called_once_with("raw chicken breast", 1, 20)
+        self.assertEqual(first, second)
+
+    @patch("fooddata_central_service.services.FoodDataCentralService.search_food")
+    def test_shared_tier_is_used_after_local_tier_is_lost(self, mock_search_food):
+        mock_search_food.return_value = load_search_raw_chicken_breast()
+
+        FoodDataCentralService.get_foods_by_query_name("Raw Chicken Breast")
+
+        # Simulates a request arriving on a different gunicorn worker
+        food_search_cache.clear()
+        foods = FoodDataCentralService.get_foods_by_query_name("Raw Chicken Breast")
+
+        self.assertEqual(mock_search_food.call_count, 1)
+        self.assertEqual(len(foods), 10)
+
+    @patch("fooddata_central_service.services.FoodDataCentralService.search_food")
+    def test_empty_results_are_cached(self, mock_search_food):
+        mock_search_food.return_value = {"foods": []}
+
+        self.assertEqual(FoodDataCentralService.get_foods_by_query_name("chiken"), [])
+        self.assertEqual(FoodDataCentralService.get_foods_by_query_name("chiken"), [])
+        self.assertEqual(mock_search_food.call_count, 1)
+
+    @patch("fooddata_central_service.services.FoodDataCentralService.search_food")
+    def test_cached_foods_only_keep_packed_nutrients(self, mock_search_food):
+        mock_search_food.return_value = load_search_raw_chicken_breast()
+
+        food = FoodDataCentralService.get_foods_by_query_name("Raw Chicken Breast")[0]
+
+        self.assertEqual(food["fdcId"], 171474)
+        self.assertEqual(set(food), {"fdcId", "description", "nutrients"})
+        self.assertEqual(len(food["nutrients"]), len(NUTRIENT_PROFILE))
+        self.assertEqual(food["nutrients"][PROTEIN_INDEX], 20.8)
+
+    @patch("fooddata_central_service.services.FoodDataCentralService.search_food")
+    def test_pages_are_cached_separately(self, mock_search_food):
+        mock_search_food.return_value = load_search_raw_chicken_breast()
+
+        first_page = FoodDataCentralService.get_foods_page("Raw Chicken Breast", 1, 10)
+        second_page = FoodDataCentralService.get_foods_page("Raw Chicken Breast", 2, 10)
+        FoodDataCentralService.get_foods_page("Raw Chicken Breast", 2, 10)
+
+        self.assertTrue(first_page["has_next"])
+        self.assertTrue(second_page["has_next"])
+        self.assertEqual(
+            [call.args for call in mock_search_food.call_args_list],
+            [("raw chicken breast", 1, 10), ("raw chicken breast", 2, 10)],
+        )
+
+    @patch("fooddata_central_service.services.FoodDataCentralService.search_food")
+    def test_last_page_has_no_next_page(self, mock_search_food):
+        mock_search_food.return_value = {**load_search_raw_chicken_breast(), "totalPages": 3}
+
+        self.assertFalse(FoodDataCentralService.get_foods_page("Raw Chicken Breast", 3, 10)["has_next"])
+        self.mock_prefetch.assert_not_called()
+
+    @patch("fooddata_central_service.services.FoodDataCentralService.search_food")
+    def test_next_page_is_prefetched(self, mock_search_food):
+        mock_search_food.return_value = load_search_raw_chicken_breast()
+
+        FoodDataCentralService.get_foods_page("Raw Chicken Breast", 1, 10)
+
+        key, prefetch = self.mock_prefetch.call_args.args
+        self.assertEqual(key, "raw chicken breast:2:10")
+
+        prefetch()
+        FoodDataCentralService.get_foods_page("Raw Chicken Breast", 2, 10)
+
+        self.assertEqual(
+            [call.args for call in mock_search_food.call_args_list],
+            [("raw chicken breast", 1, 10), ("raw chicken breast", 2, 10)],
+        )
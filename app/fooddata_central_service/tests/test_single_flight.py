@@ -0,0 +1,105 @@
+import threading
+from unittest.mock import patch
+
+from django.core.cache import cache
+from django.test import SimpleTestCase, TestCase
+
+from fooddata_central_service.cache import food_search_cache, page_cache_key
+from fooddata_central_service.services import FoodDataCentralService
+from fooddata_central_service.single_flight import SingleFlight
+
+
+class SingleFlightTests(SimpleTestCase):
+
+    def _run_concurrently(self, single_flight, key, fn, number_of_callers=8):
+        results, errors = [], []
+
+        def caller():
+            try:
+                results.append(single_flight.do(key, fn))
+            except Exception as error:
+                errors.append(error)
+
+        threads = [threading.Thread(target=caller) for _ in range(number_of_callers)]
+        for thread in threads:
+            thread.start()
+        return threads, results, errors
+
+    def test_concurrent_callers_share_one_call(self):
+        single_flight = SingleFlight()
+        started, release = threading.Event(), threading.Event()
+        calls = []
+
+        def fn():
+            calls.append(1)
+            started.set()
+            release.wait(timeout=5)
+            return ["banana"]
+
+        threads, results, errors = self._run_concurrently(single_flight, "banana", fn)
+        started.wait(timeout=5)
+        release.set()
+        for thread in threads:
+            thread.join(timeout=5)
+
+        self.assertEqual(len(calls), 1)
+        self.assertEqual(results, [["banana"]] * len(threads))
+        self.assertEqual(errors, [])
+
+    def test_errors_are_shared_and_not_remembered(self):
+        single_flight = SingleFlight()
+
+        def fn():
+            raise ValueError()
+
+        with self.assertRaises(ValueError):
+            single_flight.do("banana", fn)
+
+        self.assertEqual(single_flight.do("banana", lambda: ["banana"]), ["banana"])
+
+    def test_different_keys_are_not_coalesced(self):
+        single_flight = SingleFlight()
+
+        self.assertEqual(single_flight.do("apple", lambda: "apple"), "apple")
+        self.assertEqual(single_flight.do("banana", lambda: "banana"), "banana")
+
+
+class CrossWorkerCoalescingTests(TestCase):
+
+    KEY = page_cache_key("banana", 1, 20)
+
+    def setUp(self):
+        food_search_cache.clear()
+        cache.clear()
+
+    @patch("fooddata_central_service.services.time.sleep")
+    @patch("fooddata_central_service.services.FoodDataCentralService.search_food")
+    def test_waits_for_worker_holding_the_lock(self, mock_search_food, mock_sleep):
+        food_search_cache.acquire_lock(self.KEY, timeout=15)
+        mock_sleep.side_effect = lambda _: food_search_cache.set(
+            self.KEY, {"foods": [{"description": "Bananas, raw"}], "has_next": False}
+        )
+
+        foods = FoodDataCentralService.get_foods_by_query_name("banana")
+
+        self.assertEqual(foods, [{"description": "Bananas, raw"}])
+        mock_search_food.assert_not_called()
+
+    @patch("fooddata_central_service.services.time.sleep")
+    @patch("fooddata_central_service.services.FoodDataCentralService.search_food")
+    def test_requests_when_lock_is_released_without_result(self, mock_search_food, mock_sleep):
+        food_search_cache.acquire_lock(self.KEY, timeout=15)
+        mock_sleep.side_effect = lambda _: food_search_cache.release_lock(self.KEY)
+        mock_search_food.return_value = {"foods": []}
+
+        self.assertEqual(FoodDataCentralService.get_foods_by_query_name("banana"), [])
+        mock_search_food.assert_called_once_with("banana", 1, 20)
+
+    @patch("fooddata_central_service.services.FoodDataCentralService.search_food")
+    def test_lock_is_released_after_request(self, mock_search_food):
+        mock_search_food.side_effect = ConnectionError()
+
+        with self.assertRaises(ConnectionError):
+            FoodDataCentralService.get_foods_by_query_name("banana")
+
+        self.assertFalse(food_search_cache.is_locked(self.KEY))
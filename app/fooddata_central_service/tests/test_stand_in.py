@@ -0,0 +1,167 @@
+import json
+import os
+import tempfile
+from unittest.mock import patch
+
+import requests
+from django.core.cache import cache
+from django.test import SimpleTestCase, TestCase
+
+from fooddata_central_service.cache import food_search_cache
+from fooddata_central_service.http_client import PooledHTTPClient
+from fooddata_central_service.services import (
+    FoodDataCentralService,
+    food_search_prefetcher,
+)
+from fooddata_central_service.stand_in import (
+    RecordingAdapter,
+    ReplayAdapter,
+    recording_key,
+    save_recording,
+)
+
+from .fixtures import load_search_raw_chicken_breast
+
+SEARCH_URL = f"{FoodDataCentralService.BASE_URL}/search"
+SEARCH_PARAMS = {
+    "query": "raw chicken breast",
+    "api_key": "DEMO_KEY",
+    "dataType": ["SR Legacy"],
+    "pageSize": 20,
+    "pageNumber": 1,
+}
+
+
+def _prepared_url(url, params):
+    return requests.Request("GET", url, params=params).prepare().url
+
+
+class StandInTestCase(SimpleTestCase):
+
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.directory = directory.name
+        save_recording(self.directory, _prepared_url(SEARCH_URL, SEARCH_PARAMS), 200, load_search_raw_chicken_breast())
+
+    def _client(self, **stand_in):
+        return PooledHTTPClient(
+            pool_size=2,
+            connect_timeout=1,
+            read_timeout=2,
+            deadline=5,
+            max_retries=0,
+            backoff=0.1,
+            adapter_factory=lambda pool_size: ReplayAdapter(self.directory, **stand_in),
+        )
+
+
+@patch("fooddata_central_service.stand_in.time.sleep")
+class ReplayAdapterTests(StandInTestCase):
+
+    def test_recording_key_ignores_api_key_and_parameter_order(self, _):
+        self.assertEqual(
+            recording_key(f"{SEARCH_URL}?query=apple&api_key=abc&pageSize=20"),
+            recording_key(f"{SEARCH_URL}?pageSize=20&query=apple&api_key=xyz"),
+        )
+        self.assertNotEqual(
+            recording_key(f"{SEARCH_URL}?query=apple"),
+            recording_key(f"{SEARCH_URL}?query=banana"),
+        )
+
+    def test_replays_recording(self, mock_sleep):
+        client = self._client(latency=0.2)
+
+        response = client.get(SEARCH_URL, params={**SEARCH_PARAMS, "api_key": "ANOTHER_KEY"})
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json(), load_search_raw_chicken_breast())
+        mock_sleep.assert_called_once_with(0.2)
+
+    def test_request_without_recording(self, _):
+        response = self._client().get(SEARCH_URL, params={**SEARCH_PARAMS, "query": "apple"})
+
+        self.assertEqual(response.status_code, 404)
+
+    def test_latency_beyond_read_timeout(self, mock_sleep):
+        with self.assertRaises(requests.ReadTimeout):
+            self._client(latency=3).get(SEARCH_URL, params=SEARCH_PARAMS)
+        mock_sleep.assert_called_once_with(2)
+
+    def test_error_rate_is_repeatable(self, _):
+        def status_codes():
+            client = self._client(error_rate=0.5, seed=1)
+            return [client.get(SEARCH_URL, params=SEARCH_PARAMS).status_code for _ in range(20)]
+
+        first_run = status_codes()
+
+        self.assertEqual(set(first_run), {200, 503})
+        self.assertEqual(first_run, status_codes())
+
+    @patch("fooddata_central_service.stand_in.time.monotonic", return_value=100.5)
+    def test_throttling(self, mock_monotonic, _):
+        client = self._client(requests_per_second=2)
+
+        status_codes = [client.get(SEARCH_URL, params=SEARCH_PARAMS).status_code for _ in range(3)]
+        mock_monotonic.return_value = 101.5
+        status_codes.append(client.get(SEARCH_URL, params=SEARCH_PARAMS).status_code)
+
+        self.assertEqual(status_codes, [200, 200, 429, 200])
+
+
+class RecordingAdapterTests(StandInTestCase):
+
+    @patch("requests.adapters.HTTPAdapter.send")
+    def test_successful_responses_are_recorded(self, mock_send):
+        def send(request, **kwargs):
+            response = requests.Response()
+            response.status_code = 200 if "apple" in request.url else 500
+            response._content = json.dumps({"foods": [{"description": "Apples, raw, with skin"}]}).encode()
+            return response
+
+        mock_send.side_effect = send
+        client = PooledHTTPClient(
+            pool_size=2,
+            connect_timeout=1,
+            read_timeout=2,
+            deadline=5,
+            max_retries=0,
+            backoff=0.1,
+            adapter_factory=lambda pool_size: RecordingAdapter(self.directory, pool_maxsize=pool_size),
+        )
+
+        client.get(SEARCH_URL, params={**SEARCH_PARAMS, "query": "apple"})
+        client.get(SEARCH_URL, params={**SEARCH_PARAMS, "query": "banana"})
+
+        replay = self._client()
+        with patch("fooddata_central_service.stand_in.time.sleep"):
+            apple = replay.get(SEARCH_URL, params={**SEARCH_PARAMS, "query": "apple", "api_key": "ANOTHER_KEY"})
+            banana = replay.get(SEARCH_URL, params={**SEARCH_PARAMS, "query": "banana"})
+        self.assertEqual(apple.json(), {"foods": [{"description": "Apples, raw, with skin"}]})
+        self.assertEqual(banana.status_code, 404)
+        self.assertEqual(len(os.listdir(self.directory)), 2)
+        self.assertNotIn(
+            "ANOTHER_KEY", "".join(open(os.path.join(self.directory, f)).read() for f in os.listdir(self.directory))
+        )
+
+
+class FoodSearchStandInTests(StandInTestCase, TestCase):
+
+    def setUp(self):
+        super().setUp()
+        food_search_cache.clear()
+        cache.clear()
+
+        for patcher in [
+            patch.object(food_search_prefetcher, "submit"),
+            patch("fooddata_central_service.services.food_data_central_client", self._client(latency=0.01)),
+            patch("fooddata_central_service.services.FOODDATA_CENTRAL_API_KEY", "DEMO_KEY"),
+        ]:
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+    def test_search_is_answered_by_stand_in(self):
+        page = FoodDataCentralService.get_foods_page("Raw Chicken Breast")
+
+        self.assertEqual(len(page["foods"]), 10)
+        self.assertTrue(page["has_next"])
@@ -0,0 +1,12 @@
+from django.db import connection
+
+
+def close_connection_after(fn, *args, **kwargs):
+    """
+    Calls `fn` on a thread of a thread pool, then closes the thread's database connection. Django opens a connection
+    per thread, and it is only closed at the end of a request, which never happens on a thread pool.
+    """
+    try:
+        return fn(*args, **kwargs)
+    finally:
+        connection.close()
@@ -1,9 +1,23 @@
 from django.urls import path
 
-from .views import FoodSearchView
+from .views import (
+    FoodAutocompleteView,
+    FoodBarcodeView,
+    FoodDataCentralQuotaView,
+    FoodDetailsView,
+    FoodSearchView,
+)
 
 FOOD_SEARCH_NAME = "food-search"
+FOOD_AUTOCOMPLETE_NAME = "food-autocomplete"
+FOOD_DETAILS_NAME = "food-details"
+FOOD_BARCODE_NAME = "food-barcode"
+FOOD_DATA_CENTRAL_QUOTA_NAME = "fooddata-central-quota"
 
 urlpatterns = [
     path("search/", FoodSearchView.as_view(), name=FOOD_SEARCH_NAME),
+    path("autocomplete/", FoodAutocompleteView.as_view(), name=FOOD_AUTOCOMPLETE_NAME),
+    path("details/", FoodDetailsView.as_view(), name=FOOD_DETAILS_NAME),
+    path("barcode/", FoodBarcodeView.as_view(), name=FOOD_BARCODE_NAME),
+    path("quota/", FoodDataCentralQuotaView.as_view(), name=FOOD_DATA_CENTRAL_QUOTA_NAME),
 ]
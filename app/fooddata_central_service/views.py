@@ -1,18 +1,47 @@
+import requests
 from drf_yasg import openapi
 from drf_yasg.utils import swagger_auto_schema
 from rest_framework import status
+from rest_framework.permissions import IsAdminUser
 from rest_framework.response import Response
 from rest_framework.views import APIView
 
-from .serializers import FoodSearchResultSerializer
+from .autocomplete import food_autocomplete_index
+from .barcode import food_barcode_lookup
+from .circuit_breaker import CircuitOpenError
+from .providers import search_foods
+from .quota import FOOD_DATA_CENTRAL_REQUESTS_PER_HOUR, food_data_central_quota
+from .serializers import (
+    FoodBarcodeQuerySerializer,
+    FoodDetailSerializer,
+    FoodDetailsQuerySerializer,
+    FoodSearchQuerySerializer,
+    FoodSearchResultSerializer,
+    encode_cursor,
+)
 from .services import FoodDataCentralService
 
+STALE_WARNING = '110 - "Response is Stale"'
+
+DETAILED_PARAMETER = openapi.Parameter(
+    "detailed",
+    openapi.IN_QUERY,
+    description="Also return the rest of the nutrient profile as 'nutrients', such as fiber, sugars, sodium, minerals "
+    "and vitamins. Defaults to false.",
+    type=openapi.TYPE_BOOLEAN,
+    required=False,
+)
+
+
+def _food_data_central_unavailable():
+    return Response({"error": "FoodData Central is unavailable"}, status=status.HTTP_503_SERVICE_UNAVAILABLE)
+
 
 class FoodSearchView(APIView):
 
     @swagger_auto_schema(
-        operation_description="Search for foods using a query parameter 'food'. Returns a list of matching foods with "
-        "their nutritional information.",
+        operation_description="Search for foods using a query parameter 'food'. Returns a page of matching foods with "
+        "their nutritional information. The following page is requested by sending back 'next_cursor' as 'cursor'.",
         manual_parameters=[
             openapi.Parameter(
                 "food",
@@ -20,7 +49,22 @@ class FoodSearchView(APIView):
                 description="The name of the food to search for.",
                 type=openapi.TYPE_STRING,
                 required=True,
-            )
+            ),
+            openapi.Parameter(
+                "page_size",
+                openapi.IN_QUERY,
+                description="The number of foods per page, between 1 and 50. Defaults to 20.",
+                type=openapi.TYPE_INTEGER,
+                required=False,
+            ),
+            openapi.Parameter(
+                "cursor",
+                openapi.IN_QUERY,
+                description="The 'next_cursor' of the previous page. The first page is returned when omitted.",
+                type=openapi.TYPE_STRING,
+                required=False,
+            ),
+            DETAILED_PARAMETER,
         ],
         responses={
             200: openapi.Response(
@@ -30,6 +74,8 @@ class FoodSearchView(APIView):
                         "food_weight": 100,
                         "food_unit": "G",
                         "search_query": "apple",
+                        "page_size": 20,
+                        "next_cursor": "eyJwYWdlIjogMiwgInBhZ2Vfc2l6ZSI6IDIwfQ==",
                         "search_results": [
                             {
                                 "description": "Apple, raw",
@@ -43,9 +89,10 @@ class FoodSearchView(APIView):
                 },
             ),
             400: openapi.Response(
-                description="Bad request. Query parameter is missing.",
+                description="Bad request. Query parameter is missing, or the page size or cursor is invalid.",
             ),
             404: openapi.Response(description="No foods found matching the search query."),
+            503: openapi.Response(description="FoodData Central is unavailable and the search has never been cached."),
         },
     )
     def get(self, request):
@@ -53,13 +100,219 @@ class FoodSearchView(APIView):
         if not search_food:
             return Response({"error": "Query parameter is required"}, status=status.HTTP_400_BAD_REQUEST)
 
-        if search_results := FoodDataCentralService.get_foods_by_query_name(search_food):
+        query_serializer = FoodSearchQuerySerializer(data=request.query_params)
+        query_serializer.is_valid(raise_exception=True)
+        page_number = query_serializer.validated_data["page_number"]
+        page_size = query_serializer.validated_data["page_size"]
+        detailed = query_serializer.validated_data["detailed"]
+
+        try:
+            page = search_foods(search_food, page_number, page_size, user=request.user)
+        except (CircuitOpenError, requests.RequestException):
+            return _food_data_central_unavailable()
+
+        if search_results := page["foods"]:
             response_data = {
                 "food_weight": 100,
                 "food_unit": "G",
                 "search_query": search_food,
-                "search_results": [FoodSearchResultSerializer(food).data for food in search_results],
+                "page_size": page_size,
+                "next_cursor": encode_cursor(page_number + 1, page_size) if page["has_next"] else None,
+                "search_results": FoodSearchResultSerializer(
+                    search_results, many=True, context={"detailed": detailed}
+                ).data,
             }
-            return Response(response_data, status=status.HTTP_200_OK)
+            response = Response(response_data, status=status.HTTP_200_OK)
+            if page.get("stale"):
+                # The cached result has expired and FoodData Central is unavailable or the result is being refreshed.
+                response["Warning"] = STALE_WARNING
+            return response
 
         return Response({"error": "No foods found"}, status=status.HTTP_404_NOT_FOUND)
+
+
+class FoodAutocompleteView(APIView):
+
+    NUMBER_OF_SUGGESTIONS = 10
+
+    @swagger_auto_schema(
+        operation_description="Suggest food descriptions while the user is typing. Every word of the query parameter "
+        "'food' must be the start of a word in the description. Suggestions are served from memory without "
+        "contacting FoodData Central.",
+        manual_parameters=[
+            openapi.Parameter(
+                "food",
+                openapi.IN_QUERY,
+                description="The partially typed name of the food.",
+                type=openapi.TYPE_STRING,
+                required=True,
+            )
+        ],
+        responses={
+            200: openapi.Response(
+                description="Food descriptions matching the partially typed name, the most relevant first.",
+                examples={
+                    "application/json": {
+                        "search_query": "chick bre",
+                        "suggestions": [
+                            "Chicken, broilers or fryers, breast, meat and skin, raw",
+                            "Chicken, broiler or fryers, breast, skinless, boneless, meat only, raw",
+                        ],
+                    }
+                },
+            ),
+            400: openapi.Response(
+                description="Bad request. Query parameter is missing.",
+            ),
+        },
+    )
+    def get(self, request):
+        search_food = request.query_params.get("food", None)
+        if not search_food:
+            return Response({"error": "Query parameter is required"}, status=status.HTTP_400_BAD_REQUEST)
+
+        response_data = {
+            "search_query": search_food,
+            "suggestions": food_autocomplete_index.suggest(search_food, self.NUMBER_OF_SUGGESTIONS),
+        }
+        return Response(response_data, status=status.HTTP_200_OK)
+
+
+class FoodDetailsView(APIView):
+
+    @swagger_auto_schema(
+        operation_description="Look up the nutritional information of up to 50 foods by their FoodData Central "
+        "fdcId in a single request, for example to refresh every food of a saved meal at once.",
+        manual_parameters=[
+            openapi.Parameter(
+                "fdc_ids",
+                openapi.IN_QUERY,
+                description="Comma separated list of fdcIds, for example '171474,171077'.",
+                type=openapi.TYPE_STRING,
+                required=True,
+            ),
+            DETAILED_PARAMETER,
+        ],
+        responses={
+            200: openapi.Response(
+                description="The foods found, in the order requested, and the fdcIds which were not found.",
+                examples={
+                    "application/json": {
+                        "food_weight": 100,
+                        "food_unit": "G",
+                        "foods": [
+                            {
+                                "fdc_id": 171688,
+                                "description": "Apples, raw, with skin",
+                                "calories": {"value": 52, "unit": "KCAL"},
+                                "protein": {"value": 0.26, "unit": "G"},
+                                "fat": {"value": 0.17, "unit": "G"},
+                                "carbs": {"value": 13.81, "unit": "G"},
+                            }
+                        ],
+                        "not_found": [1],
+                    }
+                },
+            ),
+            400: openapi.Response(description="Bad request. fdc_ids is missing or invalid."),
+            503: openapi.Response(description="FoodData Central is unavailable and some foods have never been cached."),
+        },
+    )
+    def get(self, request):
+        query_serializer = FoodDetailsQuerySerializer(data=request.query_params)
+        query_serializer.is_valid(raise_exception=True)
+        fdc_ids = query_serializer.validated_data["fdc_ids"]
+        detailed = query_serializer.validated_data["detailed"]
+
+        try:
+            foods = FoodDataCentralService.get_foods_by_fdc_ids(fdc_ids)
+        except (CircuitOpenError, requests.RequestException):
+            return _food_data_central_unavailable()
+        response_data = {
+            "food_weight": 100,
+            "food_unit": "G",
+            "foods": FoodDetailSerializer(
+                [foods[fdc_id] for fdc_id in fdc_ids if fdc_id in foods], many=True, context={"detailed": detailed}
+            ).data,
+            "not_found": [fdc_id for fdc_id in fdc_ids if fdc_id not in foods],
+        }
+        return Response(response_data, status=status.HTTP_200_OK)
+
+
+class FoodBarcodeView(APIView):
+
+    @swagger_auto_schema(
+        operation_description="Look up the nutritional information of a branded food by the GTIN/UPC barcode printed "
+        "on its packaging. Barcodes are resolved from the imported Branded Foods dataset without contacting FoodData "
+        "Central.",
+        manual_parameters=[
+            openapi.Parameter(
+                "gtin",
+                openapi.IN_QUERY,
+                description="The 8, 12, 13 or 14 digit barcode, for example '036000291452'.",
+                type=openapi.TYPE_STRING,
+                required=True,
+            ),
+            DETAILED_PARAMETER,
+        ],
+        responses={
+            200: openapi.Response(
+                description="The branded food with the barcode.",
+                examples={
+                    "application/json": {
+                        "gtin": "00036000291452",
+                        "food_weight": 100,
+                        "food_unit": "G",
+                        "food": {
+                            "description": "ALMOND BREEZE UNSWEETENED ORIGINAL ALMONDMILK",
+                            "calories": {"value": 12, "unit": "KCAL"},
+                            "protein": {"value": 0.42, "unit": "G"},
+                            "fat": {"value": 1.04, "unit": "G"},
+                            "carbs": {"value": 0.42, "unit": "G"},
+                        },
+                    }
+                },
+            ),
+            400: openapi.Response(description="Bad request. gtin is missing or is not a valid barcode."),
+            404: openapi.Response(description="No imported branded food has the barcode."),
+        },
+    )
+    def get(self, request):
+        query_serializer = FoodBarcodeQuerySerializer(data=request.query_params)
+        query_serializer.is_valid(raise_exception=True)
+        gtin = query_serializer.validated_data["gtin"]
+        detailed = query_serializer.validated_data["detailed"]
+
+        food = food_barcode_lookup.get(gtin)
+        if food is None:
+            return Response({"error": "No food found with this barcode"}, status=status.HTTP_404_NOT_FOUND)
+
+        response_data = {
+            "gtin": gtin,
+            "food_weight": 100,
+            "food_unit": "G",
+            "food": FoodSearchResultSerializer(food, context={"detailed": detailed}).data,
+        }
+        return Response(response_data, status=status.HTTP_200_OK)
+
+
+class FoodDataCentralQuotaView(APIView):
+    permission_classes = [IsAdminUser]
+
+    @swagger_auto_schema(
+        operation_description="The number of requests which can currently be made to FoodData Central using the API "
+        "key, shared by every server process. Intended for monitoring, only available to staff users.",
+        responses={
+            200: openapi.Response(
+                description="The remaining quota of the FoodData Central API key.",
+                examples={"application/json": {"remaining": 87, "capacity": 100, "requests_per_hour": 1000}},
+            ),
+        },
+    )
+    def get(self, request):
+        response_data = {
+            "remaining": int(food_data_central_quota.remaining()),
+            "capacity": food_data_central_quota.capacity,
+            "requests_per_hour": FOOD_DATA_CENTRAL_REQUESTS_PER_HOUR,
+        }
+        return Response(response_data, status=status.HTTP_200_OK)
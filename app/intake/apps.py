@@ -4,3 +4,6 @@ from django.apps import AppConfig
 class DailyIntakeTrackingConfig(AppConfig):
     default_auto_field = "django.db.models.BigAutoField"
     name = "intake"
+
+    def ready(self):
+        from . import signals  # noqa: F401
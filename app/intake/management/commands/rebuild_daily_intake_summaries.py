@@ -0,0 +1,59 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+
+from intake.models import DailyIntakeSummary, FoodEntry
+from intake.summaries import TOTAL_FIELDS, summaries_match, summarize_entries
+
+BATCH_SIZE = 1000
+
+
+def _find_differences():
+    """
+    Compares every stored summary with the summary of its entries, returning the number of days missing a summary,
+    holding a summary without any entries, and holding a summary with the wrong totals.
+    """
+    summaries = {
+        (summary["user_id"], summary["date"]): summary
+        for summary in DailyIntakeSummary.objects.values("user_id", "date", "entry_count", *TOTAL_FIELDS).iterator()
+    }
+    missing = different = 0
+    for expected in summarize_entries(FoodEntry.objects.all()).iterator():
+        summary = summaries.pop((expected["user_id"], expected["date"]), None)
+        if summary is None:
+            missing += 1
+        elif not summaries_match(summary, expected):
+            different += 1
+    return missing, len(summaries), different
+
+
+class Command(BaseCommand):
+    help = (
+        "Checks the daily intake summaries against the food entries and rebuilds them. Summaries are kept up to date "
+        "as entries are saved, so this is only needed after entries were changed without signals, such as by "
+        "`QuerySet.update`."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--verify",
+            action="store_true",
+            help="Only check the summaries, failing when any of them differ from the entries.",
+        )
+
+    def handle(self, *args, **options):
+        missing, unexpected, different = _find_differences()
+        report = f"{missing} missing, {unexpected} unexpected and {different} incorrect daily intake summaries"
+
+        if options["verify"]:
+            if missing or unexpected or different:
+                raise CommandError(report)
+            self.stdout.write(self.style.SUCCESS("Every daily intake summary matches the food entries"))
+            return
+
+        with transaction.atomic():
+            DailyIntakeSummary.objects.all().delete()
+            DailyIntakeSummary.objects.bulk_create(
+                (DailyIntakeSummary(**summary) for summary in summarize_entries(FoodEntry.objects.all()).iterator()),
+                batch_size=BATCH_SIZE,
+            )
+        self.stdout.write(self.style.SUCCESS(f"Rebuilt the daily intake summaries, found {report}"))
@@ -0,0 +1,53 @@
+# Generated by Django 4.2.7 on 2026-10-17 17:51
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+from django.db.models import Count, Sum
+
+
+def summarize_existing_entries(apps, schema_editor):
+    FoodEntry = apps.get_model("intake", "FoodEntry")
+    DailyIntakeSummary = apps.get_model("intake", "DailyIntakeSummary")
+    totals = ("total_calories", "total_protein", "total_fats", "total_carbs")
+    DailyIntakeSummary.objects.bulk_create(
+        (
+            DailyIntakeSummary(**summary)
+            for summary in FoodEntry.objects.order_by()
+            .values("user_id", "date")
+            .annotate(entry_count=Count("id"), **{field: Sum(field) for field in totals})
+        ),
+        batch_size=1000,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ("intake", "0003_alter_foodentry_food_weight_and_more"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="DailyIntakeSummary",
+            fields=[
+                ("id", models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name="ID")),
+                ("date", models.DateField()),
+                ("total_calories", models.FloatField(default=0)),
+                ("total_protein", models.FloatField(default=0)),
+                ("total_fats", models.FloatField(default=0)),
+                ("total_carbs", models.FloatField(default=0)),
+                ("entry_count", models.PositiveIntegerField(default=0)),
+                ("user", models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                "ordering": ["-date"],
+            },
+        ),
+        migrations.AddConstraint(
+            model_name="dailyintakesummary",
+            constraint=models.UniqueConstraint(fields=("user", "date"), name="daily_intake_summary_user_date_unique"),
+        ),
+        migrations.RunPython(summarize_existing_entries, migrations.RunPython.noop),
+    ]
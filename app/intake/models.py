@@ -1,6 +1,6 @@
 from django.contrib.auth.models import User
 from django.core.validators import MinValueValidator
-from django.db import models
+from django.db import models, transaction
 
 
 class FoodEntry(models.Model):
@@ -20,9 +20,47 @@ class FoodEntry(models.Model):
     total_carbs = models.FloatField(validators=[MinValueValidator(0)])
     food_weight = models.FloatField(validators=[MinValueValidator(0)])
 
+    def save(self, *args, **kwargs):
+        # `DailyIntakeSummary` is updated by signals, so it must be committed or rolled back with the entry.
+        with transaction.atomic():
+            super().save(*args, **kwargs)
+
     def __str__(self):
         return (
             f"{self.date} - {self.food_name} "
             f"(Calories: {self.total_calories}, Protein: {self.total_protein}g, "
             f"Fats: {self.total_fats}g, Carbs: {self.total_carbs}g, Weight: {self.food_weight}g)"
         )
+
+
+class DailyIntakeSummary(models.Model):
+    """
+    The totals of every `FoodEntry` of a user on a single date, so analytics read at most one row per day however many
+    foods were logged. Days without entries have no row.
+
+    Rows are kept up to date incrementally by `intake.signals` in the same transaction as the entry, and can be checked
+    or rebuilt from the entries with `python manage.py rebuild_daily_intake_summaries`. `QuerySet.update` and
+    `bulk_create` of entries bypass the signals, so the summaries must be rebuilt after using them.
+    """
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=["user", "date"], name="daily_intake_summary_user_date_unique"),
+        ]
+        ordering = ["-date"]
+
+    user = models.ForeignKey(User, on_delete=models.CASCADE)
+    date = models.DateField()
+
+    total_calories = models.FloatField(default=0)
+    total_protein = models.FloatField(default=0)
+    total_fats = models.FloatField(default=0)
+    total_carbs = models.FloatField(default=0)
+    entry_count = models.PositiveIntegerField(default=0)
+
+    def __str__(self):
+        return (
+            f"{self.date} - {self.entry_count} entries "
+            f"(Calories: {self.total_calories}, Protein: {self.total_protein}g, "
+            f"Fats: {self.total_fats}g, Carbs: {self.total_carbs}g)"
+        )
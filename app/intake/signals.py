@@ -0,0 +1,29 @@
+from django.db.models.signals import post_delete, post_save, pre_save
+from django.dispatch import receiver
+
+from .models import FoodEntry
+from .summaries import refresh_summary
+
+
+@receiver(pre_save, sender=FoodEntry)
+def remember_previous_entry(sender, instance, raw=False, **kwargs):
+    # An update may move the entry from another day, whose summary changes as well, so it is read before saving.
+    instance._previous_entry = None
+    if not raw and not instance._state.adding and instance.pk is not None:
+        instance._previous_entry = FoodEntry.objects.filter(pk=instance.pk).values("user_id", "date").first()
+
+
+@receiver(post_save, sender=FoodEntry)
+def update_daily_intake_summary(sender, instance, raw=False, **kwargs):
+    if raw:
+        return
+    date = FoodEntry._meta.get_field("date").to_python(instance.date)
+    previous = getattr(instance, "_previous_entry", None)
+    if previous is not None and (previous["user_id"], previous["date"]) != (instance.user_id, date):
+        refresh_summary(previous["user_id"], previous["date"])
+    refresh_summary(instance.user_id, date)
+
+
+@receiver(post_delete, sender=FoodEntry)
+def remove_from_daily_intake_summary(sender, instance, **kwargs):
+    refresh_summary(instance.user_id, instance.date)
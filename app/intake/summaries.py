@@ -0,0 +1,42 @@
+from django.db import transaction
+from django.db.models import Count, Sum
+
+from .models import DailyIntakeSummary, FoodEntry
+
+TOTAL_FIELDS = ("total_calories", "total_protein", "total_fats", "total_carbs")
+
+
+def refresh_summary(user_id, date):
+    """
+    Recomputes the summary of the user's day from its food entries, creating the summary of the first entry and
+    deleting the summary of the last. The totals are the same aggregate as `summarize_entries`, so they are exact
+    however many times the entries were edited, rather than picking up the rounding of every float increment. The
+    summary is locked before the entries are read, so concurrent entries of the same day are never lost.
+    """
+    with transaction.atomic():
+        summary, _ = DailyIntakeSummary.objects.select_for_update().get_or_create(user_id=user_id, date=date)
+        totals = summarize_entries(FoodEntry.objects.filter(user_id=user_id, date=date)).first()
+        if totals is None:
+            summary.delete()
+            return
+        DailyIntakeSummary.objects.filter(pk=summary.pk).update(
+            entry_count=totals["entry_count"], **{field: totals[field] for field in TOTAL_FIELDS}
+        )
+
+
+def summarize_entries(entries):
+    """
+    Aggregates `entries`, a `FoodEntry` queryset, into the rows `DailyIntakeSummary` should hold, as dictionaries of
+    its fields ordered by user and date.
+    """
+    return (
+        entries.order_by("user_id", "date")
+        .values("user_id", "date")
+        .annotate(entry_count=Count("id"), **{field: Sum(field) for field in TOTAL_FIELDS})
+    )
+
+
+def summaries_match(summary, expected):
+    return summary["entry_count"] == expected["entry_count"] and all(
+        summary[field] == expected[field] for field in TOTAL_FIELDS
+    )
@@ -0,0 +1,131 @@
+from datetime import date
+from io import StringIO
+
+from django.contrib.auth.models import User
+from django.core.management import CommandError, call_command
+from django.test import TestCase
+
+from ..models import DailyIntakeSummary, FoodEntry
+
+DAY = date(2024, 9, 1)
+NEXT_DAY = date(2024, 9, 2)
+
+
+def _create_entry(user, day, calories, protein=10, fats=5, carbs=20):
+    return FoodEntry.objects.create(
+        user=user,
+        date=day,
+        food_name="Test Food",
+        total_calories=calories,
+        total_protein=protein,
+        total_fats=fats,
+        total_carbs=carbs,
+        food_weight=100,
+    )
+
+
+class DailyIntakeSummaryTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create(id=1, username="Test User")
+
+    def _summary(self, day):
+        return DailyIntakeSummary.objects.filter(user=self.user, date=day).first()
+
+    def test_entries_are_added_to_their_day(self):
+        _create_entry(self.user, DAY, 500, protein=30)
+        _create_entry(self.user, DAY, 600, protein=40)
+        _create_entry(self.user, NEXT_DAY, 100)
+
+        summary = self._summary(DAY)
+        self.assertEqual(summary.entry_count, 2)
+        self.assertAlmostEqual(summary.total_calories, 1100)
+        self.assertAlmostEqual(summary.total_protein, 70)
+        self.assertEqual(self._summary(NEXT_DAY).entry_count, 1)
+
+    def test_updated_entry_replaces_its_totals(self):
+        entry = _create_entry(self.user, DAY, 500)
+        _create_entry(self.user, DAY, 600)
+
+        entry.total_calories = 300
+        entry.save()
+
+        summary = self._summary(DAY)
+        self.assertEqual(summary.entry_count, 2)
+        self.assertAlmostEqual(summary.total_calories, 900)
+
+    def test_entry_moved_to_another_day(self):
+        entry = _create_entry(self.user, DAY, 500)
+
+        entry.date = NEXT_DAY
+        entry.save()
+
+        self.assertIsNone(self._summary(DAY))
+        self.assertAlmostEqual(self._summary(NEXT_DAY).total_calories, 500)
+
+    def test_deleting_the_last_entry_deletes_the_summary(self):
+        first = _create_entry(self.user, DAY, 500)
+        second = _create_entry(self.user, DAY, 600)
+
+        first.delete()
+        self.assertAlmostEqual(self._summary(DAY).total_calories, 600)
+
+        second.delete()
+        self.assertIsNone(self._summary(DAY))
+
+    def test_queryset_delete_updates_the_summary(self):
+        _create_entry(self.user, DAY, 500)
+        _create_entry(self.user, DAY, 600)
+
+        FoodEntry.objects.filter(user=self.user, date=DAY, total_calories=500).delete()
+
+        summary = self._summary(DAY)
+        self.assertEqual(summary.entry_count, 1)
+        self.assertAlmostEqual(summary.total_calories, 600)
+
+    def test_totals_stay_exact_after_repeated_edits(self):
+        entries = [_create_entry(self.user, DAY, 0.1, protein=0.7) for _ in range(3)]
+        for calories in (0.2, 0.3, 1e16, 0.1):
+            entries[0].total_calories = calories
+            entries[0].save()
+        entries[1].delete()
+
+        # The same totals as aggregating the remaining entries, which float increments would be off by rounding.
+        summary = self._summary(DAY)
+        self.assertEqual(summary.total_calories, 0.1 + 0.1)
+        self.assertEqual(summary.total_protein, 0.7 + 0.7)
+        call_command("rebuild_daily_intake_summaries", "--verify", stdout=StringIO())
+
+
+class RebuildDailyIntakeSummariesTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create(id=1, username="Test User")
+
+    def setUp(self):
+        _create_entry(self.user, DAY, 500)
+        _create_entry(self.user, DAY, 600)
+        _create_entry(self.user, NEXT_DAY, 100)
+
+    def test_verify_passes_when_summaries_match(self):
+        out = StringIO()
+        call_command("rebuild_daily_intake_summaries", "--verify", stdout=out)
+
+        self.assertIn("matches", out.getvalue())
+
+    def test_verify_fails_after_entries_changed_without_signals(self):
+        FoodEntry.objects.filter(date=DAY).update(total_calories=1)
+        DailyIntakeSummary.objects.filter(date=NEXT_DAY).delete()
+
+        with self.assertRaisesMessage(CommandError, "1 missing, 0 unexpected and 1 incorrect"):
+            call_command("rebuild_daily_intake_summaries", "--verify", stdout=StringIO())
+
+    def test_rebuild_fixes_the_summaries(self):
+        FoodEntry.objects.filter(date=DAY).update(total_calories=1)
+
+        call_command("rebuild_daily_intake_summaries", stdout=StringIO())
+
+        summary = DailyIntakeSummary.objects.get(user=self.user, date=DAY)
+        self.assertEqual(summary.entry_count, 2)
+        self.assertAlmostEqual(summary.total_calories, 2)
+        call_command("rebuild_daily_intake_summaries", "--verify", stdout=StringIO())
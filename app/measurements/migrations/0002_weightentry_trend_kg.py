@@ -0,0 +1,36 @@
+# Generated by Django 4.2.7 on 2026-10-17 17:59
+
+from django.db import migrations, models
+
+SMOOTHING = 0.1
+
+
+def smooth_existing_entries(apps, schema_editor):
+    WeightEntry = apps.get_model("measurements", "WeightEntry")
+    entries, user_id, trend, previous_date = [], None, None, None
+    for entry in WeightEntry.objects.order_by("user_id", "date").only("id", "user_id", "date", "weight_kg"):
+        if entry.user_id != user_id:
+            user_id, trend = entry.user_id, entry.weight_kg
+        else:
+            share = 1 - (1 - SMOOTHING) ** (entry.date - previous_date).days
+            trend += share * (entry.weight_kg - trend)
+        previous_date = entry.date
+        entry.trend_kg = trend
+        entries.append(entry)
+    WeightEntry.objects.bulk_update(entries, ["trend_kg"], batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("measurements", "0001_initial"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="weightentry",
+            name="trend_kg",
+            field=models.FloatField(blank=True, editable=False, null=True),
+        ),
+        migrations.RunPython(smooth_existing_entries, migrations.RunPython.noop),
+    ]
@@ -1,6 +1,6 @@
 from django.contrib.auth.models import User
 from django.core.validators import MinValueValidator
-from django.db import models
+from django.db import models, transaction
 
 
 class WeightEntry(models.Model):
@@ -34,6 +34,17 @@ class WeightEntry(models.Model):
     """
     weight_kg = models.FloatField(validators=[MinValueValidator(1)])
     notes = models.TextField(blank=True, default="")
+    """
+    The exponentially smoothed weight on this date, see `measurements.trends`. Each trend continues from the one of the
+    previous weigh-in, so it is kept up to date by the signals when weigh-ins are saved or deleted, and adding the
+    latest weigh-in never refits the history before it.
+    """
+    trend_kg = models.FloatField(null=True, blank=True, editable=False)
+
+    def save(self, *args, **kwargs):
+        # `trend_kg` of this and later weigh-ins is updated by signals, so it must be committed with the weigh-in.
+        with transaction.atomic():
+            super().save(*args, **kwargs)
 
     def __str__(self):
         return f"On {self.date}, you weighed {self.weight_kg}kg"
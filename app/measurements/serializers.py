@@ -1,6 +1,15 @@
-from rest_framework.serializers import DateField, ModelSerializer, Serializer
+from rest_framework.serializers import (
+    BooleanField,
+    DateField,
+    FloatField,
+    IntegerField,
+    ListField,
+    ModelSerializer,
+    Serializer,
+)
 
 from .models import WeightEntry
+from .trends import DEFAULT_TREND_DAYS, MAX_TREND_DAYS
 
 
 class WeightEntryRequestSerializer(ModelSerializer):
@@ -18,3 +27,25 @@ class WeightEntryResponseSerializer(ModelSerializer):
 
 class WeightEntryDateSerializer(Serializer):
     date = DateField(required=True)
+
+
+class WeightTrendQuerySerializer(Serializer):
+    days = IntegerField(min_value=1, max_value=MAX_TREND_DAYS, default=DEFAULT_TREND_DAYS)
+
+
+class WeightGoalProjectionSerializer(Serializer):
+    goalWeightKg = FloatField()
+    goalDate = DateField()
+    remainingKg = FloatField(allow_null=True)
+    projectedDate = DateField(allow_null=True)
+    onTrack = BooleanField()
+
+
+class WeightTrendResponseSerializer(Serializer):
+    latestDate = DateField(allow_null=True)
+    trendKg = FloatField(allow_null=True)
+    weeklyChangeKg = FloatField(allow_null=True)
+    dates = ListField(child=DateField())
+    weightKg = ListField(child=FloatField())
+    trendLineKg = ListField(child=FloatField())
+    goal = WeightGoalProjectionSerializer(allow_null=True)
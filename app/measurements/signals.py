@@ -0,0 +1,30 @@
+from django.db.models.signals import post_delete, post_save, pre_save
+from django.dispatch import receiver
+
+from .models import WeightEntry
+from .trends import update_trends
+
+
+@receiver(pre_save, sender=WeightEntry)
+def remember_previous_date(sender, instance, raw=False, **kwargs):
+    # Moving a weigh-in to another date changes the trends from the earlier of the two dates.
+    instance._previous_date = None
+    if not raw and not instance._state.adding and instance.pk is not None:
+        instance._previous_date = WeightEntry.objects.filter(pk=instance.pk).values_list("date", flat=True).first()
+
+
+@receiver(post_save, sender=WeightEntry)
+def update_weight_trend(sender, instance, raw=False, **kwargs):
+    if raw:
+        return
+    # The date is only converted from a string by `full_clean`, so it may still be one.
+    date = WeightEntry._meta.get_field("date").to_python(instance.date)
+    previous_date = getattr(instance, "_previous_date", None)
+    start = min(date, previous_date) if previous_date is not None else date
+    trends = update_trends(instance.user_id, start)
+    instance.trend_kg = trends.get(instance.pk, instance.trend_kg)
+
+
+@receiver(post_delete, sender=WeightEntry)
+def update_weight_trend_after_delete(sender, instance, **kwargs):
+    update_trends(instance.user_id, instance.date)
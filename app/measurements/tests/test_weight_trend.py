@@ -0,0 +1,184 @@
+from datetime import date, timedelta
+
+import numpy as np
+from django.contrib.auth.models import User
+from django.test import SimpleTestCase, TestCase
+from django.urls import reverse
+from rest_framework.test import APIClient
+
+from goals.models import WeightGoal
+
+from ..models import WeightEntry
+from ..trends import SMOOTHING, project_goal, smooth, theil_sen_slope
+from ..urls import WEIGHT_TREND_NAME
+
+START = date(2025, 1, 1)
+
+
+def _smooth_loop(days, weights):
+    """
+    The trend computed one weigh-in at a time.
+    """
+    trends = [weights[0]]
+    for gap, weight in zip(np.diff(days), weights[1:]):
+        share = 1 - (1 - SMOOTHING) ** gap
+        trends.append(trends[-1] + share * (weight - trends[-1]))
+    return trends
+
+
+class SmoothTests(SimpleTestCase):
+
+    def test_matches_the_recurrence(self):
+        generator = np.random.default_rng(0)
+        days = np.cumsum(generator.integers(1, 4, size=200))
+        weights = 80 + generator.normal(0, 1, size=200)
+
+        np.testing.assert_allclose(smooth(days, weights), _smooth_loop(days, weights))
+
+    def test_long_histories_do_not_overflow(self):
+        days = np.arange(0, 20000, 3)
+        weights = np.linspace(90, 70, len(days))
+
+        trends = smooth(days, weights)
+
+        self.assertTrue(np.isfinite(trends).all())
+        np.testing.assert_allclose(trends, _smooth_loop(days, weights))
+
+    def test_continues_from_the_previous_trend(self):
+        trends = smooth([2], [70], previous_day=0, previous_trend=80)
+
+        np.testing.assert_allclose(trends, [80 - 10 * (1 - (1 - SMOOTHING) ** 2)])
+
+
+class TheilSenSlopeTests(SimpleTestCase):
+
+    def test_outliers_do_not_move_the_slope(self):
+        days = np.arange(10)
+        weights = 80 - 0.1 * days
+        weights[4] += 5
+
+        self.assertAlmostEqual(theil_sen_slope(days, weights), -0.1)
+
+    def test_single_weigh_in_has_no_slope(self):
+        self.assertIsNone(theil_sen_slope([0], [80]))
+
+
+class ProjectGoalTests(SimpleTestCase):
+
+    def test_projects_the_date_the_goal_is_reached(self):
+        self.assertEqual(project_goal(START, 80, -0.1, 75), START + timedelta(days=50))
+
+    def test_moving_away_from_the_goal(self):
+        self.assertIsNone(project_goal(START, 80, 0.1, 75))
+        self.assertIsNone(project_goal(START, 80, 0, 75))
+
+    def test_goal_already_reached(self):
+        self.assertEqual(project_goal(START, 75.1, 0.1, 75), START)
+
+
+class WeightTrendStateTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(username="testuser")
+
+    def _create(self, day, weight):
+        return WeightEntry.objects.create(user=self.user, date=START + timedelta(days=day), weight_kg=weight)
+
+    def _assert_trends_refitted(self):
+        entries = list(WeightEntry.objects.filter(user=self.user).order_by("date"))
+        days = [(entry.date - START).days for entry in entries]
+        expected = _smooth_loop(days, [entry.weight_kg for entry in entries])
+        np.testing.assert_allclose([entry.trend_kg for entry in entries], expected)
+
+    def test_first_weigh_in_is_its_own_trend(self):
+        entry = self._create(0, 80)
+
+        self.assertEqual(entry.trend_kg, 80)
+        self.assertEqual(WeightEntry.objects.get(pk=entry.pk).trend_kg, 80)
+
+    def test_latest_weigh_in_does_not_refit_the_history(self):
+        for day in range(30):
+            self._create(day, 80 - day * 0.1)
+
+        # Saving in a savepoint, resetting a stale energy expenditure estimate, reading the previous trend, reading the
+        # new weigh-in and updating its trend.
+        with self.assertNumQueries(7):
+            self._create(31, 76)
+        self._assert_trends_refitted()
+
+    def test_earlier_weigh_in_refits_the_later_trends(self):
+        self._create(0, 80)
+        self._create(10, 78)
+        self._create(5, 90)
+
+        self._assert_trends_refitted()
+
+    def test_moving_and_deleting_weigh_ins(self):
+        self._create(0, 80)
+        moved = self._create(5, 79)
+        deleted = self._create(8, 90)
+        self._create(10, 78)
+
+        moved.date = START + timedelta(days=12)
+        moved.save()
+        self._assert_trends_refitted()
+
+        deleted.delete()
+        self._assert_trends_refitted()
+
+
+class WeightTrendViewTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(username="testuser")
+        cls.other_user = User.objects.create_user(username="otheruser")
+        for day in range(0, 120, 2):
+            WeightEntry.objects.create(user=cls.user, date=START + timedelta(days=day), weight_kg=90 - day * 0.05)
+        WeightEntry.objects.create(user=cls.other_user, date=START, weight_kg=60)
+
+    def setUp(self):
+        self.client = APIClient()
+        self.client.force_authenticate(user=self.user)
+        self.url = reverse(WEIGHT_TREND_NAME)
+
+    def test_trend_line_of_the_last_days(self):
+        resp = self.client.get(self.url, {"days": 30})
+
+        self.assertEqual(resp.status_code, 200)
+        self.assertEqual(resp.data["latestDate"], str(START + timedelta(days=118)))
+        self.assertEqual(len(resp.data["dates"]), 15)
+        self.assertEqual(len(resp.data["trendLineKg"]), 15)
+        self.assertEqual(resp.data["trendKg"], resp.data["trendLineKg"][-1])
+        self.assertAlmostEqual(resp.data["weeklyChangeKg"], -0.35)
+        self.assertIsNone(resp.data["goal"])
+
+    def test_goal_projection(self):
+        WeightGoal.objects.create(user=self.user, goal_date=date(2025, 12, 31), goal_weight_kg=80)
+
+        resp = self.client.get(self.url)
+
+        goal = resp.data["goal"]
+        remaining_days = goal["remainingKg"] / -0.05
+        expected = START + timedelta(days=118 + int(np.ceil(remaining_days)))
+        self.assertEqual(goal["projectedDate"], str(expected))
+        self.assertTrue(goal["onTrack"])
+
+    def test_goal_in_the_wrong_direction(self):
+        WeightGoal.objects.create(user=self.user, goal_date=date(2025, 12, 31), goal_weight_kg=95)
+
+        goal = self.client.get(self.url).data["goal"]
+
+        self.assertIsNone(goal["projectedDate"])
+        self.assertFalse(goal["onTrack"])
+
+    def test_user_without_weigh_ins(self):
+        self.client.force_authenticate(user=User.objects.create_user(username="newuser"))
+
+        resp = self.client.get(self.url)
+
+        self.assertEqual(resp.status_code, 200)
+        self.assertIsNone(resp.data["trendKg"])
+        self.assertEqual(resp.data["dates"], [])
+
+    def test_invalid_days(self):
+        self.assertEqual(self.client.get(self.url, {"days": 0}).status_code, 400)
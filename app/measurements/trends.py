@@ -0,0 +1,151 @@
+import math
+from datetime import timedelta
+
+import numpy as np
+
+from .models import WeightEntry
+
+# The share of each day's weigh-in in the trend, so a weigh-in after a gap of `n` days has the share of `n` daily
+# weigh-ins, `1 - (1 - SMOOTHING) ** n`, and the trend does not depend on how often the user weighs in.
+SMOOTHING = 0.1
+DECAY_RATE = -math.log(1 - SMOOTHING)
+
+# exp(x) overflows float64 past 709, so the smoothing is computed in blocks of at most this many decays.
+MAX_EXPONENT = 500.0
+
+# The default and maximum number of days, ending on the latest weigh-in, of the trend line and the weekly change.
+DEFAULT_TREND_DAYS = 90
+MAX_TREND_DAYS = 365
+
+# The trend has reached the goal when it is within this many kilograms of it.
+GOAL_REACHED_TOLERANCE_KG = 0.25
+
+
+def _day_numbers(dates):
+    return np.array(dates, dtype="datetime64[D]").astype(np.int64)
+
+
+def smooth(days, weights, previous_day=None, previous_trend=None):
+    """
+    The exponentially smoothed trend of each weigh-in, continuing from the trend of the weigh-in before `days`
+    when there is one, otherwise starting at the first weight.
+
+    Each trend is `trend = decay * previous_trend + (1 - decay) * weight` with `decay = exp(-DECAY_RATE * gap)`,
+    which unrolls into a cumulative sum of the weights scaled by `exp(DECAY_RATE * day)`, so the recurrence is
+    computed for a whole block of weigh-ins at once.
+    """
+    days = np.asarray(days, dtype=np.int64)
+    weights = np.asarray(weights, dtype=float)
+    trends = np.empty(len(weights))
+
+    start = 0
+    while start < len(weights):
+        exponents = DECAY_RATE * (days[start:] - days[start])
+        end = start + int(np.searchsorted(exponents, MAX_EXPONENT, side="right"))
+        scaled = np.exp(exponents[: end - start])
+
+        seed, seed_day = (trends[start - 1], days[start - 1]) if start else (previous_trend, previous_day)
+        if seed is None:
+            # The first weigh-in has no trend to continue from, so it is its own trend.
+            decays = np.exp(-DECAY_RATE * np.diff(days[start:end], prepend=days[start]))
+            decays[0], seed = 0.0, 0.0
+        else:
+            decays = np.exp(-DECAY_RATE * np.diff(days[start:end], prepend=seed_day))
+
+        trends[start:end] = (decays[0] * seed + np.cumsum((1 - decays) * weights[start:end] * scaled)) / scaled
+        start = end
+    return trends
+
+
+def theil_sen_slope(days, weights):
+    """
+    The median of the slopes between every pair of weigh-ins, in kilograms per day. Unlike a least squares fit, a
+    few outlying weigh-ins do not move it. None with fewer than two weigh-ins.
+    """
+    if len(days) < 2:
+        return None
+    days = np.asarray(days, dtype=float)
+    weights = np.asarray(weights, dtype=float)
+    first, second = np.triu_indices(len(days), k=1)
+    return float(np.median((weights[second] - weights[first]) / (days[second] - days[first])))
+
+
+def update_trends(user_id, date):
+    """
+    Recomputes the trend of the weigh-ins of the user on or after `date`, continuing from the weigh-in before it.
+    Adding the latest weigh-in only recomputes its own trend, while changing an earlier one recomputes the trends
+    after it as well.
+    """
+    entries = WeightEntry.objects.filter(user_id=user_id)
+    previous = entries.filter(date__lt=date).order_by("-date").values_list("date", "trend_kg").first()
+    rows = list(entries.filter(date__gte=date).order_by("date").values_list("id", "date", "weight_kg"))
+    if not rows:
+        return {}
+
+    ids, dates, weights = zip(*rows)
+    previous_day, previous_trend = (_day_numbers([previous[0]])[0], previous[1]) if previous else (None, None)
+    trends = smooth(_day_numbers(dates), weights, previous_day, previous_trend).tolist()
+
+    if len(rows) == 1:
+        WeightEntry.objects.filter(pk=ids[0]).update(trend_kg=trends[0])
+    else:
+        WeightEntry.objects.bulk_update(
+            [WeightEntry(pk=pk, trend_kg=trend) for pk, trend in zip(ids, trends)], ["trend_kg"], batch_size=1000
+        )
+    return dict(zip(ids, trends))
+
+
+def project_goal(latest_date, trend, slope, goal_weight_kg):
+    """
+    The date the trend reaches `goal_weight_kg` when it keeps changing by `slope` kilograms per day, or None when it
+    is not moving towards the goal.
+    """
+    remaining = goal_weight_kg - trend
+    if abs(remaining) <= GOAL_REACHED_TOLERANCE_KG:
+        return latest_date
+    if not slope or remaining * slope < 0:
+        return None
+    return latest_date + timedelta(days=math.ceil(remaining / slope))
+
+
+def compute_weight_trend(user, days=DEFAULT_TREND_DAYS, goal=None):
+    """
+    The trend line of the weigh-ins of the `days` days ending on the latest one, the weekly change of the weight over
+    them, and the projection of the trend to the `WeightGoal` of the user when there is one. The trends were stored
+    when the weigh-ins were saved, so the history before the `days` is never read.
+    """
+    latest_date = WeightEntry.objects.filter(user=user).order_by("-date").values_list("date", flat=True).first()
+    if latest_date is None:
+        rows = []
+    else:
+        rows = list(
+            WeightEntry.objects.filter(user=user, date__gt=latest_date - timedelta(days=days))
+            .order_by("date")
+            .values_list("date", "weight_kg", "trend_kg")
+        )
+    dates, weights, trends = zip(*rows) if rows else ((), (), ())
+
+    trend = trends[-1] if trends else None
+    slope = theil_sen_slope(_day_numbers(dates), weights)
+
+    goal_payload = None
+    if goal is not None:
+        goal_weight_kg = float(goal.goal_weight_kg)
+        projected_date = project_goal(latest_date, trend, slope, goal_weight_kg) if trend is not None else None
+        goal_payload = {
+            "goalWeightKg": goal_weight_kg,
+            "goalDate": goal.goal_date,
+            "remainingKg": goal_weight_kg - trend if trend is not None else None,
+            "projectedDate": projected_date,
+            "onTrack": projected_date <= goal.goal_date if projected_date is not None else False,
+        }
+
+    return {
+        "latestDate": latest_date,
+        "trendKg": trend,
+        "weeklyChangeKg": slope * 7 if slope is not None else None,
+        "dates": list(dates),
+        "weightKg": list(weights),
+        "trendLineKg": list(trends),
+        "goal": goal_payload,
+    }
@@ -4,8 +4,10 @@ from .views import *
 
 WEIGHT_MEASUREMENTS_NAME = "weight-measurements"
 WEIGHT_HISTORY_NAME = "weight-history"
+WEIGHT_TREND_NAME = "weight-trend"
 
 urlpatterns = [
     path("weights/", WeightsView.as_view(), name=WEIGHT_MEASUREMENTS_NAME),
     path("weights/history/", AllWeightsView.as_view(), name=WEIGHT_HISTORY_NAME),
+    path("weights/trend/", WeightTrendView.as_view(), name=WEIGHT_TREND_NAME),
 ]
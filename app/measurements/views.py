@@ -5,11 +5,21 @@ from rest_framework import status
 from rest_framework.response import Response
 from rest_framework.views import APIView
 
+from goals.models import WeightGoal
+
 from .models import WeightEntry
 from .serializers import (
     WeightEntryDateSerializer,
     WeightEntryRequestSerializer,
     WeightEntryResponseSerializer,
+    WeightTrendQuerySerializer,
+    WeightTrendResponseSerializer,
+)
+from .trends import (
+    DEFAULT_TREND_DAYS,
+    GOAL_REACHED_TOLERANCE_KG,
+    MAX_TREND_DAYS,
+    compute_weight_trend,
 )
 
 
@@ -71,3 +81,32 @@ class AllWeightsView(APIView):
         weights = WeightEntry.objects.filter(user=request.user)
         serializer = WeightEntryResponseSerializer(weights, many=True)
         return Response(serializer.data, status=status.HTTP_200_OK)
+
+
+class WeightTrendView(APIView):
+    @swagger_auto_schema(
+        operation_description="The exponentially smoothed trend of the weigh-ins of the last days, ending on the latest "
+        "weigh-in, and the weekly change of the weight over them from a robust regression. With a weight goal, the "
+        "trend is projected to the date it reaches the goal weight at that rate, or that of the latest weigh-in when "
+        f"the trend is within {GOAL_REACHED_TOLERANCE_KG} kg of it. The projected date is null when the trend is not "
+        "moving towards the goal.",
+        manual_parameters=[
+            openapi.Parameter(
+                "days",
+                openapi.IN_QUERY,
+                description=f"The number of days of the trend line. Defaults to {DEFAULT_TREND_DAYS}.",
+                type=openapi.TYPE_INTEGER,
+                minimum=1,
+                maximum=MAX_TREND_DAYS,
+                required=False,
+            ),
+        ],
+        responses={200: openapi.Response("Weight trend", WeightTrendResponseSerializer)},
+    )
+    def get(self, request):
+        query = WeightTrendQuerySerializer(data=request.query_params)
+        query.is_valid(raise_exception=True)
+
+        goal = WeightGoal.objects.filter(user=request.user).first()
+        payload = compute_weight_trend(request.user, query.validated_data["days"], goal)
+        return Response(WeightTrendResponseSerializer(payload).data, status=status.HTTP_200_OK)